@@ -1,9 +1,7 @@
-import time
 from abc import ABC, abstractmethod
 from pathlib import Path
 
 import cv2
-import numpy as np
 import uvc
 from pyrav4l2 import Device, v4l2
 
@@ -124,9 +122,42 @@ class UVCBackend(CameraBackend):
         self._uvc_capture = None
 
 
+_MJPEG_DECODE_FLAGS = {
+    (False, 1): cv2.IMREAD_COLOR,
+    (False, 2): cv2.IMREAD_REDUCED_COLOR_2,
+    (False, 4): cv2.IMREAD_REDUCED_COLOR_4,
+    (False, 8): cv2.IMREAD_REDUCED_COLOR_8,
+    (True, 1): cv2.IMREAD_GRAYSCALE,
+    (True, 2): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (True, 4): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (True, 8): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
 class V4l2Backend(CameraBackend):
-    def __init__(self, spec: CameraSpec):  # noqa: C901
+    def __init__(  # noqa: C901
+        self,
+        spec: CameraSpec,
+        num_buffers: int = 4,
+        gray: bool = False,
+        downscale: int = 1,
+    ):
+        """Opens the V4L2 device matching the spec and starts streaming.
+
+        Args:
+            spec: Camera to open and its capture mode.
+            num_buffers: Number of driver buffers to capture into.
+            gray: Return grayscale frames instead of BGR frames.
+            downscale: Factor of 1, 2, 4 or 8 by which frames are downscaled. MJPEG
+                frames are decoded at reduced size, others are subsampled.
+
+        """
         super().__init__(spec)
+        if downscale not in (1, 2, 4, 8):
+            raise ValueError("Downscale factor must be 1, 2, 4 or 8.")
+        self.num_buffers = num_buffers
+        self.gray = gray
+        self.downscale = downscale
 
         self.camera_reinit_timeout = 3
         self.device = None
@@ -161,11 +192,9 @@ class V4l2Backend(CameraBackend):
                         device.set_format(color_format, frame_size)
                         device.set_frame_interval(frame_interval)
                         self.device = device
-                        self.stream = V4lStream(self.device)
+                        self.stream = V4lStream(self.device, self.num_buffers)
                         self.stream.open()
-                        with open(self.device.path) as fd:
-                            self._fd = fd
-                            self.color_format, _ = self.device.get_format()
+                        self.color_format, _ = self.device.get_format()
 
                         break
 
@@ -176,31 +205,45 @@ class V4l2Backend(CameraBackend):
             raise CameraNotFoundError(self.spec.name)
 
     def get_frame(self) -> Frame:
-        buffer = self.stream.get_frame()
+        """Returns the next frame.
+
+        Grayscale frames of GREY and YUYV streams are zero-copy views of the driver
+        buffer, which is held until `Frame.release` is called. All other frames own
+        their data and their buffer is released right away.
+        """
+        buffer = self.stream.dequeue(timeout=self.camera_reinit_timeout)
         if buffer is None:
             raise TimeoutError
 
-        if self.color_format.pixelformat == v4l2.V4L2_PIX_FMT_GREY:
-            pixels = np.frombuffer(buffer, dtype=np.uint8).reshape([
-                self.spec.height,
-                self.spec.width,
-            ])
-        elif self.color_format.pixelformat == v4l2.V4L2_PIX_FMT_MJPEG:
-            pixels = cv2.imdecode(np.frombuffer(buffer, np.uint8), cv2.IMREAD_COLOR)
-        elif self.color_format.pixelformat == v4l2.V4L2_PIX_FMT_YUYV:
-            yuyv = np.frombuffer(buffer, dtype=np.uint8).reshape([
-                self.spec.height,
-                self.spec.width,
-                2,
-            ])
-            pixels = cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUYV)
-
         self.frame_counter += 1
-
-        return Frame(pixels, time.time(), self.frame_counter)
+        pixelformat = self.color_format.pixelformat
+        step = self.downscale
+        if pixelformat == v4l2.V4L2_PIX_FMT_GREY:
+            gray = buffer.data.reshape([self.spec.height, self.spec.width])[
+                ::step, ::step
+            ]
+            if self.gray:
+                return Frame(gray, buffer.timestamp, self.frame_counter, buffer)
+            with buffer:
+                pixels = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        elif pixelformat == v4l2.V4L2_PIX_FMT_YUYV:
+            yuyv = buffer.data.reshape([self.spec.height, self.spec.width, 2])
+            if self.gray:
+                # The Y plane is every other byte, a strided view needs no copy
+                gray = yuyv[::step, ::step, 0]
+                return Frame(gray, buffer.timestamp, self.frame_counter, buffer)
+            with buffer:
+                pixels = cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUYV)[::step, ::step]
+        elif pixelformat == v4l2.V4L2_PIX_FMT_MJPEG:
+            with buffer:
+                pixels = cv2.imdecode(buffer.data, _MJPEG_DECODE_FLAGS[self.gray, step])
+        else:
+            buffer.release()
+            raise OSError("Unsupported pixel format!")
+        return Frame(pixels, buffer.timestamp, self.frame_counter)
 
     def close(self) -> None:
-        self._fd.close()
+        self.stream.close()
 
 
 class PNSCam(V4l2Backend):
@@ -214,22 +257,22 @@ class PNSCam(V4l2Backend):
             fps=45,
             bandwidth_factor=1.0,
         )
-        super().__init__(spec)
+        super().__init__(spec, gray=True)
         controls = {c.display_name: c for c in self._uvc_capture.controls}
         controls["Auto Exposure Mode"].value = 1
         controls["Absolute Exposure Time"].value = 10
 
     def get_frame(self) -> Frame:
         frame = super().get_frame()
-        pixels = frame.data
-        pixels = cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY)
-        pixels = pixels[:, :256]
+        try:
+            pixels = frame.data[:, :256]
 
-        # rotate 90 degrees counter clockwise
-        pixels = cv2.rotate(pixels, cv2.ROTATE_90_COUNTERCLOCKWISE)
+            # rotate 90 degrees counter clockwise, which copies out of the buffer
+            pixels = cv2.rotate(pixels, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        finally:
+            frame.release()
 
-        frame = Frame(pixels, frame.timestamp, frame.index)
-        return frame
+        return Frame(pixels, frame.timestamp, frame.index)
 
 
 class HDDigitalCam(UVCBackend):
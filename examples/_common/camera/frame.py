@@ -1,14 +1,24 @@
-from typing import NamedTuple
+from typing import TYPE_CHECKING, NamedTuple
 
 import cv2
 import numpy as np
 import numpy.typing as npt
 
+if TYPE_CHECKING:
+    from .v4lstream import V4lBuffer
+
 
 class Frame(NamedTuple):
     data: npt.NDArray
     timestamp: float
     index: int
+    buffer: "V4lBuffer | None" = None
+    """Driver buffer `data` is a view of, if any. Must be released after use."""
+
+    def release(self) -> None:
+        """Releases the driver buffer of the frame, invalidating zero-copy data."""
+        if self.buffer is not None:
+            self.buffer.release()
 
     @property
     def gray(self) -> npt.NDArray[np.uint8]:
@@ -1,33 +1,148 @@
+import contextlib
+import mmap
 from fcntl import ioctl
 from select import select
 
+import numpy as np
+import numpy.typing as npt
 import pyrav4l2.v4l2 as v4l2
-from pyrav4l2.stream import Stream
+from pyrav4l2 import Device
 
 
-class V4lStream(Stream):
-    def open(self):
-        if self.f_cam.closed:
-            self._open()
+class V4lBuffer:
+    """A dequeued buffer of a V4lStream.
 
-        ioctl(
-            self.f_cam,
+    `data` is a zero-copy view into the memory-mapped driver buffer. It stays valid
+    until the buffer is released, after which the driver overwrites it with a new
+    frame. Buffers can be used as context managers, which release them on exit.
+    """
+
+    def __init__(
+        self,
+        stream: "V4lStream",
+        index: int,
+        data: npt.NDArray[np.uint8],
+        timestamp: float,
+        sequence: int,
+    ):
+        self.stream = stream
+        self.index = index
+        self.data = data
+        self.timestamp = timestamp
+        """Kernel capture timestamp on the monotonic clock, in seconds."""
+        self.sequence = sequence
+        """Frame sequence number counted by the driver."""
+        self.released = False
+
+    def release(self) -> None:
+        """Hands the buffer back to the driver. Releasing twice has no effect."""
+        if not self.released:
+            self.released = True
+            self.stream.release(self)
+
+    def __enter__(self) -> "V4lBuffer":
+        return self
+
+    def __exit__(self, *args, **kwargs) -> None:
+        self.release()
+
+
+class V4lStream:
+    """Streams frames from a V4L2 device through a ring of memory-mapped buffers.
+
+    The driver fills the queued buffers in turn. A dequeued buffer belongs to the
+    application until it is released, so its data can be used without copying.
+    The driver keeps capturing as long as at least one buffer is queued, i.e. the
+    application should hold fewer than `num_buffers` buffers at any time.
+    """
+
+    def __init__(self, device: Device, num_buffers: int = 4):
+        self.device = device
+        self.num_buffers = num_buffers
+        self.f_cam = None
+        self._mmaps: list[mmap.mmap] = []
+
+    def _ioctl(self, request, arg) -> None:
+        ioctl(self.f_cam, request, arg)
+
+    def _new_buffer(self, index: int = 0) -> v4l2.v4l2_buffer:
+        buf = v4l2.v4l2_buffer()
+        buf.type = v4l2.V4L2_BUF_TYPE_VIDEO_CAPTURE
+        buf.memory = v4l2.V4L2_MEMORY_MMAP
+        buf.index = index
+        return buf
+
+    def open(self) -> None:
+        self.f_cam = open(self.device.path, "rb+", buffering=0)  # noqa: SIM115
+
+        req = v4l2.v4l2_requestbuffers()
+        req.type = v4l2.V4L2_BUF_TYPE_VIDEO_CAPTURE
+        req.memory = v4l2.V4L2_MEMORY_MMAP
+        req.count = self.num_buffers
+        self._ioctl(v4l2.VIDIOC_REQBUFS, req)
+        # The driver may grant a different number of buffers
+        self.num_buffers = req.count
+
+        for index in range(self.num_buffers):
+            buf = self._new_buffer(index)
+            self._ioctl(v4l2.VIDIOC_QUERYBUF, buf)
+            self._mmaps.append(
+                mmap.mmap(
+                    self.f_cam.fileno(),
+                    buf.length,
+                    mmap.MAP_SHARED,
+                    mmap.PROT_READ | mmap.PROT_WRITE,
+                    offset=buf.m.offset,
+                )
+            )
+            self._ioctl(v4l2.VIDIOC_QBUF, buf)
+
+        self._ioctl(
             v4l2.VIDIOC_STREAMON,
             v4l2.ctypes.c_int(v4l2.V4L2_BUF_TYPE_VIDEO_CAPTURE),
         )
-        select((self.f_cam,), (), ())
 
-    def close(self):
-        self.f_cam.close()
+    def dequeue(self, timeout: float | None = None) -> V4lBuffer | None:
+        """Waits for the next filled buffer.
+
+        Returns:
+            The buffer, or None if no frame arrived within `timeout` seconds.
+
+        """
+        readable, _, _ = select((self.f_cam,), (), (), timeout)
+        if not readable:
+            return None
+
+        buf = self._new_buffer()
+        self._ioctl(v4l2.VIDIOC_DQBUF, buf)
+        data = np.frombuffer(
+            self._mmaps[buf.index], dtype=np.uint8, count=buf.bytesused
+        )
+        return V4lBuffer(
+            self,
+            buf.index,
+            data,
+            buf.timestamp.secs + buf.timestamp.usecs / 1e6,
+            buf.sequence,
+        )
+
+    def release(self, buffer: V4lBuffer) -> None:
+        """Queues a dequeued buffer again to be filled by the driver."""
+        if self.f_cam is None or self.f_cam.closed:
+            return
+        self._ioctl(v4l2.VIDIOC_QBUF, self._new_buffer(buffer.index))
+
+    def close(self) -> None:
+        if self.f_cam is None or self.f_cam.closed:
+            return
 
-    def get_frame(self):
-        try:
-            buf = self.buffers[0][0]
-            ioctl(self.f_cam, v4l2.VIDIOC_DQBUF, buf)
-
-            frame = self.buffers[buf.index][1][: buf.bytesused]
-            ioctl(self.f_cam, v4l2.VIDIOC_QBUF, buf)
-        except Exception:
-            self._stop()
-        else:
-            return frame
+        self._ioctl(
+            v4l2.VIDIOC_STREAMOFF,
+            v4l2.ctypes.c_int(v4l2.V4L2_BUF_TYPE_VIDEO_CAPTURE),
+        )
+        for buffer_map in self._mmaps:
+            # Views of unreleased buffers may still exist, unmapped once collected
+            with contextlib.suppress(BufferError):
+                buffer_map.close()
+        self._mmaps = []
+        self.f_cam.close()
@@ -0,0 +1,379 @@
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.ir_plane_tracker import Tracker, TrackerParams
+
+
+@dataclass
+class FrameResult:
+    detected: bool
+    reprojection_error: float | None
+    """Reprojection error of the localization in pixels."""
+    corner_error: float | None
+    """Mean distance to the ground truth corners in pixels, if known."""
+    latency_ms: float | None
+    """Tracking time in milliseconds. Not cached, as it depends on the machine and
+    its load at the time."""
+
+
+@dataclass
+class SweepResult:
+    overrides: dict
+    """Parameters of the configuration that differ from the base parameters."""
+    detection_rate: float
+    reprojection_error: float
+    corner_error: float
+    latency_ms: float
+    """Mean tracking time in milliseconds of the frames tracked in this run."""
+
+
+class SharedFrames:
+    """A stack of equally sized frames in shared memory.
+
+    The frames are copied once by the creating process. Worker processes attach to
+    the memory block by name and access the frames without copying or pickling them.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        dtype: npt.DTypeLike = np.uint8,
+        name: str | None = None,
+    ):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._owner = name is None
+        self.shm = SharedMemory(name=name, create=self._owner, size=size)
+        self.frames: npt.NDArray = np.ndarray(self.shape, self.dtype, self.shm.buf)
+
+    @staticmethod
+    def from_frames(frames: list[npt.NDArray[np.uint8]]) -> "SharedFrames":
+        shared = SharedFrames((len(frames), *frames[0].shape), frames[0].dtype)
+        for i, frame in enumerate(frames):
+            shared.frames[i] = frame
+        return shared
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        # The array view has to be released before the memory can be closed
+        del self.frames
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def params_hash(params: dict) -> str:
+    """Hashes a JSON serializable parameter dict independent of its key order."""
+    return hashlib.sha1(
+        json.dumps(params, sort_keys=True).encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def frame_hash(
+    frame: npt.NDArray[np.uint8], corners: npt.NDArray[np.float64] | None = None
+) -> str:
+    """Hashes a frame along with its ground truth corners, if known."""
+    sha = hashlib.sha1(np.ascontiguousarray(frame).data, usedforsecurity=False)
+    if corners is not None:
+        sha.update(b"/")
+        sha.update(np.ascontiguousarray(corners, dtype=np.float64).data)
+    return sha.hexdigest()
+
+
+def camera_hash(
+    camera_matrix: npt.NDArray[np.float64], dist_coeffs: npt.NDArray[np.float64] | None
+) -> str:
+    """Hashes the camera intrinsics the frames are tracked with."""
+    sha = hashlib.sha1(usedforsecurity=False)
+    for array in (camera_matrix, dist_coeffs):
+        if array is None:
+            sha.update(b"none")
+        else:
+            sha.update(np.ascontiguousarray(array, dtype=np.float64).data)
+        sha.update(b"/")
+    return sha.hexdigest()
+
+
+class ResultCache:
+    """Frame results by (frame hash, camera hash, params hash), persisted as a JSON
+    file.
+
+    Latencies are not cached, results from the cache have none.
+    """
+
+    def __init__(self, path: str | Path | None):
+        self.path = None if path is None else Path(path)
+        self._results: dict[str, dict] = {}
+        if self.path is not None and self.path.exists():
+            with open(self.path) as f:
+                self._results = json.load(f)
+
+    @staticmethod
+    def _key(frame_key: str, camera_key: str, params_key: str) -> str:
+        return f"{frame_key}/{camera_key}/{params_key}"
+
+    def get(
+        self, frame_key: str, camera_key: str, params_key: str
+    ) -> FrameResult | None:
+        result = self._results.get(self._key(frame_key, camera_key, params_key))
+        if result is None:
+            return None
+        return FrameResult(**{**result, "latency_ms": None})
+
+    def put(
+        self, frame_key: str, camera_key: str, params_key: str, result: FrameResult
+    ) -> None:
+        cached = {**result.__dict__}
+        del cached["latency_ms"]
+        self._results[self._key(frame_key, camera_key, params_key)] = cached
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._results, f)
+        tmp_path.replace(self.path)
+
+
+# State of the worker processes, set by _init_worker
+_worker_frames: SharedFrames | None = None
+_worker_camera: tuple[npt.NDArray[np.float64], npt.NDArray[np.float64] | None]
+_worker_corners: npt.NDArray[np.float64] | None = None
+
+
+def _init_worker(
+    frames_name: str,
+    frames_shape: tuple[int, ...],
+    camera_matrix: npt.NDArray[np.float64],
+    dist_coeffs: npt.NDArray[np.float64] | None,
+    corners: npt.NDArray[np.float64] | None,
+) -> None:
+    global _worker_frames, _worker_camera, _worker_corners
+    _worker_frames = SharedFrames(frames_shape, name=frames_name)
+    _worker_camera = (camera_matrix, dist_coeffs)
+    _worker_corners = corners
+
+
+def _evaluate(
+    task: tuple[int, dict, list[int]],
+) -> tuple[int, list[tuple[int, FrameResult]]]:
+    config_idx, params, frame_indices = task
+    assert _worker_frames is not None
+
+    tracker_params = TrackerParams.from_dict(params)
+    tracker_params.debug = False
+    tracker = Tracker(*_worker_camera, tracker_params)
+
+    results = []
+    for frame_idx in frame_indices:
+        image = _worker_frames.frames[frame_idx]
+        start = perf_counter()
+        localization = tracker(image)
+        latency_ms = (perf_counter() - start) * 1000
+
+        reprojection_error = None
+        corner_error = None
+        if localization is not None:
+            reprojection_error = float(tracker.debug.optimization_errors[-1])
+            if _worker_corners is not None:
+                corner_error = float(
+                    np.linalg.norm(
+                        localization.corners - _worker_corners[frame_idx], axis=1
+                    ).mean()
+                )
+        results.append((
+            frame_idx,
+            FrameResult(
+                detected=localization is not None,
+                reprojection_error=reprojection_error,
+                corner_error=corner_error,
+                latency_ms=latency_ms,
+            ),
+        ))
+    return config_idx, results
+
+
+def grid(values: dict[str, list]) -> Iterator[dict]:
+    """Yields all combinations of the given parameter values."""
+    for combination in itertools.product(*values.values()):
+        yield dict(zip(values, combination, strict=True))
+
+
+def random_samples(
+    ranges: dict[str, tuple[float, float]],
+    num_samples: int,
+    rng: np.random.Generator,
+) -> Iterator[dict]:
+    """Yields parameters sampled uniformly from the given inclusive ranges.
+
+    Integer ranges yield integer values.
+    """
+    for _ in range(num_samples):
+        sample = {}
+        for key, (low, high) in ranges.items():
+            if isinstance(low, int) and isinstance(high, int):
+                sample[key] = int(rng.integers(low, high + 1))
+            else:
+                sample[key] = float(rng.uniform(low, high))
+        yield sample
+
+
+def _mean(values: list) -> float:
+    values = [v for v in values if v is not None]
+    return float(np.mean(values)) if values else float("nan")
+
+
+class ParamSweep:
+    """Evaluates tracker parameter configurations on a fixed set of frames.
+
+    The frames are loaded once into shared memory and every configuration is
+    evaluated across a process pool. Frame results are cached by the hash of the
+    frame and its ground truth corners, the intrinsics and the parameters, so
+    extending a sweep without measuring latency only evaluates the new
+    configurations. Latencies are always measured anew.
+    """
+
+    def __init__(
+        self,
+        frames: list[npt.NDArray[np.uint8]],
+        camera_matrix: npt.NDArray[np.float64],
+        dist_coeffs: npt.NDArray[np.float64] | None = None,
+        corners: list[npt.NDArray[np.float64]] | None = None,
+        cache_path: str | Path | None = None,
+        num_workers: int | None = None,
+        chunk_size: int = 8,
+    ):
+        """Creates a ParamSweep instance.
+
+        Args:
+            frames: BGR frames of equal size.
+            camera_matrix: Camera intrinsic matrix of the frames.
+            dist_coeffs: Camera distortion coefficients of the frames.
+            corners: Optional ground truth plane corners of every frame.
+            cache_path: JSON file of the frame result cache. If None, results are
+                only cached in memory.
+            num_workers: Number of worker processes. If None, one per CPU.
+            chunk_size: Number of frames evaluated per task.
+
+        """
+        self.frame_keys = [
+            frame_hash(frame, None if corners is None else corners[i])
+            for i, frame in enumerate(frames)
+        ]
+        self.camera_key = camera_hash(camera_matrix, dist_coeffs)
+        self.cache = ResultCache(cache_path)
+        self.chunk_size = chunk_size
+
+        self._frames = SharedFrames.from_frames(frames)
+        corners_array = None if corners is None else np.array(corners)
+        self._pool = mp.get_context("spawn").Pool(
+            num_workers,
+            initializer=_init_worker,
+            initargs=(
+                self._frames.name,
+                self._frames.shape,
+                camera_matrix,
+                dist_coeffs,
+                corners_array,
+            ),
+        )
+
+    def __enter__(self) -> "ParamSweep":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+        self._frames.close()
+
+    def run(
+        self,
+        base_params: dict,
+        configurations: Iterable[dict],
+        measure_latency: bool = True,
+    ) -> list[SweepResult]:
+        """Evaluates the given configurations.
+
+        Args:
+            base_params: Parameter dict as stored in a params JSON file.
+            configurations: Parameter overrides of every configuration.
+            measure_latency: Track all frames to measure the latency of every
+                configuration. Otherwise only frames without cached results are
+                tracked, and the latency covers only those.
+
+        Returns:
+            Aggregated results of every configuration, in the given order.
+
+        """
+        configurations = list(configurations)
+        params_keys = []
+        tasks = []
+        for config_idx, overrides in enumerate(configurations):
+            params = {**base_params, **overrides}
+            params_key = params_hash(params)
+            params_keys.append(params_key)
+
+            missing = [
+                frame_idx
+                for frame_idx, frame_key in enumerate(self.frame_keys)
+                if measure_latency
+                or self.cache.get(frame_key, self.camera_key, params_key) is None
+            ]
+            tasks.extend(
+                (config_idx, params, missing[i : i + self.chunk_size])
+                for i in range(0, len(missing), self.chunk_size)
+            )
+
+        latencies: list[list[float]] = [[] for _ in configurations]
+        try:
+            for config_idx, results in self._pool.imap_unordered(_evaluate, tasks):
+                for frame_idx, result in results:
+                    assert result.latency_ms is not None
+                    latencies[config_idx].append(result.latency_ms)
+                    self.cache.put(
+                        self.frame_keys[frame_idx],
+                        self.camera_key,
+                        params_keys[config_idx],
+                        result,
+                    )
+        finally:
+            self.cache.save()
+
+        sweep_results = []
+        for config_idx, overrides in enumerate(configurations):
+            params_key = params_keys[config_idx]
+            frame_results = [
+                self.cache.get(frame_key, self.camera_key, params_key)
+                for frame_key in self.frame_keys
+            ]
+            frame_results = [r for r in frame_results if r is not None]
+            sweep_results.append(
+                SweepResult(
+                    overrides=overrides,
+                    detection_rate=_mean([r.detected for r in frame_results]),
+                    reprojection_error=_mean([
+                        r.reprojection_error for r in frame_results
+                    ]),
+                    corner_error=_mean([r.corner_error for r in frame_results]),
+                    latency_ms=_mean(latencies[config_idx]),
+                )
+            )
+        return sweep_results
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.ir_plane_tracker import Tracker, TrackerParams
+
+NEON_SCENE_CAMERA_MATRIX = np.array([
+    [890.0, 0.0, 800.0],
+    [0.0, 890.0, 600.0],
+    [0.0, 0.0, 1.0],
+])
+NEON_SCENE_RESOLUTION = (1600, 1200)
+
+
+@dataclass
+class SyntheticFrame:
+    image: npt.NDArray[np.uint8]
+    """Rendered BGR image."""
+    rvec: npt.NDArray[np.float64]
+    """Ground truth rotation of the plane in camera coordinates."""
+    tvec: npt.NDArray[np.float64]
+    """Ground truth translation of the plane in camera coordinates."""
+    corners: npt.NDArray[np.float64]
+    """Ground truth corners of the plane in image coordinates."""
+
+
+class SyntheticScene:
+    """Renders the marker layout described by the tracker params from arbitrary
+    camera poses.
+
+    The markers are drawn as white features on black background patches on a
+    canvas in plane coordinates, which is then warped into the camera image.
+    """
+
+    def __init__(
+        self,
+        params: TrackerParams,
+        camera_matrix: npt.NDArray[np.float64] = NEON_SCENE_CAMERA_MATRIX,
+        resolution: tuple[int, int] = NEON_SCENE_RESOLUTION,
+        px_per_mm: float = 4.0,
+    ):
+        self.params = params
+        self.camera_matrix = camera_matrix
+        self.resolution = resolution
+        self.px_per_mm = px_per_mm
+
+        obj_point_map = Tracker(camera_matrix, None, params).obj_point_map
+        self._canvas, self._canvas2plane = self._render_canvas(obj_point_map)
+
+    @property
+    def plane_corners(self) -> npt.NDArray[np.float64]:
+        return np.array([
+            [0, 0, 0],
+            [self.params.plane_width, 0, 0],
+            [self.params.plane_width, self.params.plane_height, 0],
+            [0, self.params.plane_height, 0],
+        ]).astype(np.float64)
+
+    def _render_canvas(
+        self, obj_point_map: dict
+    ) -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.float64]]:
+        params = self.params
+        points = np.concatenate(list(obj_point_map.values()))[:, :2]
+        margin = params.padding_mm + params.circle_diameter_mm + 20
+        x_min = min(points[:, 0].min(), 0) - margin
+        y_min = min(points[:, 1].min(), 0) - margin
+        x_max = max(points[:, 0].max(), params.plane_width) + margin
+        y_max = max(points[:, 1].max(), params.plane_height) + margin
+
+        s = self.px_per_mm
+        width = int((x_max - x_min) * s)
+        height = int((y_max - y_min) * s)
+
+        def to_canvas(p: npt.NDArray[np.float64]) -> tuple[int, int]:
+            return (int(round((p[0] - x_min) * s)), int(round((p[1] - y_min) * s)))
+
+        canvas = np.full((height, width), 90, dtype=np.uint8)
+        cv2.rectangle(
+            canvas,
+            to_canvas(np.array([0.0, 0.0])),
+            to_canvas(np.array([params.plane_width, params.plane_height])),
+            170,
+            -1,
+        )
+
+        # Every marker consists of a line between its first two points and two
+        # circles at the remaining points.
+        extent = params.padding_mm + params.circle_diameter_mm / 2
+        for marker_points in obj_point_map.values():
+            marker_points = marker_points[:, :2]
+            cv2.rectangle(
+                canvas,
+                to_canvas(marker_points.min(axis=0) - extent),
+                to_canvas(marker_points.max(axis=0) + extent),
+                0,
+                -1,
+            )
+            # Lines have square ends like the ones of the feature overlay
+            direction = marker_points[1] - marker_points[0]
+            normal = np.array([-direction[1], direction[0]])
+            normal *= params.line_thickness_mm / 2 / np.linalg.norm(normal)
+            line_corners = [
+                marker_points[0] + normal,
+                marker_points[1] + normal,
+                marker_points[1] - normal,
+                marker_points[0] - normal,
+            ]
+            cv2.fillConvexPoly(
+                canvas, np.array([to_canvas(p) for p in line_corners]), 255
+            )
+            for center in marker_points[2:]:
+                cv2.circle(
+                    canvas,
+                    to_canvas(center),
+                    max(1, int(params.circle_diameter_mm / 2 * s)),
+                    255,
+                    -1,
+                )
+
+        canvas2plane = np.array([
+            [1 / s, 0, x_min],
+            [0, 1 / s, y_min],
+            [0, 0, 1],
+        ])
+        return canvas, canvas2plane
+
+    def render(
+        self,
+        rvec: npt.NDArray[np.float64],
+        tvec: npt.NDArray[np.float64],
+        noise_std: float = 3.0,
+        rng: np.random.Generator | None = None,
+    ) -> SyntheticFrame:
+        if rng is None:
+            rng = np.random.default_rng()
+
+        R, _ = cv2.Rodrigues(rvec)
+        plane2img = self.camera_matrix @ np.column_stack((R[:, 0], R[:, 1], tvec))
+        img = cv2.warpPerspective(
+            self._canvas,
+            plane2img @ self._canvas2plane,
+            self.resolution,
+            flags=cv2.INTER_AREA,
+        )
+        img = img + rng.normal(0, noise_std, img.shape)
+        img = np.clip(img, 0, 255).astype(np.uint8)
+
+        corners, _ = cv2.projectPoints(
+            self.plane_corners, rvec, tvec, self.camera_matrix, None
+        )
+        return SyntheticFrame(
+            image=cv2.cvtColor(img, cv2.COLOR_GRAY2BGR),
+            rvec=rvec,
+            tvec=tvec,
+            corners=corners.squeeze().astype(np.float64),
+        )
+
+    def random_pose(
+        self,
+        rng: np.random.Generator,
+        distance_range_mm: tuple[float, float] = (450.0, 650.0),
+        max_angle_rad: float = 0.35,
+        max_offset_mm: float = 60.0,
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        rvec = rng.uniform(-max_angle_rad, max_angle_rad, 3)
+        rvec[2] *= 0.5
+        R, _ = cv2.Rodrigues(rvec)
+
+        center = np.array([
+            self.params.plane_width / 2,
+            self.params.plane_height / 2,
+            0,
+        ])
+        plane_center_cam = np.array([
+            rng.uniform(-max_offset_mm, max_offset_mm),
+            rng.uniform(-max_offset_mm, max_offset_mm),
+            rng.uniform(*distance_range_mm),
+        ])
+        tvec = plane_center_cam - R @ center
+        return rvec.reshape(3, 1), tvec.reshape(3, 1)
+
+
+def make_corpus(
+    params: TrackerParams,
+    num_frames: int,
+    seed: int = 0,
+    camera_matrix: npt.NDArray[np.float64] = NEON_SCENE_CAMERA_MATRIX,
+) -> list[SyntheticFrame]:
+    """Renders a reproducible set of frames from random camera poses."""
+    rng = np.random.default_rng(seed)
+    scene = SyntheticScene(params, camera_matrix)
+    frames = []
+    for _ in range(num_frames):
+        rvec, tvec = scene.random_pose(rng)
+        frames.append(scene.render(rvec, tvec, rng=rng))
+    return frames
@@ -47,6 +47,11 @@ class AppWindow(QWidget):
 
         layout.addWidget(self.tabs)
 
+        self.last_data: (
+            tuple[EyeTrackingData, PlaneLocalization | None, DebugData] | None
+        ) = None
+        self.tabs.currentChanged.connect(self._update_current_view)
+
     def set_tracker_params(self, params: TrackerParams) -> None:
         for view in self.tabs.findChildren(views.View):
             view.set_tracker_params(params)
@@ -60,7 +65,11 @@ class AppWindow(QWidget):
         plane_localization: PlaneLocalization,
         debug: DebugData,
     ):
-        for view in self.tabs.findChildren(views.View):
-            view.set_data(eye_tracking_data, plane_localization, debug)
-
-        self.markers_view.set_data(eye_tracking_data, plane_localization, debug)
+        # Only the visible view is updated, the others catch up when selected
+        self.last_data = (eye_tracking_data, plane_localization, debug)
+        self._update_current_view()
+
+    def _update_current_view(self) -> None:
+        view = self.tabs.currentWidget()
+        if self.last_data is not None and isinstance(view, views.View):
+            view.set_data(*self.last_data)
@@ -0,0 +1,63 @@
+import threading
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from pupil_labs.ir_plane_tracker import Tracker, TrackerParams
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import EyeTrackingData
+
+
+class TrackingWorker(QObject):
+    """Runs the tracker on a separate thread.
+
+    Frames are passed through a mailbox holding only the latest frame. Frames which
+    are submitted while the tracker is busy replace each other, so the worker always
+    continues with the most recent one instead of building up a backlog.
+    """
+
+    tracked = Signal(object, object, object)
+    _frame_submitted = Signal()
+
+    def __init__(self, tracker: Tracker):
+        super().__init__()
+        self.tracker = tracker
+        self._lock = threading.Lock()
+        self._data: EyeTrackingData | None = None
+        self._params: TrackerParams | None = None
+
+        self._thread = QThread()
+        self._thread.setObjectName("TrackingWorker")
+        self.moveToThread(self._thread)
+        self._frame_submitted.connect(self._process)
+        self._thread.start()
+
+    def submit(self, data: EyeTrackingData) -> None:
+        """Replaces the frame in the mailbox. Can be called from any thread."""
+        with self._lock:
+            self._data = data
+        self._frame_submitted.emit()
+
+    def set_params(self, params: TrackerParams) -> None:
+        """Sets the parameters used from the next frame on.
+
+        A snapshot is taken so that parameter changes never take effect in the
+        middle of a frame.
+        """
+        with self._lock:
+            self._params = params.snapshot()
+
+    def stop(self) -> None:
+        self._thread.quit()
+        self._thread.wait()
+
+    def _process(self) -> None:
+        with self._lock:
+            data, self._data = self._data, None
+            params, self._params = self._params, None
+        if params is not None:
+            self.tracker.params = params
+        # The frame was already processed in response to an earlier submission
+        if data is None:
+            return
+
+        plane_localization = self.tracker(data.scene_image_undistorted)
+        self.tracked.emit(data, plane_localization, self.tracker.debug)
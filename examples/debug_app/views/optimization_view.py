@@ -69,9 +69,10 @@ class OptimizationView(View):
                         1,
                     )
 
+            fast_path = " (fast path)" if debug.fast_path else ""
             cv2.putText(
                 vis,
-                f"Final Error: {debug.optimization_errors[-1]:.2f}",
+                f"Final Error: {debug.optimization_errors[-1]:.2f}{fast_path}",
                 (50, 50),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 1,
@@ -1,6 +1,7 @@
 import click
 import qdarktheme
 from debug_app.app_window import AppWindow
+from debug_app.tracking_worker import TrackingWorker
 from PySide6.QtCore import QTimer, Signal
 from PySide6.QtWidgets import QApplication
 
@@ -36,6 +37,9 @@ class DebugApp(QApplication):
             params=self.params,
         )
 
+        # Tracking runs on a worker thread so the UI stays responsive
+        self.tracking_worker = TrackingWorker(self.tracker)
+
         self.main_window = AppWindow()
 
         if feature_overlay:
@@ -44,23 +48,25 @@ class DebugApp(QApplication):
 
         # Connections
         self.data_changed.connect(self.main_window.set_data)
+        self.tracking_worker.tracked.connect(self.data_changed)
 
         self.main_window.playback_toggled.connect(
             lambda: setattr(self, "playback", not self.playback)
         )
-        self.main_window.next_frame_clicked.connect(self.update_data)
+        self.main_window.next_frame_clicked.connect(self.next_frame)
         self.main_window.param_updated.connect(
             lambda key, val: self.params.update_params({key: val})
         )
         self.params.changed.connect(self.main_window.set_tracker_params)
+        self.params.changed.connect(self.on_params_changed)
 
         if feature_overlay:
             self.params.changed.connect(self.feature_overlay.update_marker_positions)
 
         # Initialization
-        self.params.changed.emit(self.params)
         self.playback = False
         self.last_data = None
+        self.params.changed.emit(self.params)
 
         # Start
         self.poll_timer = QTimer()
@@ -74,17 +80,29 @@ class DebugApp(QApplication):
         eye_tracking_data = self.eye_tracking_source.get_sample()
         self.last_data = eye_tracking_data
 
+    def next_frame(self):
+        self.update_data()
+        self.track()
+
+    def on_params_changed(self, params):
+        self.tracking_worker.set_params(params)
+        # While paused, the current frame is tracked again with the new params
+        if not self.playback:
+            self.track()
+
+    def track(self):
+        if self.last_data is not None:
+            self.tracking_worker.submit(self.last_data)
+
     def poll(self):
         if self.playback or self.last_data is None:
             self.update_data()
-
-        assert self.last_data is not None
-        plane_localization = self.tracker(self.last_data.scene_image_undistorted)
-        assert self.last_data is not None
-        self.data_changed.emit(self.last_data, plane_localization, self.tracker.debug)
+            self.track()
 
     def exec(self):
         ret = super().exec()
+        self.poll_timer.stop()
+        self.tracking_worker.stop()
         self.eye_tracking_source.close()
         return ret
 
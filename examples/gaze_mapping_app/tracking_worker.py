@@ -0,0 +1,223 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+from PySide6.QtCore import QObject, Signal
+
+from pupil_labs.ir_plane_tracker import DebugData, PlaneLocalization, Tracker
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import (
+    EyeTrackingData,
+    EyeTrackingSource,
+    SampleTimeoutError,
+)
+from pupil_labs.ir_plane_tracker.tracker import TrackerParams
+
+
+@dataclass
+class TrackingResult:
+    eye_tracking_data: EyeTrackingData
+    plane_localization: PlaneLocalization | None
+    debug: DebugData
+    gaze_mapped: npt.NDArray[np.float64] | None
+    """Gaze point in normalized plane coordinates."""
+    received_at: float
+    """`time.perf_counter` at which the sample was received from the source."""
+    tracked_at: float
+    """`time.perf_counter` at which tracking of the sample finished."""
+
+    @property
+    def latency(self) -> float:
+        """Seconds since the scene frame was captured.
+
+        Live sources timestamp their samples with the Unix time of capture. For
+        recordings this is the time since they were recorded instead.
+        """
+        return (time.time_ns() - self.eye_tracking_data.time) / 1e9
+
+
+class CaptureTrackingWorker(QObject):
+    """Pulls samples from an eye tracking source and tracks them on a separate thread.
+
+    Results are handed over through a mailbox holding only the latest result, which
+    is announced by the queued `result_ready` signal. Results replaced before they
+    were taken are stale and counted as dropped, so a slow consumer never delays
+    capture and tracking.
+
+    Sources are only used and closed by the worker thread. Failures are reported
+    through the `error` signal, and a source which ended or failed is closed and
+    announced by `source_ended`. Timeouts of a source are reported once per outage
+    and waited out, and samples repeating the previous one are not tracked again.
+    """
+
+    result_ready = Signal()
+    error = Signal(str)
+    """Emitted with a message if receiving or tracking a sample failed."""
+    source_ended = Signal(object)
+    """Emitted with the current source when it ran out of samples and was closed."""
+
+    def __init__(self, tracker: Tracker):
+        super().__init__()
+        self.tracker = tracker
+        self.dropped_count = 0
+        """Number of results which were replaced before they were taken."""
+
+        self._lock = threading.Lock()
+        self._running = True
+        self._source: EyeTrackingSource | None = None
+        self._next_source: EyeTrackingSource | None = None
+        self._source_changed = False
+        self._params: TrackerParams | None = None
+        self._result: TrackingResult | None = None
+        self._closed = False
+
+        # A plain thread, since the capture loop never returns to an event loop.
+        # Signals emitted from it are queued to the receivers in the GUI thread.
+        self._thread = threading.Thread(
+            target=self._run, name="CaptureTrackingWorker", daemon=True
+        )
+        self._thread.start()
+
+    def set_source(self, source: EyeTrackingSource | None) -> None:
+        """Replaces the eye tracking source.
+
+        The previous source is closed by the worker once its pending sample was
+        received. A source set after the worker stopped is closed right away.
+        """
+        with self._lock:
+            if self._closed:
+                unused = source
+            else:
+                # A source which the worker did not pick up yet was never used
+                unused = self._next_source if self._source_changed else None
+                if unused is source:
+                    unused = None
+                self._next_source = source
+                self._source_changed = True
+        if unused is not None:
+            unused.close()
+
+    def set_params(self, params: TrackerParams) -> None:
+        """Sets the parameters used from the next sample on."""
+        with self._lock:
+            self._params = params.snapshot()
+
+    def take_result(self) -> TrackingResult | None:
+        """Returns the latest result, or None if it was already taken."""
+        with self._lock:
+            result, self._result = self._result, None
+        return result
+
+    def stop(self) -> None:
+        """Stops the worker and waits until it closed the sources.
+
+        This takes until the sample the source is waiting for was received or timed
+        out, which live sources do after a fraction of a second.
+        """
+        self._running = False
+        self._thread.join()
+
+    def _close_sources(self) -> None:
+        with self._lock:
+            next_source = self._next_source if self._source_changed else None
+            self._next_source = None
+            self._source_changed = False
+            self._closed = True
+        source, self._source = self._source, None
+        if source is not None:
+            source.close()
+        if next_source is not None and next_source is not source:
+            next_source.close()
+
+    def _update_state(self) -> None:
+        with self._lock:
+            params, self._params = self._params, None
+            source_changed, self._source_changed = self._source_changed, False
+            next_source, self._next_source = self._next_source, None
+
+        if params is not None:
+            self.tracker.params = params
+        if source_changed and next_source is not self._source:
+            if self._source is not None:
+                self._source.close()
+            self._source = next_source
+            if next_source is not None:
+                self.tracker.camera_matrix = next_source.scene_intrinsics.camera_matrix
+
+    def _run(self) -> None:
+        try:
+            self._capture_and_track()
+        finally:
+            self._close_sources()
+
+    def _capture_and_track(self) -> None:
+        timed_out = False
+        last_time: int | None = None
+        while self._running:
+            self._update_state()
+            if self._source is None:
+                time.sleep(0.01)
+                continue
+
+            try:
+                eye_tracking_data = self._source.get_sample()
+            except SampleTimeoutError as e:
+                # Keep on waiting, but report every outage only once
+                if not timed_out:
+                    self.error.emit(f"Failed to receive sample: {e}")
+                timed_out = True
+                continue
+            except StopIteration:
+                self._end_source()
+                continue
+            except Exception as e:
+                self.error.emit(f"Eye tracking source failed: {e}")
+                self._end_source()
+                continue
+            timed_out = False
+            if eye_tracking_data.time == last_time:
+                # Live sources return their newest sample until a new one arrives
+                time.sleep(0.001)
+                continue
+            last_time = eye_tracking_data.time
+            received_at = time.perf_counter()
+
+            try:
+                result = self._track(eye_tracking_data, received_at)
+            except Exception as e:
+                self.error.emit(f"Failed to track sample: {e}")
+                continue
+
+            with self._lock:
+                if self._result is not None:
+                    self.dropped_count += 1
+                self._result = result
+            self.result_ready.emit()
+
+    def _end_source(self) -> None:
+        source, self._source = self._source, None
+        if source is not None:
+            source.close()
+            self.source_ended.emit(source)
+
+    def _track(
+        self, eye_tracking_data: EyeTrackingData, received_at: float
+    ) -> TrackingResult:
+        plane_localization = self.tracker(eye_tracking_data.scene_image_undistorted)
+        gaze_mapped = None
+        if plane_localization is not None:
+            gaze = eye_tracking_data.gaze_scene_distorted
+            if gaze is not None:
+                gaze_mapped = plane_localization.img2plane @ [*gaze, 1]
+                gaze_mapped = gaze_mapped / gaze_mapped[2]
+                gaze_mapped = gaze_mapped[:2]
+
+        return TrackingResult(
+            eye_tracking_data=eye_tracking_data,
+            plane_localization=plane_localization,
+            debug=self.tracker.debug,
+            gaze_mapped=gaze_mapped,
+            received_at=received_at,
+            tracked_at=time.perf_counter(),
+        )
@@ -1,6 +1,10 @@
+from collections import deque
+
 import click
+import numpy as np
 from gaze_mapping_app.app_window import MainWindow
 from gaze_mapping_app.gaze_overlay import GazeOverlay
+from gaze_mapping_app.tracking_worker import CaptureTrackingWorker
 from PySide6.QtCore import QTimer, Signal
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtWidgets import QApplication
@@ -30,6 +34,9 @@ class GazeMappingApp(QApplication):
         self.camera_matrix = None
         self.dist_coeffs = None
         self.params = TrackerParamsWrapper.from_json(params_path)
+        # Gaze mapping only needs the plane homography, which can be estimated
+        # without knowing the camera intrinsics.
+        self.params.update_params({"homography_only": True})
         self.tracker = Tracker(
             camera_matrix=self.camera_matrix,
             dist_coeffs=None,
@@ -45,6 +52,15 @@ class GazeMappingApp(QApplication):
             "feature_point_positions_mm": self.tracker.params.feature_point_positions_mm,  # noqa: E501
         }
 
+        # Capture and tracking run on a worker thread, which hands over only the
+        # latest result so the overlays never lag behind
+        self.tracking_worker = CaptureTrackingWorker(self.tracker)
+        self.tracking_worker.set_params(self.params)
+        self.latencies: deque[float] = deque(maxlen=100)
+        """Recent times from capturing a scene frame to displaying its result."""
+        self.tracking_durations: deque[float] = deque(maxlen=100)
+        self.displayed_count = 0
+
         if neon_ip is not None:
             device = NeonRemote(ip_address=neon_ip, port=neon_port)
             self.on_new_source_connected(device)
@@ -68,6 +84,10 @@ class GazeMappingApp(QApplication):
 
         self.data_changed.connect(self.main_window.set_data)
         self.data_changed.connect(self.gaze_overlay.set_data)
+        self.tracking_worker.result_ready.connect(self.on_result_ready)
+        self.tracking_worker.error.connect(self.on_tracking_error)
+        self.tracking_worker.source_ended.connect(self.on_source_ended)
+        self.params.changed.connect(self.tracking_worker.set_params)
         self.main_window.feature_overlay_toggled.connect(self.toggle_feature_overlay)
         self.main_window.gaze_overlay_toggled.connect(
             lambda: self.gaze_overlay.toggle_visibility()
@@ -75,10 +95,10 @@ class GazeMappingApp(QApplication):
 
         self.main_window.show()
 
-        self.poll_timer = QTimer()
-        self.poll_timer.setInterval(int(1000 / 30))
-        self.poll_timer.timeout.connect(self.poll)
-        self.poll_timer.start()
+        self.report_timer = QTimer()
+        self.report_timer.setInterval(1000)
+        self.report_timer.timeout.connect(self.report_latency)
+        self.report_timer.start()
 
     def close_app(self):
         print("CLOSING APP")
@@ -86,27 +106,36 @@ class GazeMappingApp(QApplication):
         self.feature_overlay.close()
         self.gaze_overlay.hide()
         self.gaze_overlay.close()
-        self.eye_tracking_source.close()
+        self.tracking_worker.stop()
+        self.eye_tracking_source = None
         self.main_window.source_widget.close()
         self.main_window.hide()
         self.main_window.close()
         self.quit()
 
     def on_new_source_connected(self, source: EyeTrackingSource):
-        if self.eye_tracking_source is not None:
-            self.eye_tracking_source.close()
+        # The worker closes the previous source and updates the tracker
+        self.tracking_worker.set_source(source)
         self.eye_tracking_source = source
         self.camera_matrix = self.eye_tracking_source.scene_intrinsics.camera_matrix
         self.dist_coeffs = (
             self.eye_tracking_source.scene_intrinsics.distortion_coefficients
         )
-        self.tracker.camera_matrix = self.camera_matrix
 
     def on_source_disconnect_requested(self):
         if self.eye_tracking_source is not None:
-            self.eye_tracking_source.close()
+            self.tracking_worker.set_source(None)
+            self.eye_tracking_source = None
+
+    def on_source_ended(self, source: EyeTrackingSource):
+        print("Eye tracking source ended.")
+        # Another source may have been connected in the meantime
+        if source is self.eye_tracking_source:
             self.eye_tracking_source = None
 
+    def on_tracking_error(self, message: str):
+        print(message)
+
     def toggle_feature_overlay(self):
         if self.feature_overlay.isVisible():
             self.feature_overlay.toggle_visibility()
@@ -126,25 +155,36 @@ class GazeMappingApp(QApplication):
             self.feature_overlay.toggle_visibility()
             self.feature_overlay.update_marker_positions()
 
-    def poll(self):
-        if self.eye_tracking_source is not None:
-            eye_tracking_data = self.eye_tracking_source.get_sample()
-            plane_localization = self.tracker(eye_tracking_data.scene_image_undistorted)
-            gaze_mapped = None
-            if plane_localization is not None:
-                gaze = eye_tracking_data.gaze_scene_distorted
-                if gaze is not None:
-                    gaze_mapped = plane_localization.img2plane @ [*gaze, 1]
-                    gaze_mapped = gaze_mapped / gaze_mapped[2]
-                    gaze_mapped = gaze_mapped[:2]
-
-            self.data_changed.emit(
-                eye_tracking_data, plane_localization, self.tracker.debug, gaze_mapped
-            )
+    def on_result_ready(self):
+        result = self.tracking_worker.take_result()
+        # Results announced earlier may have been taken already
+        if result is None:
+            return
+
+        self.data_changed.emit(
+            result.eye_tracking_data,
+            result.plane_localization,
+            result.debug,
+            result.gaze_mapped,
+        )
+        self.displayed_count += 1
+        self.latencies.append(result.latency)
+        self.tracking_durations.append(result.tracked_at - result.received_at)
+
+    def report_latency(self):
+        if len(self.latencies) == 0:
+            return
+        self.main_window.setWindowTitle(
+            f"{self.displayed_count} Hz | "
+            f"tracking {np.mean(self.tracking_durations) * 1000:.1f} ms | "
+            f"end-to-end {np.mean(self.latencies) * 1000:.1f} ms | "
+            f"dropped {self.tracking_worker.dropped_count}"
+        )
+        self.displayed_count = 0
 
     def exec(self):
         ret = super().exec()
-        self.eye_tracking_source.close()
+        self.tracking_worker.stop()
         return ret
 
 
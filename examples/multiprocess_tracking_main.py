@@ -0,0 +1,103 @@
+import multiprocessing as mp
+import time
+from pathlib import Path
+
+import click
+
+from pupil_labs.ir_plane_tracker import TrackerParams
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.shared_memory import (
+    SharedFrameRing,
+    publish,
+    track_shared_frames,
+)
+
+
+def open_source(path: Path):
+    if path.is_dir():
+        from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.replay import (
+            ReplaySource,
+        )
+
+        return ReplaySource(path, speed=None)
+
+    from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.video_source import (
+        VideoSource,
+    )
+
+    return VideoSource(path)
+
+
+@click.command()
+@click.argument("source_path", type=click.Path(exists=True))
+@click.option(
+    "--params_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default="resources/params.json",
+    help="Path to tracker parameters JSON file.",
+)
+@click.option("--workers", type=int, default=2, help="Number of tracking processes.")
+@click.option("--slots", type=int, default=8, help="Number of frames in the ring.")
+def main(source_path, params_path, workers, slots):
+    """Captures SOURCE_PATH in this process and tracks it in worker processes.
+
+    SOURCE_PATH is a video file or a folder recorded with replay_main.py. Frames
+    are passed to the workers through shared memory. They are published as fast as
+    the source delivers them, without pacing. Like with a live camera, frames the
+    workers cannot keep up with are overwritten in the ring and skipped.
+    """
+    params = TrackerParams.from_json(params_path)
+    params.debug = False
+    source = open_source(Path(source_path))
+    intrinsics = source.scene_intrinsics
+    # Recordings may hold grayscale or resized images
+    shape = source[0].scene_image_undistorted.shape
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    ring = SharedFrameRing(shape, slots)
+    processes = [
+        ctx.Process(
+            target=track_shared_frames,
+            args=(
+                ring.name,
+                shape,
+                slots,
+                intrinsics.camera_matrix,
+                params,
+                results,
+                worker_index,
+                workers,
+            ),
+        )
+        for worker_index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    start = time.perf_counter()
+    count = publish(source, ring)
+    source.close()
+
+    tracked = []
+    finished = 0
+    while finished < workers:
+        result = results.get()
+        if result is None:
+            finished += 1
+        else:
+            tracked.append(result)
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    ring.close()
+
+    detected = sum(r.localization is not None for r in tracked)
+    print(f"published {count} frames in {elapsed:.2f} s")
+    print(
+        f"tracked {len(tracked)} ({len(tracked) / elapsed:.1f} Hz), "
+        f"skipped {count - len(tracked)}, detected {detected}"
+    )
+
+
+if __name__ == "__main__":
+    main()
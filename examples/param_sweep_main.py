@@ -0,0 +1,183 @@
+import json
+from dataclasses import fields
+from enum import Enum
+from pathlib import Path
+
+import click
+import cv2
+import numpy as np
+from benchmark.sweep import ParamSweep, grid, random_samples
+from benchmark.synthetic import NEON_SCENE_CAMERA_MATRIX, make_corpus
+
+from pupil_labs.ir_plane_tracker import TrackerParams
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+
+
+def load_image_folder(folder: Path, step: int, max_frames: int | None):
+    paths = sorted(p for p in folder.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    return [cv2.imread(str(p)) for p in paths[::step][:max_frames]]
+
+
+def load_recording(folder: Path, step: int, max_frames: int | None):
+    from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.neon_recording import (
+        NeonRecording,
+    )
+
+    source = NeonRecording(folder)
+    indices = range(0, len(source), step)[:max_frames]
+    frames = [source[i].scene_image_distorted for i in indices]
+    source.close()
+    intrinsics = source.scene_intrinsics
+    return frames, intrinsics.camera_matrix, intrinsics.distortion_coefficients
+
+
+def parse_value(name: str, text: str):
+    """Parses a parameter value with the type of the TrackerParams field."""
+    default = getattr(TrackerParams(), name)
+    if isinstance(default, bool):
+        return text.lower() in ("1", "true", "yes")
+    if isinstance(default, Enum):
+        return type(default)(text).value
+    if isinstance(default, int):
+        return int(text)
+    return float(text)
+
+
+def parse_specs(specs: tuple[str, ...], separator: str) -> dict[str, list]:
+    names = {f.name for f in fields(TrackerParams)}
+    parsed = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in names:
+            raise click.BadParameter(f"Unknown tracker parameter {name}.")
+        parsed[name] = [parse_value(name, v) for v in values.split(separator)]
+    return parsed
+
+
+@click.command()
+@click.option(
+    "--params_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default="resources/params.json",
+    help="Path to the base tracker parameters JSON file.",
+)
+@click.option(
+    "--frames",
+    "frames_path",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Folder of images or Neon recording. Defaults to a synthetic corpus.",
+)
+@click.option(
+    "--camera_matrix_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default="resources/camera_matrix.npy",
+    help="Camera matrix of the frames in an image folder.",
+)
+@click.option("--step", type=int, default=1, help="Use every n-th recorded frame.")
+@click.option("--max_frames", type=int, default=100, help="Maximum number of frames.")
+@click.option(
+    "--vary",
+    multiple=True,
+    help="Grid values of a parameter, e.g. --vary thresh_c=10,16,22.",
+)
+@click.option(
+    "--sample",
+    multiple=True,
+    help="Inclusive range of a randomly sampled parameter, e.g. --sample thresh_c=8:24",
+)
+@click.option("--num_samples", type=int, default=20, help="Number of random samples.")
+@click.option("--seed", type=int, default=0, help="Seed of the random samples.")
+@click.option(
+    "--cache_path",
+    type=click.Path(dir_okay=False),
+    default="param_sweep_cache.json",
+    help="Result cache, which allows to extend a sweep without recomputation.",
+)
+@click.option(
+    "--skip_latency",
+    is_flag=True,
+    default=False,
+    help="Only track frames without cached results, instead of measuring the "
+    "latency on all frames.",
+)
+@click.option("--workers", type=int, default=None, help="Number of processes.")
+@click.option("--top", type=int, default=20, help="Number of reported results.")
+def main(
+    params_path,
+    frames_path,
+    camera_matrix_path,
+    step,
+    max_frames,
+    vary,
+    sample,
+    num_samples,
+    seed,
+    cache_path,
+    skip_latency,
+    workers,
+    top,
+):
+    with open(params_path) as f:
+        base_params = json.load(f)
+    base_params["debug"] = False
+
+    corners = None
+    dist_coeffs = None
+    if frames_path is None:
+        print(f"Rendering {max_frames} synthetic frames...")
+        camera_matrix = NEON_SCENE_CAMERA_MATRIX
+        corpus = make_corpus(
+            TrackerParams.from_dict(base_params),
+            max_frames,
+            camera_matrix=camera_matrix,
+        )
+        frames = [frame.image for frame in corpus]
+        corners = [frame.corners for frame in corpus]
+    elif any(p.suffix.lower() in IMAGE_SUFFIXES for p in Path(frames_path).iterdir()):
+        frames = load_image_folder(Path(frames_path), step, max_frames)
+        camera_matrix = np.load(camera_matrix_path)
+    else:
+        frames, camera_matrix, dist_coeffs = load_recording(
+            Path(frames_path), step, max_frames
+        )
+
+    configurations = list(grid(parse_specs(vary, ",")))
+    if sample:
+        ranges = parse_specs(sample, ":")
+        if any(len(bounds) != 2 for bounds in ranges.values()):
+            raise click.BadParameter("Ranges are given as name=low:high.")
+        configurations = [
+            {**config, **random_config}
+            for config in configurations
+            for random_config in random_samples(
+                ranges, num_samples, np.random.default_rng(seed)
+            )
+        ]
+
+    print(f"Evaluating {len(configurations)} configurations on {len(frames)} frames...")
+    with ParamSweep(
+        frames,
+        camera_matrix,
+        dist_coeffs,
+        corners=corners,
+        cache_path=cache_path,
+        num_workers=workers,
+    ) as sweep:
+        results = sweep.run(
+            base_params, configurations, measure_latency=not skip_latency
+        )
+
+    results.sort(key=lambda r: (-r.detection_rate, r.reprojection_error))
+    print(f"{'detected':>9} {'reproj px':>10} {'corner px':>10} {'ms':>7}  parameters")
+    for result in results[:top]:
+        overrides = " ".join(f"{k}={v}" for k, v in result.overrides.items())
+        print(
+            f"{result.detection_rate:>9.1%} {result.reprojection_error:>10.3f} "
+            f"{result.corner_error:>10.3f} {result.latency_ms:>7.2f}  {overrides}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from copy import copy
+from time import perf_counter
+
+import click
+import cv2
+import numpy as np
+from benchmark.synthetic import NEON_SCENE_CAMERA_MATRIX, make_corpus
+
+from pupil_labs.ir_plane_tracker import PnPMethod, Tracker, TrackerParams
+
+
+def detect_combinations(tracker: Tracker, image):
+    """Runs the tracking stages preceding the pose estimation."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    line_contours, ellipse_contours = tracker.get_contours(gray)
+    if len(line_contours) == 0 or len(ellipse_contours) == 0:
+        return None
+    fragments = tracker.fit_line_fragments(line_contours)
+    ellipses = tracker.fit_ellipses_to_contours(ellipse_contours, gray.shape[:2])
+    feature_lines = tracker.find_feature_lines(fragments, ellipses)
+    if len(feature_lines) < tracker.params.min_feature_line_count:
+        return None
+    return tracker.get_possible_combinations(feature_lines)
+
+
+def localize(tracker: Tracker, combinations):
+    """Runs the pose estimation stage and computes the plane localization."""
+    if tracker.params.homography_only:
+        plane2img = tracker.fit_plane_homography(combinations)
+        if plane2img is None:
+            return None
+        return tracker.calculate_localization_from_homography(plane2img)
+
+    rvec, tvec = tracker.fit_camera_pose(combinations)
+    if rvec is None or tvec is None:
+        return None
+    return tracker.calculate_localization(rvec, tvec)
+
+
+@click.command()
+@click.option(
+    "--params_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default="resources/params.json",
+    help="Path to tracker parameters JSON file.",
+)
+@click.option("--num_frames", type=int, default=100, help="Size of the corpus.")
+@click.option("--seed", type=int, default=0, help="Seed of the synthetic corpus.")
+@click.option("--repeats", type=int, default=5, help="Timing repetitions per frame.")
+def main(params_path, num_frames, seed, repeats):
+    params = TrackerParams.from_json(params_path)
+    params.debug = False
+    camera_matrix = NEON_SCENE_CAMERA_MATRIX
+
+    print(f"Rendering {num_frames} synthetic frames...")
+    corpus = make_corpus(params, num_frames, seed=seed, camera_matrix=camera_matrix)
+
+    frontend = Tracker(camera_matrix, None, params)
+    candidates = [
+        (frame, detect_combinations(frontend, frame.image)) for frame in corpus
+    ]
+
+    configs = [(method, refine) for method in PnPMethod for refine in (False, True)]
+    configs.append((None, False))
+
+    print(
+        f"{'method':<15} {'refine':<7} {'detected':>9} {'pose ms':>8} "
+        f"{'reproj px':>10} {'corner px':>10}"
+    )
+    for method, refine in configs:
+        # Copy instead of re-instantiating, which would scale the params again
+        method_params = copy(params)
+        if method is None:
+            method_params.homography_only = True
+        else:
+            method_params.pnp_method = method
+        method_params.pnp_refine = refine
+        tracker = Tracker(camera_matrix, None, method_params)
+
+        durations = []
+        reproj_errors = []
+        corner_errors = []
+        for frame, combinations in candidates:
+            if combinations is None:
+                continue
+
+            for _ in range(repeats):
+                start = perf_counter()
+                localization = localize(tracker, combinations)
+                durations.append(perf_counter() - start)
+
+            if localization is None:
+                continue
+
+            reproj_errors.append(tracker.debug.optimization_errors[-1])
+            corner_errors.append(
+                np.linalg.norm(localization.corners - frame.corners, axis=1).mean()
+            )
+
+        name = "homography-only" if method is None else method.value
+        print(
+            f"{name:<15} {refine!s:<7} "
+            f"{len(corner_errors):>4}/{len(corpus):<4} "
+            f"{np.mean(durations) * 1000:>8.3f} "
+            f"{np.mean(reproj_errors):>10.3f} "
+            f"{np.mean(corner_errors):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import time
+
+import click
+import numpy as np
+
+from pupil_labs.ir_plane_tracker import Tracker, TrackerParams
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import EyeTrackingSource
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.replay import (
+    ReplaySource,
+    record,
+)
+
+
+def open_source(video_path, recording_path, neon_ip, neon_port) -> EyeTrackingSource:
+    if video_path is not None:
+        from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.video_source import (  # noqa: E501
+            VideoSource,
+        )
+
+        return VideoSource(video_path)
+    if recording_path is not None:
+        from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.neon_recording import (  # noqa: E501
+            NeonRecording,
+        )
+
+        return NeonRecording(recording_path)
+    if neon_ip is not None:
+        from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.neon_remote import (  # noqa: E501
+            NeonRemote,
+        )
+
+        return NeonRemote(neon_ip, neon_port)
+
+    from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.neon_usb import (
+        NeonUSB,
+    )
+
+    return NeonUSB()
+
+
+@click.group()
+def main():
+    """Records eye tracking sources and replays them for reproducible benchmarks."""
+
+
+@main.command("record")
+@click.argument("output_path", type=click.Path(file_okay=False))
+@click.option(
+    "--video",
+    "video_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Video file.",
+)
+@click.option(
+    "--recording",
+    "recording_path",
+    type=click.Path(exists=True, file_okay=False),
+    help="Neon recording folder.",
+)
+@click.option(
+    "--neon_ip", type=str, default=None, help="IP address of the Neon device."
+)
+@click.option("--neon_port", type=int, default=8080, help="Port of the Neon device.")
+@click.option("--num_samples", type=int, default=None, help="Samples to record.")
+@click.option("--duration", type=float, default=10.0, help="Seconds to record.")
+def record_command(
+    output_path, video_path, recording_path, neon_ip, neon_port, num_samples, duration
+):
+    """Records a source to OUTPUT_PATH. Defaults to a Neon connected via USB."""
+    source = open_source(video_path, recording_path, neon_ip, neon_port)
+    try:
+        count = record(source, output_path, num_samples=num_samples, duration=duration)
+    finally:
+        source.close()
+    print(f"Recorded {count} samples to {output_path}.")
+
+
+@main.command("benchmark")
+@click.argument("replay_path", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--params_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default="resources/params.json",
+    help="Path to tracker parameters JSON file.",
+)
+@click.option(
+    "--speed",
+    type=float,
+    default=None,
+    help="Replay at this factor of the recorded pace instead of as fast as possible.",
+)
+@click.option("--repeat", type=int, default=1, help="Number of passes.")
+def benchmark_command(replay_path, params_path, speed, repeat):
+    """Tracks the samples recorded in REPLAY_PATH and reports the timing."""
+    params = TrackerParams.from_json(params_path)
+    params.debug = False
+    source = ReplaySource(replay_path, speed=speed)
+    tracker = Tracker(source.scene_intrinsics.camera_matrix, None, params)
+
+    durations = []
+    lags = []
+    detected = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        source.seek(0)
+        replay_start = time.perf_counter_ns()
+        while True:
+            try:
+                data = source.get_sample()
+            except StopIteration:
+                break
+            sample_start = time.perf_counter()
+            detected += tracker(data.scene_image_undistorted) is not None
+            durations.append(time.perf_counter() - sample_start)
+            if speed is not None:
+                due = (data.time - source.timestamps[0]) / speed
+                lags.append(time.perf_counter_ns() - replay_start - due)
+    elapsed = time.perf_counter() - start
+    source.close()
+
+    count = len(durations)
+    print(f"{count} samples in {elapsed:.2f} s ({count / elapsed:.1f} Hz)")
+    print(f"detected {detected / count:.1%}")
+    print(
+        f"tracking per sample: mean {np.mean(durations) * 1000:.2f} ms, "
+        f"p95 {np.percentile(durations, 95) * 1000:.2f} ms"
+    )
+    if lags:
+        print(
+            f"behind recorded pace: mean {np.mean(lags) / 1e6:.1f} ms, "
+            f"max {np.max(lags) / 1e6:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,17 @@
 A tool for tracking planes marked with markers.
 """
 
+from pupil_labs.ir_plane_tracker.multi_plane_tracker import MultiPlaneTracker
+from pupil_labs.ir_plane_tracker.streaming import (
+    SampleTimeoutError,
+    TrackedSample,
+    TrackingStream,
+)
 from pupil_labs.ir_plane_tracker.tracker import (
     DebugData,
     LinePositions,
     PlaneLocalization,
+    PnPMethod,
     Tracker,
     TrackerParams,
 )
@@ -14,7 +21,12 @@ from pupil_labs.ir_plane_tracker.tracker import (
 __all__ = [
     "DebugData",
     "LinePositions",
+    "MultiPlaneTracker",
     "PlaneLocalization",
+    "PnPMethod",
+    "SampleTimeoutError",
+    "TrackedSample",
     "Tracker",
     "TrackerParams",
+    "TrackingStream",
 ]
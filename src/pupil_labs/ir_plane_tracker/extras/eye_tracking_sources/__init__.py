@@ -1,3 +1,5 @@
+from pupil_labs.ir_plane_tracker.streaming import SampleTimeoutError
+
 from .eye_tracking_source import EyeTrackingData, EyeTrackingSource
 
-__all__ = ["EyeTrackingData", "EyeTrackingSource"]
+__all__ = ["EyeTrackingData", "EyeTrackingSource", "SampleTimeoutError"]
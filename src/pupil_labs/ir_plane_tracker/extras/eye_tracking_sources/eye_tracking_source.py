@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Callable
 from functools import cached_property
 
 import numpy as np
@@ -7,33 +7,92 @@ import numpy.typing as npt
 
 from pupil_labs.camera import Camera
 
+Image = npt.NDArray[np.uint8]
+ImageHandle = Image | Callable[[], Image]
+"""An image, or a callable decoding it on first access."""
+
+_UNSET = object()
+
 
-@dataclass
 class EyeTrackingData:
-    time: int
-    """Timestamp of the data sample in nanoseconds."""
+    """A sample of an eye tracking source.
 
-    scene_image_distorted: npt.NDArray[np.uint8]
-    """Raw and distorted scene image."""
+    Images can be passed as callables, which are only called when the image is
+    first accessed. Sources use this to skip decoding images nobody looks at, such
+    as eye images during batch tracking.
+    """
 
-    gaze_scene_distorted: npt.NDArray[np.float64]
-    """Gaze point in distorted scene image coordinates"""
+    __slots__ = (
+        "_eye_image",
+        "_gaze_scene_undistorted",
+        "_scene_image_distorted",
+        "_scene_image_undistorted",
+        "gaze_scene_distorted",
+        "intrinsics",
+        "time",
+    )
 
-    intrinsics: Camera
-    """Intrinsics of the scene camera."""
+    def __init__(
+        self,
+        time: int,
+        scene_image_distorted: ImageHandle,
+        gaze_scene_distorted: npt.NDArray[np.float64] | None,
+        intrinsics: Camera,
+        eye_image: ImageHandle | None,
+    ):
+        self.time = time
+        """Timestamp of the data sample in nanoseconds."""
 
-    eye_image: npt.NDArray[np.uint8]
-    """Raw eye image."""
+        self.gaze_scene_distorted = gaze_scene_distorted
+        """Gaze point in distorted scene image coordinates"""
 
-    @cached_property
-    def scene_image_undistorted(self) -> npt.NDArray[np.uint8]:
+        self.intrinsics = intrinsics
+        """Intrinsics of the scene camera."""
+
+        self._scene_image_distorted = scene_image_distorted
+        self._eye_image = eye_image
+        self._scene_image_undistorted = _UNSET
+        self._gaze_scene_undistorted = _UNSET
+
+    @property
+    def scene_image_distorted(self) -> Image:
+        """Raw and distorted scene image."""
+        if callable(self._scene_image_distorted):
+            self._scene_image_distorted = self._scene_image_distorted()
+        return self._scene_image_distorted
+
+    @property
+    def eye_image(self) -> Image | None:
+        """Raw eye image."""
+        if callable(self._eye_image):
+            self._eye_image = self._eye_image()
+        return self._eye_image
+
+    @property
+    def eye_image_handle(self) -> ImageHandle | None:
+        """Eye image, or the callable decoding it if it was not accessed yet.
+
+        Lets wrapping sources pass the eye image on without decoding it.
+        """
+        return self._eye_image
+
+    @property
+    def scene_image_undistorted(self) -> Image:
         """Undistorted scene image."""
-        return self.intrinsics.undistort_image(self.scene_image_distorted)
+        if self._scene_image_undistorted is _UNSET:
+            self._scene_image_undistorted = self.intrinsics.undistort_image(
+                self.scene_image_distorted
+            )
+        return self._scene_image_undistorted  # type: ignore[return-value]
 
-    @cached_property
+    @property
     def gaze_scene_undistorted(self) -> npt.NDArray[np.float64]:
         """Gaze point in undistorted scene image coordinates"""
-        return self.intrinsics.undistort_points(self.gaze_scene_distorted)
+        if self._gaze_scene_undistorted is _UNSET:
+            self._gaze_scene_undistorted = self.intrinsics.undistort_points(
+                self.gaze_scene_distorted
+            )
+        return self._gaze_scene_undistorted  # type: ignore[return-value]
 
 
 class EyeTrackingSource(ABC):
@@ -0,0 +1,126 @@
+from threading import Lock
+
+import numpy as np
+import numpy.typing as npt
+
+from .matching import match_nearest
+
+NEON_SCENE_FRAME_INTERVAL = 1_000_000_000 // 30
+"""Time between two frames of the Neon scene camera in nanoseconds."""
+
+NEON_GAZE_INTERVAL = 1_000_000_000 // 200
+"""Time between two Neon gaze samples in nanoseconds."""
+
+MAX_GAZE_AGE = 4 * NEON_GAZE_INTERVAL
+"""Maximum time in nanoseconds by which a gaze sample matched to a scene frame may
+lie outside of the frame's window."""
+
+
+def interval_means(
+    timestamps: npt.NDArray[np.int64],
+    gaze: npt.NDArray[np.float64],
+    starts: npt.NDArray[np.int64],
+    ends: npt.NDArray[np.int64],
+) -> npt.NDArray[np.float64]:
+    """Averages the gaze samples within each of the intervals [start, end).
+
+    The timestamps have to be sorted. Intervals without samples get NaN.
+    """
+    first = np.searchsorted(timestamps, starts, side="left")
+    last = np.searchsorted(timestamps, ends, side="left")
+    counts = last - first
+    # Sums over any index range are differences of the cumulative sums
+    cumsum = np.zeros((len(gaze) + 1, 2), dtype=np.float64)
+    np.cumsum(gaze, axis=0, out=cumsum[1:])
+    sums = cumsum[last] - cumsum[first]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means: npt.NDArray[np.float64] = sums / counts[:, np.newaxis]
+    return means
+
+
+def _nearest_index(timestamps: npt.NDArray[np.int64], time: int) -> int:
+    if len(timestamps) == 1:
+        return 0
+    return int(match_nearest(np.array([time]), timestamps)[0])
+
+
+class GazeBuffer:
+    """Keeps the most recent gaze samples of a source ordered by their timestamps.
+
+    Sources feed gaze as it arrives and look up the gaze of a scene frame by its
+    capture timestamp, using binary search. The gaze of a frame is thus the same
+    no matter how late the frame is fetched or tracked, as long as the samples are
+    still buffered. Samples have to be put in the order of their timestamps.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._gaze = np.zeros((capacity, 2), dtype=np.float64)
+        self._count = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def put(
+        self, timestamps: npt.NDArray[np.int64], gaze: npt.NDArray[np.float64]
+    ) -> None:
+        """Adds a batch of gaze samples with their timestamps in nanoseconds."""
+        timestamps = timestamps[-self.capacity :]
+        gaze = gaze[-self.capacity :]
+        with self._lock:
+            idxs = np.arange(self._count, self._count + len(timestamps)) % self.capacity
+            self._timestamps[idxs] = timestamps
+            self._gaze[idxs] = gaze
+            self._count += len(timestamps)
+
+    def append(self, timestamp: int, x: float, y: float) -> None:
+        """Adds a single gaze sample with its timestamp in nanoseconds."""
+        with self._lock:
+            idx = self._count % self.capacity
+            self._timestamps[idx] = timestamp
+            self._gaze[idx] = x, y
+            self._count += 1
+
+    def snapshot(self) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Returns copies of the buffered timestamps and gaze, oldest first."""
+        with self._lock:
+            n = len(self)
+            # The oldest sample is the next to be overwritten
+            order = (np.arange(n) + self._count - n) % self.capacity
+            return self._timestamps[order], self._gaze[order]
+
+    def nearest(self, time: int) -> npt.NDArray[np.float64] | None:
+        """Returns the gaze sample closest in time, or None if there is none."""
+        timestamps, gaze = self.snapshot()
+        if len(timestamps) == 0:
+            return None
+        nearest: npt.NDArray[np.float64] = gaze[_nearest_index(timestamps, time)]
+        return nearest
+
+    def gaze_at(
+        self, time: int, window: int, max_age: int = MAX_GAZE_AGE
+    ) -> npt.NDArray[np.float64] | None:
+        """Returns the gaze of a scene frame captured at the given time.
+
+        This is the average of the samples within `window` nanoseconds centered on
+        the frame, or the closest sample if there are none. If the closest sample
+        lies more than `max_age` nanoseconds outside of the window, e.g. because gaze
+        dropped out, None is returned instead of stale gaze.
+        """
+        timestamps, gaze = self.snapshot()
+        if len(timestamps) == 0:
+            return None
+
+        start = np.array([time - window // 2])
+        mean: npt.NDArray[np.float64] = interval_means(
+            timestamps, gaze, start, start + window
+        )[0]
+        if np.isnan(mean).any():
+            idx = _nearest_index(timestamps, time)
+            if abs(int(timestamps[idx]) - time) - window // 2 > max_age:
+                return None
+            nearest: npt.NDArray[np.float64] = gaze[idx]
+            return nearest
+        return mean
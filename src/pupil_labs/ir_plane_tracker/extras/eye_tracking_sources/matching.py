@@ -0,0 +1,33 @@
+import numpy as np
+import numpy.typing as npt
+
+
+def match_nearest(
+    source_ts: npt.NDArray[np.int64], target_ts: npt.NDArray[np.int64]
+) -> npt.NDArray[np.int64]:
+    """Finds the index of the nearest target timestamp of every source timestamp.
+
+    Both timestamp arrays have to be sorted.
+    """
+    idxs = np.searchsorted(target_ts, source_ts)
+    idxs = np.clip(idxs, 1, len(target_ts) - 1)
+    before = target_ts[idxs - 1]
+    after = target_ts[idxs]
+    idxs -= source_ts - before <= after - source_ts
+    return np.clip(idxs, 0, len(target_ts) - 1)
+
+
+def group_by_nearest(
+    source_ts: npt.NDArray[np.int64], target_ts: npt.NDArray[np.int64]
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Groups the source samples by their nearest target timestamp.
+
+    Returns:
+        Start and end index into the source samples of the group of every target.
+
+    """
+    matches = match_nearest(source_ts, target_ts)
+    targets = np.arange(len(target_ts))
+    starts = np.searchsorted(matches, targets, side="left")
+    ends = np.searchsorted(matches, targets, side="right")
+    return starts, ends
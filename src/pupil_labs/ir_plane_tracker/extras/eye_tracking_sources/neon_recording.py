@@ -1,18 +1,27 @@
 from pathlib import Path
 
-import pandas as pd
+import numpy as np
 
 from pupil_labs import neon_recording as plr
 from pupil_labs.camera import Camera
-from pupil_labs.neon_recording import match_ts
 
 from . import (
     EyeTrackingData,
     EyeTrackingSource,
 )
+from .gaze_buffer import interval_means
+from .matching import group_by_nearest
 
 
 class NeonRecording(EyeTrackingSource):
+    """Replays the scene video and gaze of a Neon recording.
+
+    Eye frames and gaze are matched to their nearest scene frame once on opening.
+    Only scene frames with matched eye frames are replayed, with the gaze averaged
+    over all samples matched to them. Samples are returned in order by `get_sample`,
+    but can also be accessed by index or seeked to by timestamp.
+    """
+
     def __init__(self, recording_folder: str | Path):
         super().__init__()
 
@@ -25,31 +34,52 @@ class NeonRecording(EyeTrackingSource):
             distortion_coefficients=self.rec.calibration.scene_distortion_coefficients,
         )
 
-        matching_df = match_ts(
-            self.rec.eye.time,
-            self.rec.scene.time,
+        scene_ts = np.asarray(self.rec.scene.time)
+        eye_starts, eye_ends = group_by_nearest(np.asarray(self.rec.eye.time), scene_ts)
+        has_eye = eye_ends > eye_starts
+        self._scene_idxs = np.flatnonzero(has_eye)
+        self._eye_idxs = eye_ends[has_eye] - 1
+        self.timestamps = scene_ts[has_eye]
+        """Timestamps of all samples in nanoseconds."""
+
+        # Each scene frame gets the gaze up to halfway to its neighboring frames
+        midpoints = scene_ts[:-1] + np.diff(scene_ts) // 2
+        gaze = interval_means(
+            np.asarray(self.rec.gaze.time),
+            np.asarray(self.rec.gaze.point, dtype=np.float64),
+            np.concatenate(([np.iinfo(np.int64).min], midpoints)),
+            np.concatenate((midpoints, [np.iinfo(np.int64).max])),
         )
-        matching_df = pd.Series(matching_df, name="scene_idx")
-        matching_df.index.name = "eye_idx"
-        matching_df = matching_df.reset_index()
-        matching_df = matching_df.groupby("scene_idx").agg(list)
-        self.matching_iter = matching_df.iterrows()
+        self._gaze = gaze[has_eye]
 
-    def get_sample(self) -> EyeTrackingData:
-        scene_idx, eye_idxs = next(self.matching_iter)
-        eye_idxs = eye_idxs["eye_idx"]
+        self.position = 0
+        """Index of the sample returned by the next call of `get_sample`."""
 
-        scene_frame = self.rec.scene[scene_idx]
-        eye_image = self.rec.eye[eye_idxs[-1]].gray
-        gaze = self.rec.gaze[eye_idxs].mean(axis=0)
+    def __len__(self) -> int:
+        return len(self._scene_idxs)
 
-        data = EyeTrackingData(
-            time=scene_frame.time,
-            gaze_scene_distorted=gaze,
-            scene_image_distorted=scene_frame.bgr,
+    def __getitem__(self, index: int) -> EyeTrackingData:
+        scene_idx = int(self._scene_idxs[index])
+        eye_idx = int(self._eye_idxs[index])
+
+        # Frames are decoded only when their images are accessed
+        return EyeTrackingData(
+            time=int(self.timestamps[index]),
+            gaze_scene_distorted=self._gaze[index],
+            scene_image_distorted=lambda: self.rec.scene[scene_idx].bgr,
             intrinsics=self.scene_intrinsics,
-            eye_image=eye_image,
+            eye_image=lambda: self.rec.eye[eye_idx].gray,
         )
+
+    def seek(self, time: int) -> None:
+        """Continues with the first sample at or after the given timestamp."""
+        self.position = int(np.searchsorted(self.timestamps, time))
+
+    def get_sample(self) -> EyeTrackingData:
+        if self.position >= len(self):
+            raise StopIteration
+        data = self[self.position]
+        self.position += 1
         return data
 
     def close(self):
@@ -1,51 +1,84 @@
+import asyncio
+import contextlib
+import threading
 from functools import cached_property
-
-import numpy as np
+from typing import TYPE_CHECKING
 
 from pupil_labs.camera import Camera
-from pupil_labs.realtime_api.simple import Device
+from pupil_labs.realtime_api import Device, receive_gaze_data, receive_video_frames
+from pupil_labs.realtime_api.streaming import VideoFrame
 
 from . import (
     EyeTrackingData,
     EyeTrackingSource,
+    SampleTimeoutError,
 )
+from .gaze_buffer import NEON_SCENE_FRAME_INTERVAL, GazeBuffer
+
+if TYPE_CHECKING:
+    from pupil_labs.neon_recording.calib import Calibration
 
 
 class NeonRemote(EyeTrackingSource):
-    def __init__(self, ip_address: str, port: int):
+    """Streams the scene video and gaze of a Neon device over the network.
+
+    A background thread receives both streams with the asynchronous realtime API.
+    Only the newest scene frame is kept in a one-slot buffer, while gaze is kept in
+    a gaze buffer from which the gaze of a frame is looked up by its timestamp.
+    `get_sample` returns right away if a frame newer than the last returned one is
+    available, and otherwise waits for one. Frames are never returned twice.
+    """
+
+    SAMPLE_TIMEOUT = 1 / 5
+    """Seconds `get_sample` waits for a new frame before raising."""
+
+    def __init__(
+        self,
+        ip_address: str,
+        port: int,
+        connect_timeout: float = 5.0,
+        gaze_buffer_size: int = 400,
+    ):
         super().__init__()
-        try:
-            device = Device(ip_address, port, start_streaming_by_default=True)
-        except Exception:
-            device = None
+        self._address = ip_address
+        self._port = port
 
-        if device is None:
+        self._new_frame = threading.Condition()
+        self._frame: VideoFrame | None = None
+        self._frame_count = 0
+        self._returned_count = 0
+        self.gaze_buffer = GazeBuffer(gaze_buffer_size)
+        self._calibration: Calibration | None = None
+        self._error: Exception | None = None
+        self._connected = threading.Event()
+
+        self._loop = asyncio.new_event_loop()
+        self._task: asyncio.Task | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="NeonRemoteReceiver", daemon=True
+        )
+
+        print(f"Attempting to receive data from device at {ip_address}:{port}...")
+        self._thread.start()
+        if not self._connected.wait(connect_timeout) or self._error is not None:
+            self.close()
             print(f"Failed to connect to device at {ip_address}:{port}.")
             raise RuntimeError("Could not connect to Neon Remote device.")
-
-        data = None
-        print(f"Attempting to receive data from device {device}...")
-        counter = 0
-        while data is None:
-            counter += 1
-            print(f"  Attempt {counter}...")
-            data = device.receive_matched_scene_video_frame_and_gaze(
-                timeout_seconds=1.0
-            )
         print("  Success.")
-        self._device = device
 
     @property
     def address(self) -> str:
-        return self._device.address
+        return self._address
 
     @property
     def port(self) -> int:
-        return self._device.port
+        return self._port
 
     @cached_property
     def scene_intrinsics(self) -> Camera:
-        intrinsics = self._device.get_calibration()
+        intrinsics = self._calibration
+        if intrinsics is None:
+            raise RuntimeError("No calibration received from Neon Remote device.")
         return Camera(
             pixel_width=1600,
             pixel_height=1200,
@@ -53,23 +86,89 @@ class NeonRemote(EyeTrackingSource):
             distortion_coefficients=intrinsics.scene_distortion_coefficients,
         )
 
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._receive())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._error = e
+        finally:
+            self._loop.close()
+            # Wake up everyone waiting for a connection or a frame
+            self._connected.set()
+            with self._new_frame:
+                self._new_frame.notify_all()
+
+    async def _receive(self) -> None:
+        async with Device(self._address, self._port) as device:
+            self._calibration = await device.get_calibration()
+            status = await device.get_status()
+            scene_sensor = status.direct_world_sensor()
+            gaze_sensor = status.direct_gaze_sensor()
+            if scene_sensor is None or scene_sensor.url is None:
+                raise RuntimeError("Scene camera of the Neon device is not connected.")
+            if gaze_sensor is None or gaze_sensor.url is None:
+                raise RuntimeError("Gaze sensor of the Neon device is not connected.")
+
+            await asyncio.gather(
+                self._receive_scene(scene_sensor.url),
+                self._receive_gaze(gaze_sensor.url),
+            )
+
+    async def _receive_scene(self, url: str) -> None:
+        async for frame in receive_video_frames(url, run_loop=True):
+            with self._new_frame:
+                self._frame = frame
+                self._frame_count += 1
+                self._new_frame.notify_all()
+            self._connected.set()
+
+    async def _receive_gaze(self, url: str) -> None:
+        async for gaze in receive_gaze_data(url, run_loop=True):
+            self.gaze_buffer.append(gaze.timestamp_unix_ns, gaze.x, gaze.y)
+
     def get_sample(self) -> EyeTrackingData:
-        scene_and_gaze = self._device.receive_matched_scene_video_frame_and_gaze(
-            timeout_seconds=1 / 5
-        )
-        if scene_and_gaze is None:
-            raise RuntimeError("No data received from Neon Remote device.")
+        with self._new_frame:
+            self._new_frame.wait_for(
+                lambda: self._frame_count > self._returned_count
+                or not self._thread.is_alive(),
+                timeout=self.SAMPLE_TIMEOUT,
+            )
+            if not self._thread.is_alive():
+                raise RuntimeError(
+                    "No data received from Neon Remote device."
+                ) from self._error
+            if self._frame_count == self._returned_count or self._frame is None:
+                raise SampleTimeoutError("No new frame received from Neon Remote.")
+            frame = self._frame
+            self._returned_count = self._frame_count
 
-        scene, gaze = scene_and_gaze
-        gaze = np.array([gaze.x, gaze.y], dtype=np.float64)
-        time = scene.timestamp_unix_ns
+        time = frame.timestamp_unix_ns
         return EyeTrackingData(
             time=time,
-            gaze_scene_distorted=gaze,
-            scene_image_distorted=scene.bgr_pixels,
+            gaze_scene_distorted=self.gaze_buffer.gaze_at(
+                time, NEON_SCENE_FRAME_INTERVAL
+            ),
+            scene_image_distorted=frame.bgr_buffer,
             intrinsics=self.scene_intrinsics,
             eye_image=None,
         )
 
-    def close(self):
-        self._device.close()
+    def _shutdown(self) -> None:
+        # Runs on the event loop. Cancelling lets the receivers close their
+        # connections, which in turn ends `run_until_complete`.
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        else:
+            self._loop.stop()
+
+    def close(self) -> None:
+        # The loop only processes the callback once it runs, so this also stops a
+        # receiver thread that has not created its task yet. It raises if the
+        # loop has already been closed, in which case there is nothing to stop.
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._shutdown)
+        self._thread.join(timeout=1.0)
@@ -1,10 +1,11 @@
-import contextlib
 import importlib
 import queue
 import time
-from threading import Event, Thread
+from collections.abc import Callable
+from threading import Condition, Event, Thread
 
 import numpy as np
+import numpy.typing as npt
 
 from pupil_labs.camera import Camera
 from pupil_labs.neon_usb import (
@@ -16,27 +17,104 @@ from pupil_labs.neon_usb import (
 from . import (
     EyeTrackingData,
     EyeTrackingSource,
+    SampleTimeoutError,
 )
+from .gaze_buffer import NEON_SCENE_FRAME_INTERVAL, GazeBuffer
 
+GazePipeline = Callable[[list[Frame]], npt.ArrayLike]
+"""Gaze pipeline mapping a batch of eye frames to their gaze points."""
 
-def get_all_items(q: queue.Queue[Frame]) -> list[Frame]:
-    """Retrieve all items from a queue and always at least one."""
-    items = []
-    # Need to get at least one item
-    # Otherwise the queue might be spammed with requests
-    items.append(q.get())
-    while True:
-        try:
-            items.append(q.get_nowait())
-        except queue.Empty:
-            break
-    return items
+
+class FrameRingBuffer:
+    """Keeps the most recent frames of a capture thread along with their timestamps.
+
+    There is a single writer. Slots are written and read under a lock, so a frame is
+    never paired with the timestamp of another. Readers get references to the
+    buffered frames, so nothing is drained or copied.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._frames: list[Frame | None] = [None] * capacity
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        self._new_frame = Condition()
+
+    @property
+    def count(self) -> int:
+        """Total number of frames put into the buffer so far."""
+        return self._count
+
+    def put(self, frame: Frame, timestamp: int) -> None:
+        with self._new_frame:
+            idx = self._count % self.capacity
+            self._frames[idx] = frame
+            self._timestamps[idx] = timestamp
+            self._count += 1
+            self._new_frame.notify_all()
+
+    def wait_for_frame(self, count: int, timeout: float | None = None) -> bool:
+        """Waits until the buffer holds more than `count` frames in total."""
+        with self._new_frame:
+            return self._new_frame.wait_for(lambda: self._count > count, timeout)
+
+    def get(self, index: int) -> tuple[Frame, int]:
+        """Returns the frame with the given index and its timestamp in nanoseconds.
+
+        Frames are indexed by the order in which they were put into the buffer. Only
+        the last `capacity - 1` frames can be accessed.
+        """
+        with self._new_frame:
+            if not self._count - self.capacity < index < self._count or index < 0:
+                raise IndexError(f"Frame {index} is not in the buffer.")
+            idx = index % self.capacity
+            return self._frame(idx), int(self._timestamps[idx])
+
+    def range(self, start: int, n: int) -> tuple[int, list[tuple[Frame, int]]]:
+        """Returns up to `n` frames with their timestamps, starting at index `start`.
+
+        If frames from `start` on were overwritten already, reading starts at the
+        oldest accessible frame instead. The frames are read at once, so none of them
+        can be overwritten in between.
+
+        Returns:
+            The index of the first returned frame and the frames, oldest first.
+
+        """
+        with self._new_frame:
+            start = max(start, self._count - self.capacity + 1, 0)
+            end = min(self._count, start + n)
+            frames = [
+                (
+                    self._frame(i % self.capacity),
+                    int(self._timestamps[i % self.capacity]),
+                )
+                for i in range(start, end)
+            ]
+            return start, frames
+
+    def latest(self) -> tuple[Frame, int]:
+        """Returns the newest frame and its timestamp in nanoseconds."""
+        return self.get(self._count - 1)
+
+    def last(self, n: int) -> list[Frame]:
+        """Returns up to the `n` newest frames, oldest first."""
+        # The slot after the newest frame is the next to be overwritten
+        with self._new_frame:
+            n = min(n, self._count, self.capacity - 1)
+            end = self._count
+            return [self._frame(i % self.capacity) for i in range(end - n, end)]
+
+    def _frame(self, idx: int) -> Frame:
+        frame = self._frames[idx]
+        assert frame is not None
+        return frame
 
 
 def image_receiver(
     CameraClass: type[SceneCamera | EyeCamera],
     intrinsics_q: queue.Queue[Camera] | None,
-    output_q: queue.Queue[Frame],
+    output: FrameRingBuffer,
     start_event: Event,
     stop_event: Event,
     wait_event: Event | None = None,
@@ -52,40 +130,64 @@ def image_receiver(
             cam.close()
             break
         image = cam.get_frame()
-        with contextlib.suppress(queue.Full):
-            output_q.put_nowait(image)
+        output.put(image, time.time_ns())
 
 
 class LowExposureSceneCamera(SceneCamera):
-    def __init__(self):
+    def __init__(self) -> None:
         super().__init__()
         self.exposure = 120  # Set low exposure to reduce motion blur
 
 
 class NeonUSB(EyeTrackingSource):
+    """Captures the scene and eye cameras of a Neon connected via USB.
+
+    The scene camera, the eye camera and the gaze pipeline are initialized
+    concurrently. The source is returned as soon as the scene camera is up, so that
+    it can be used for tracking right away. Until the eye camera delivers frames,
+    samples have no eye image, and until the gaze pipeline is loaded, they have no
+    gaze.
+
+    Gaze is inferred on a separate thread for every eye frame, in batches of up to
+    `GAZE_BATCH_SIZE` frames, and kept in a gaze buffer. Samples get the gaze
+    of their scene frame looked up by its timestamp, so inference never delays
+    `get_sample`.
+    """
+
+    GAZE_BATCH_SIZE = 6
+
     def __init__(self, compute_gaze: bool = True):
         super().__init__()
 
-        self._init_scene_camera()
-        self._init_eye_camera()
+        self.compute_gaze = compute_gaze
+        self._pipeline: GazePipeline | None = None
+        self.pipeline_ready = Event()
+        """Set once the gaze pipeline is loaded, or failed to load."""
+        self._scene_connected = Event()
+        self.gaze_buffer = GazeBuffer(capacity=400)
 
         if compute_gaze:
-            self._pipeline = self._init_pipeline()
+            Thread(
+                target=self._load_pipeline, name="NeonPipelineLoader", daemon=True
+            ).start()
         else:
-            self._pipeline = None
+            self.pipeline_ready.set()
+        self._init_eye_camera()
+        self._init_scene_camera()
 
-    def _init_scene_camera(self):
-        print("Connecting to scene cam...", end="", flush=True)
+    def _init_scene_camera(self) -> None:
+        print("Connecting to scene cam...", flush=True)
         scene_start_event = Event()
         self.scene_stop_event = Event()
         scene_intrinsics_q = queue.Queue[Camera](maxsize=1)
-        self.scene_q = queue.Queue[Frame](maxsize=10)
+        self.scene_buffer = FrameRingBuffer(capacity=4)
+        self._last_scene_count = 0
         scene_thread = Thread(
             target=image_receiver,
             args=(
                 LowExposureSceneCamera,
                 scene_intrinsics_q,
-                self.scene_q,
+                self.scene_buffer,
                 scene_start_event,
                 self.scene_stop_event,
                 None,
@@ -96,32 +198,72 @@ class NeonUSB(EyeTrackingSource):
         self.scene_intrinsics = Camera(
             1600, 1200, intrinsics.camera_matrix, intrinsics.distortion_coefficients
         )
+        self._scene_connected.set()
         scene_start_event.wait()
-        print("Done.")
+        print("Scene cam connected.")
 
-    def _init_eye_camera(self):
-        print("Connecting to eye cam...", end="", flush=True)
+    def _init_eye_camera(self) -> None:
+        print("Connecting to eye cam...", flush=True)
 
-        eye_start_event = Event()
         self.eye_stop_event = Event()
-
-        self.eye_q = queue.Queue[Frame](maxsize=10)
+        self.eye_buffer = FrameRingBuffer(capacity=32)
         eye_thread = Thread(
             target=image_receiver,
             args=(
                 EyeCamera,
                 None,
-                self.eye_q,
-                eye_start_event,
+                self.eye_buffer,
+                Event(),
                 self.eye_stop_event,
                 None,
             ),
         )
         eye_thread.start()
-        eye_start_event.wait()
-        print("Done.")
 
-    def _init_pipeline(self):
+    def _load_pipeline(self) -> None:
+        try:
+            self._pipeline = self._init_pipeline()
+        except Exception as e:
+            print(f"Failed to set up gaze pipeline: {e}")
+            return
+        finally:
+            self.pipeline_ready.set()
+        self._infer_gaze(self._pipeline)
+
+    def _infer_gaze(self, pipeline: GazePipeline) -> None:
+        """Infers gaze for all eye frames as they arrive, until the source closes.
+
+        Batches which fail are skipped, so their frames get no gaze.
+        """
+        next_index = 0
+        failing = False
+        while not self.eye_stop_event.is_set():
+            if not self.eye_buffer.wait_for_frame(next_index, timeout=0.1):
+                continue
+            # Frames overwritten while inferring the last batch are skipped
+            try:
+                start, batch = self.eye_buffer.range(next_index, self.GAZE_BATCH_SIZE)
+            except IndexError:
+                # Re-sync to the oldest frame still in the buffer
+                next_index = self.eye_buffer.count - self.eye_buffer.capacity + 1
+                continue
+            next_index = start + len(batch)
+
+            try:
+                gaze = np.asarray(pipeline([frame for frame, _ in batch]), np.float64)
+                # A single gaze point belongs to the newest frame
+                gaze = gaze.reshape(-1, 2)
+            except Exception as e:
+                # Only report the first of consecutive failures
+                if not failing:
+                    print(f"Failed to infer gaze: {e}")
+                failing = True
+                continue
+            failing = False
+            timestamps = np.array([ts for _, ts in batch], dtype=np.int64)
+            self.gaze_buffer.put(timestamps[-len(gaze) :], gaze)
+
+    def _init_pipeline(self) -> GazePipeline:
         import os
 
         from dotenv import load_dotenv
@@ -134,40 +276,45 @@ class NeonUSB(EyeTrackingSource):
         neon_pipeline_module_name = os.environ["NEON_PIPELINE_MODULE_NAME"]
         neon_pipeline_class_name = os.environ["NEON_PIPELINE_CLASS_NAME"]
         neon_pipeline_version = os.environ["NEON_PIPELINE_VERSION"]
+        # Importing is the slow part and does not need the scene camera
         neon_pipeline_module = importlib.import_module(neon_pipeline_module_name)
         neon_pipeline_class = getattr(neon_pipeline_module, neon_pipeline_class_name)
 
-        print("Setting up pipeline...", end="", flush=True)
-        pipeline = neon_pipeline_class(
+        self._scene_connected.wait()
+        print("Setting up pipeline...", flush=True)
+        pipeline: GazePipeline = neon_pipeline_class(
             pipeline_version=neon_pipeline_version,
             camera_matrix=self.scene_intrinsics.camera_matrix,
             dist_coefs=self.scene_intrinsics.distortion_coefficients,
-            batch_size=6,
+            batch_size=self.GAZE_BATCH_SIZE,
         )
-        print("Done.")
+        print("Gaze pipeline ready.")
         return pipeline
 
     def get_sample(self) -> EyeTrackingData:
-        ts = int(time.time() * 1e9)
-        scene_frame = get_all_items(self.scene_q)[-1]
-        eye_frames = get_all_items(self.eye_q)[-6:]
+        # Wait for a scene frame which was not handed out before
+        if not self.scene_buffer.wait_for_frame(self._last_scene_count, timeout=1 / 5):
+            raise SampleTimeoutError("No scene frame received from Neon USB device.")
+        self._last_scene_count = self.scene_buffer.count
+        scene_frame, ts = self.scene_buffer.get(self._last_scene_count - 1)
+        eye_frames = self.eye_buffer.last(1)
 
-        if self._pipeline is None:
-            gaze = np.array([0, 0], dtype=np.float64)
+        # The eye camera and the pipeline may still be starting up, in which case
+        # there is no gaze yet
+        if self.compute_gaze:
+            gaze = self.gaze_buffer.gaze_at(ts, NEON_SCENE_FRAME_INTERVAL)
         else:
-            gaze = self._pipeline(eye_frames)
-            if gaze.ndim == 2:
-                gaze = np.mean(gaze, axis=0)
+            gaze = np.array([0, 0], dtype=np.float64)
         data = EyeTrackingData(
             time=ts,
             gaze_scene_distorted=gaze,
-            scene_image_distorted=scene_frame.bgr,
+            # Images are converted only when accessed
+            scene_image_distorted=lambda: scene_frame.bgr,
             intrinsics=self.scene_intrinsics,
-            eye_image=eye_frames[-1].gray,
+            eye_image=(lambda: eye_frames[-1].gray) if eye_frames else None,
         )
         return data
 
-    def close(self):
+    def close(self) -> None:
         self.scene_stop_event.set()
-        if self._pipeline is not None:
-            self.eye_stop_event.set()
+        self.eye_stop_event.set()
@@ -0,0 +1,128 @@
+from functools import cached_property
+from typing import Any
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import Camera
+from pupil_labs.ir_plane_tracker.streaming import SampleFetcher
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+
+
+class PrefetchingSource(EyeTrackingSource):
+    """Fetches the samples of another source ahead of time on a background thread.
+
+    This moves decoding out of the consumer's thread, which makes offline processing
+    of recordings and videos bound by the tracker rather than by decoding and
+    tracking combined. At most `num_frames` samples are buffered.
+
+    The scene images can optionally be converted to grayscale and resized by
+    `scale` in the background as well, in which case the intrinsics and gaze of
+    the samples are scaled accordingly. Pixel centers are mapped onto pixel centers,
+    using the exact ratio between the resized and the original image size.
+    """
+
+    def __init__(
+        self,
+        source: EyeTrackingSource,
+        num_frames: int = 4,
+        gray: bool = False,
+        scale: float = 1.0,
+        undistort: bool = True,
+    ):
+        """Creates a PrefetchingSource and starts prefetching.
+
+        Args:
+            source: Source to fetch the samples from. It is closed along with this
+                source.
+            num_frames: Maximum number of prefetched samples.
+            gray: Convert the scene images to grayscale.
+            scale: Factor by which the scene images are resized.
+            undistort: Also compute the undistorted scene images in the background.
+
+        """
+        super().__init__()
+        self.source = source
+        self.gray = gray
+        self.scale = scale
+        self.undistort = undistort
+
+        self._fetcher = SampleFetcher(
+            source, num_frames, prepare=self._prepare, name="Prefetch"
+        )
+
+    @cached_property
+    def scene_intrinsics(self) -> Camera:
+        intrinsics = self.source.scene_intrinsics
+        if self.scale == 1.0:
+            return intrinsics
+
+        camera_matrix = np.array(intrinsics.camera_matrix, dtype=np.float64)
+        camera_matrix[:2] *= self._scale_xy[:, np.newaxis]
+        camera_matrix[:2, 2] += self._scale_xy * 0.5 - 0.5
+        width, height = self._scaled_size
+        return Camera(
+            pixel_width=width,
+            pixel_height=height,
+            camera_matrix=camera_matrix,
+            distortion_coefficients=intrinsics.distortion_coefficients,
+        )
+
+    @cached_property
+    def _scaled_size(self) -> tuple[int, int]:
+        intrinsics = self.source.scene_intrinsics
+        return (
+            round(intrinsics.pixel_width * self.scale),
+            round(intrinsics.pixel_height * self.scale),
+        )
+
+    @cached_property
+    def _scale_xy(self) -> npt.NDArray[np.float64]:
+        """Actual horizontal and vertical scale after rounding the image size."""
+        intrinsics = self.source.scene_intrinsics
+        return np.array(self._scaled_size, dtype=np.float64) / (
+            intrinsics.pixel_width,
+            intrinsics.pixel_height,
+        )
+
+    def _prepare(self, data: EyeTrackingData) -> EyeTrackingData:
+        # Decode lazily loaded scene images in the background
+        data.scene_image_distorted  # noqa: B018
+        if self.gray or self.scale != 1.0:
+            image: npt.NDArray[Any] = data.scene_image_distorted
+            if self.gray and image.ndim == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gaze = data.gaze_scene_distorted
+            if self.scale != 1.0:
+                image = cv2.resize(
+                    image, self._scaled_size, interpolation=cv2.INTER_AREA
+                )
+                if gaze is not None:
+                    gaze = (gaze + 0.5) * self._scale_xy - 0.5
+            data = EyeTrackingData(
+                time=data.time,
+                gaze_scene_distorted=gaze,
+                scene_image_distorted=image,
+                intrinsics=self.scene_intrinsics,
+                # Keep the eye image lazy, it is rarely needed. Passing the handle
+                # rather than the sample lets the original sample be freed.
+                eye_image=data.eye_image_handle,
+            )
+
+        if self.undistort:
+            # Populates the cached property
+            data.scene_image_undistorted  # noqa: B018
+        return data
+
+    def get_sample(self) -> EyeTrackingData:
+        # Raises RuntimeError once closed instead of waiting for samples forever
+        return self._fetcher.get()
+
+    def close(self) -> None:
+        self._fetcher.stop()
+        self.source.close()
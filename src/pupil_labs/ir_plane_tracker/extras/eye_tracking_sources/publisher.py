@@ -0,0 +1,196 @@
+import asyncio
+import concurrent.futures
+from collections.abc import Callable
+from enum import Enum
+from threading import Event, Lock, Thread, current_thread
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+    SampleTimeoutError,
+)
+
+
+class DropPolicy(Enum):
+    """What happens to a sample pushed to a subscriber queue that is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Replace the oldest queued sample, so the queue holds the newest samples."""
+    DROP_NEWEST = "drop_newest"
+    """Discard the new sample, so the queued samples are kept."""
+    BLOCK = "block"
+    """Wait for space in the queue, which holds back fetching from the source."""
+
+
+class Subscription:
+    """A registered subscriber of a SamplePublisher."""
+
+    def __init__(
+        self,
+        publisher: "SamplePublisher",
+        deliver: Callable[[EyeTrackingData | None], None],
+    ):
+        self._publisher = publisher
+        self._deliver = deliver
+        self.dropped_count = 0
+        """Number of samples dropped because the subscriber queue was full."""
+
+    def cancel(self) -> None:
+        """Stops pushing samples to the subscriber."""
+        self._publisher._remove(self)
+
+
+class SamplePublisher:
+    """Pushes the samples of an eye tracking source to subscribers as they arrive.
+
+    A background thread fetches samples from the source and hands each one to all
+    subscribers right away, so subscribers receive live samples the moment they
+    arrive. Sources which return their newest sample again until a new one arrives
+    are polled, and samples with the same timestamp as the previous one are only
+    published once. Timeouts of the source are waited out and reported once per
+    outage.
+
+    Subscribers are either callbacks, which are called on the publisher thread, or
+    asyncio queues, which are filled in their event loop according to a
+    `DropPolicy`. Queues receive None once the source ended or failed.
+    """
+
+    def __init__(self, source: EyeTrackingSource, close_source: bool = False):
+        """Creates a SamplePublisher. Pushing starts with `start`.
+
+        Args:
+            source: Source to fetch the samples from.
+            close_source: Close the source when the publisher is stopped.
+
+        """
+        self.source = source
+        self.close_source = close_source
+        self.error: Exception | None = None
+        """Exception raised by the source, if any."""
+        self.finished = Event()
+        """Set once the source ended or failed."""
+
+        self._subscriptions: list[Subscription] = []
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run, name="SamplePublisher", daemon=True)
+
+    def subscribe(self, callback: Callable[[EyeTrackingData], None]) -> Subscription:
+        """Calls `callback` with every sample on the publisher thread."""
+
+        def deliver(data: EyeTrackingData | None) -> None:
+            if data is not None:
+                callback(data)
+
+        return self._add(Subscription(self, deliver))
+
+    def subscribe_queue(
+        self,
+        queue: asyncio.Queue,
+        policy: DropPolicy = DropPolicy.DROP_OLDEST,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> Subscription:
+        """Puts every sample into an asyncio queue.
+
+        Args:
+            queue: Queue to put the samples into.
+            policy: What to do with samples arriving while the queue is full.
+            loop: Event loop of the queue. Defaults to the running loop.
+
+        """
+        loop = loop or asyncio.get_running_loop()
+
+        def offer(data: EyeTrackingData | None) -> None:
+            # Runs in the event loop, which owns the queue
+            if queue.full():
+                if policy == DropPolicy.DROP_NEWEST and data is not None:
+                    subscription.dropped_count += 1
+                    return
+                queue.get_nowait()
+                subscription.dropped_count += 1
+            queue.put_nowait(data)
+
+        def deliver(data: EyeTrackingData | None) -> None:
+            if policy != DropPolicy.BLOCK:
+                loop.call_soon_threadsafe(offer, data)
+                return
+
+            future = asyncio.run_coroutine_threadsafe(queue.put(data), loop)
+            # Keep responsive to stop, which may be called from the event loop
+            while not self._stop_event.is_set():
+                try:
+                    future.result(timeout=0.1)
+                except concurrent.futures.TimeoutError:
+                    continue
+                else:
+                    return
+            future.cancel()
+            if data is None:
+                # The end is announced even if the queue is not drained anymore
+                loop.call_soon_threadsafe(offer, data)
+
+        subscription = Subscription(self, deliver)
+        return self._add(subscription)
+
+    def _add(self, subscription: Subscription) -> Subscription:
+        with self._lock:
+            self._subscriptions = [*self._subscriptions, subscription]
+        return subscription
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = [
+                s for s in self._subscriptions if s is not subscription
+            ]
+
+    def _publish(self, data: EyeTrackingData | None) -> None:
+        # The list is replaced rather than modified, so it can be iterated unlocked
+        for subscription in self._subscriptions:
+            try:
+                subscription._deliver(data)
+            except Exception as e:
+                print(f"Failed to deliver sample to subscriber: {e}")
+
+    def _run(self) -> None:
+        timed_out = False
+        last_time: int | None = None
+        while not self._stop_event.is_set():
+            try:
+                data = self.source.get_sample()
+            except SampleTimeoutError as e:
+                if not timed_out:
+                    print(f"Failed to receive sample: {e}")
+                timed_out = True
+                continue
+            except StopIteration:
+                break
+            except Exception as e:
+                self.error = e
+                break
+            timed_out = False
+            if data.time == last_time:
+                self._stop_event.wait(0.001)
+                continue
+            last_time = data.time
+            self._publish(data)
+
+        self.finished.set()
+        self._publish(None)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops pushing samples. May also be called from a subscriber callback."""
+        self._stop_event.set()
+        if self._thread.is_alive() and current_thread() is not self._thread:
+            self._thread.join()
+        if self.close_source:
+            self.source.close()
+
+    def __enter__(self) -> "SamplePublisher":
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
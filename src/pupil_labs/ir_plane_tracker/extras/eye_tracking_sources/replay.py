@@ -0,0 +1,293 @@
+import json
+import time
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import Camera
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+    SampleTimeoutError,
+)
+
+_META_FILE = "meta.json"
+_TIME_FILE = "time.npy"
+_GAZE_FILE = "gaze.npy"
+_SCENE_FILE = "scene.raw"
+_EYE_FILE = "eye.raw"
+_HAS_EYE_FILE = "has_eye.npy"
+
+
+class SampleRecorder:
+    """Records eye tracking samples to a folder which can be replayed by ReplaySource.
+
+    Scene and eye images are appended as raw bytes to one file each, so that they
+    can be memory-mapped on replay. Timestamps, gaze and the image shapes and
+    intrinsics are written when the recorder is closed. All samples need to have
+    images of the same shape. Samples without an eye image, such as those of a
+    camera that is still starting up, are stored as blank eye images and replayed
+    without one.
+    """
+
+    def __init__(self, folder: str | Path, intrinsics: Camera):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.intrinsics = intrinsics
+
+        self._scene_file = open(self.folder / _SCENE_FILE, "wb")  # noqa: SIM115
+        self._eye_file: BinaryIO | None = None
+        self._blank_eye_image = b""
+        self._scene_shape: tuple[int, ...] | None = None
+        self._eye_shape: tuple[int, ...] | None = None
+        self._times: list[int] = []
+        self._gaze: list[npt.NDArray[np.float64]] = []
+        self._has_eye: list[bool] = []
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def write(self, data: EyeTrackingData) -> None:
+        scene_image = np.ascontiguousarray(data.scene_image_distorted, dtype=np.uint8)
+        eye_image = data.eye_image
+        if eye_image is not None:
+            eye_image = np.ascontiguousarray(eye_image, dtype=np.uint8)
+        if len(self) == 0:
+            self._scene_shape = scene_image.shape
+
+        if scene_image.shape != self._scene_shape:
+            raise ValueError(
+                f"Scene image of shape {scene_image.shape} does not match the "
+                f"recorded shape {self._scene_shape}."
+            )
+        if (
+            eye_image is not None
+            and self._eye_shape is not None
+            and eye_image.shape != self._eye_shape
+        ):
+            raise ValueError(
+                f"Eye image of shape {eye_image.shape} does not match the recorded "
+                f"shape {self._eye_shape}."
+            )
+
+        self._scene_file.write(scene_image.data)
+        if eye_image is not None and self._eye_file is None:
+            self._open_eye_file(eye_image.shape)
+        if self._eye_file is not None:
+            if eye_image is None:
+                self._eye_file.write(self._blank_eye_image)
+            else:
+                self._eye_file.write(eye_image.data)
+        self._has_eye.append(eye_image is not None)
+        self._times.append(data.time)
+        if data.gaze_scene_distorted is None:
+            self._gaze.append(np.full(2, np.nan))
+        else:
+            self._gaze.append(np.asarray(data.gaze_scene_distorted, dtype=np.float64))
+
+    def _open_eye_file(self, shape: tuple[int, ...]) -> None:
+        self._eye_shape = shape
+        self._blank_eye_image = bytes(int(np.prod(shape)))
+        self._eye_file = open(self.folder / _EYE_FILE, "wb")  # noqa: SIM115
+        # Back-fill the samples recorded before the first eye image
+        for _ in range(len(self)):
+            self._eye_file.write(self._blank_eye_image)
+
+    def close(self) -> None:
+        self._scene_file.close()
+        if self._eye_file is not None:
+            self._eye_file.close()
+
+        np.save(self.folder / _TIME_FILE, np.array(self._times, dtype=np.int64))
+        np.save(
+            self.folder / _GAZE_FILE,
+            np.array(self._gaze, dtype=np.float64).reshape(-1, 2),
+        )
+        np.save(self.folder / _HAS_EYE_FILE, np.array(self._has_eye, dtype=bool))
+        distortion_coefficients = self.intrinsics.distortion_coefficients
+        meta = {
+            "num_samples": len(self),
+            "scene_shape": self._scene_shape,
+            "eye_shape": self._eye_shape,
+            "pixel_width": self.intrinsics.pixel_width,
+            "pixel_height": self.intrinsics.pixel_height,
+            "camera_matrix": np.asarray(self.intrinsics.camera_matrix).tolist(),
+            "distortion_coefficients": None
+            if distortion_coefficients is None
+            else np.asarray(distortion_coefficients).tolist(),
+        }
+        with open(self.folder / _META_FILE, "w") as f:
+            json.dump(meta, f, indent=4)
+
+    def __enter__(self) -> "SampleRecorder":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def record(
+    source: EyeTrackingSource,
+    folder: str | Path,
+    num_samples: int | None = None,
+    duration: float | None = None,
+) -> int:
+    """Records the samples of a source until it ends or a limit is reached.
+
+    Timeouts of the source are waited out and repeated samples are skipped.
+
+    Args:
+        source: Source to record from. It is not closed.
+        folder: Folder to record to.
+        num_samples: Maximum number of recorded samples.
+        duration: Maximum recording duration in seconds.
+
+    Returns:
+        The number of recorded samples.
+
+    """
+    end = None if duration is None else time.perf_counter() + duration
+    last_time: int | None = None
+    with SampleRecorder(folder, source.scene_intrinsics) as recorder:
+        while num_samples is None or len(recorder) < num_samples:
+            if end is not None and time.perf_counter() >= end:
+                break
+            try:
+                data = source.get_sample()
+            except SampleTimeoutError:
+                continue
+            except StopIteration:
+                break
+            if data.time == last_time:
+                # Live sources may return their newest sample again
+                time.sleep(0.001)
+                continue
+            last_time = data.time
+            recorder.write(data)
+    return len(recorder)
+
+
+class ReplaySource(EyeTrackingSource):
+    """Replays samples recorded by SampleRecorder.
+
+    The images are read-only views into the memory-mapped image files, so replaying
+    does not decode or copy anything and runs the same way every time. Samples are
+    returned either at the recorded pace, scaled by `speed`, or as fast as possible.
+    Like the other file-based sources, samples can also be accessed by index or
+    seeked to by timestamp.
+    """
+
+    def __init__(
+        self,
+        folder: str | Path,
+        speed: float | None = 1.0,
+        loop: bool = False,
+    ):
+        """Opens a recorded folder for replay.
+
+        Args:
+            folder: Folder written by SampleRecorder.
+            speed: Factor of the recorded pace to replay at. If None, samples are
+                returned as fast as possible.
+            loop: Restart from the first sample after the last one instead of
+                raising StopIteration.
+
+        """
+        super().__init__()
+        self.folder = Path(folder)
+        self.speed = speed
+        self.loop = loop
+
+        with open(self.folder / _META_FILE) as f:
+            meta = json.load(f)
+        self.scene_intrinsics = Camera(
+            pixel_width=meta["pixel_width"],
+            pixel_height=meta["pixel_height"],
+            camera_matrix=np.array(meta["camera_matrix"]),
+            distortion_coefficients=None
+            if meta["distortion_coefficients"] is None
+            else np.array(meta["distortion_coefficients"]),
+        )
+
+        self.timestamps: npt.NDArray[np.int64] = np.load(self.folder / _TIME_FILE)
+        """Timestamps of all samples in nanoseconds."""
+        self._gaze = np.load(self.folder / _GAZE_FILE)
+
+        num_samples = meta["num_samples"]
+        self._scene = self._open_images(_SCENE_FILE, num_samples, meta["scene_shape"])
+        self._eye: npt.NDArray[np.uint8] | None = None
+        self._has_eye = np.ones(num_samples, dtype=bool)
+        if meta["eye_shape"] is not None:
+            self._eye = self._open_images(_EYE_FILE, num_samples, meta["eye_shape"])
+            # Recordings without the mask have an eye image for every sample
+            if (self.folder / _HAS_EYE_FILE).exists():
+                self._has_eye = np.load(self.folder / _HAS_EYE_FILE)
+
+        self.position = 0
+        """Index of the sample returned by the next call of `get_sample`."""
+        self._pace_start: tuple[int, int] | None = None
+
+    def _open_images(
+        self, file_name: str, num_samples: int, shape: list[int] | None
+    ) -> npt.NDArray[np.uint8]:
+        if num_samples == 0 or shape is None:
+            return np.empty((0, 0), dtype=np.uint8)
+        return np.memmap(
+            self.folder / file_name,
+            dtype=np.uint8,
+            mode="r",
+            shape=(num_samples, *shape),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int) -> EyeTrackingData:
+        gaze = self._gaze[index]
+        return EyeTrackingData(
+            time=int(self.timestamps[index]),
+            gaze_scene_distorted=None if np.isnan(gaze).all() else gaze,
+            scene_image_distorted=self._scene[index],
+            intrinsics=self.scene_intrinsics,
+            eye_image=self._eye[index]
+            if self._eye is not None and self._has_eye[index]
+            else None,
+        )
+
+    def seek(self, time: int) -> None:
+        """Continues with the first sample at or after the given timestamp."""
+        self.position = int(np.searchsorted(self.timestamps, time))
+        self._pace_start = None
+
+    def _wait_for_pace(self, timestamp: int) -> None:
+        if self.speed is None:
+            return
+        now = time.perf_counter_ns()
+        if self._pace_start is None:
+            self._pace_start = (now, timestamp)
+            return
+
+        start, start_timestamp = self._pace_start
+        due = start + (timestamp - start_timestamp) / self.speed
+        if due > now:
+            time.sleep((due - now) / 1e9)
+
+    def get_sample(self) -> EyeTrackingData:
+        if self.position >= len(self):
+            if not self.loop or len(self) == 0:
+                raise StopIteration
+            self.position = 0
+            self._pace_start = None
+
+        data = self[self.position]
+        self._wait_for_pace(data.time)
+        self.position += 1
+        return data
+
+    def close(self) -> None:
+        # Dropping the references unmaps the files once all samples are released
+        self._scene = np.empty((0, 0), dtype=np.uint8)
+        self._eye = None
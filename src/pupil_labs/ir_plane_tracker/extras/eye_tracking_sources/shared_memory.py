@@ -0,0 +1,268 @@
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.ir_plane_tracker import PlaneLocalization, Tracker, TrackerParams
+
+from . import EyeTrackingSource, SampleTimeoutError
+
+if TYPE_CHECKING:
+    from multiprocessing.queues import Queue
+
+_SLOT_DTYPE = np.dtype([("seq", np.int64), ("time", np.int64), ("gaze", np.float64, 2)])
+_WRITING = -1
+_EMPTY = -2
+
+
+class SharedFrame(NamedTuple):
+    seq: int
+    """Sequence number of the frame, counted from 0 by the publisher."""
+    time: int
+    """Timestamp of the sample in nanoseconds."""
+    image: npt.NDArray[np.uint8]
+    """Zero-copy view of the image in shared memory."""
+    gaze: npt.NDArray[np.float64] | None
+    """Gaze point in scene image coordinates."""
+
+
+class SharedTrackingResult(NamedTuple):
+    seq: int
+    time: int
+    localization: PlaneLocalization | None
+    gaze_mapped: npt.NDArray[np.float64] | None
+    """Gaze point in normalized plane coordinates."""
+
+
+class SharedFrameRing:
+    """A ring of equally sized frames in shared memory for passing frames between
+    processes.
+
+    A single publisher writes frames with increasing sequence numbers into the
+    slots in turn. Readers in other processes attach to the memory block by name
+    and get zero-copy views of the frames. A slot is overwritten after `num_slots`
+    further frames, so readers check with `is_current` whether a frame was
+    overwritten while they were using it. Readers poll for new frames.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        num_slots: int = 8,
+        name: str | None = None,
+    ):
+        """Creates a ring, or attaches to an existing one if a name is given."""
+        self.shape = tuple(shape)
+        self.num_slots = num_slots
+        frame_size = int(np.prod(self.shape))
+        # Header of the latest sequence number and the closed flag, then the slot
+        # metadata, then the frames at a cache line aligned offset
+        meta_size = 16 + num_slots * _SLOT_DTYPE.itemsize
+        frames_offset = -(-meta_size // 64) * 64
+        size = frames_offset + num_slots * frame_size
+
+        self._owner = name is None
+        self.shm = SharedMemory(name=name, create=self._owner, size=size)
+        self._header: npt.NDArray[np.int64] = np.ndarray(2, np.int64, self.shm.buf)
+        self._slots: npt.NDArray = np.ndarray(
+            num_slots, _SLOT_DTYPE, self.shm.buf, offset=16
+        )
+        self._frames: npt.NDArray[np.uint8] = np.ndarray(
+            (num_slots, *self.shape), np.uint8, self.shm.buf, offset=frames_offset
+        )
+        if self._owner:
+            self._header[:] = (-1, 0)
+            self._slots["seq"] = _EMPTY
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the newest frame, or -1 if there is none yet."""
+        return int(self._header[0])
+
+    @property
+    def closed(self) -> bool:
+        """Whether the publisher announced that no more frames will follow."""
+        return bool(self._header[1])
+
+    def put(
+        self,
+        time: int,
+        image: npt.NDArray[np.uint8],
+        gaze: npt.NDArray[np.float64] | None = None,
+    ) -> int:
+        """Writes the next frame and returns its sequence number.
+
+        The image must have the shape of the ring and dtype uint8, as it is copied
+        into the shared memory as is.
+        """
+        if image.shape != self.shape or image.dtype != np.uint8:
+            raise ValueError(
+                f"Image of shape {image.shape} and dtype {image.dtype} does not match "
+                f"the ring's shape {self.shape} and dtype uint8."
+            )
+        seq = self.latest_seq + 1
+        idx = seq % self.num_slots
+        # Readers ignore the slot while it is written
+        self._slots["seq"][idx] = _WRITING
+        self._frames[idx] = image
+        self._slots["time"][idx] = time
+        self._slots["gaze"][idx] = np.nan if gaze is None else np.ravel(gaze)
+        self._slots["seq"][idx] = seq
+        self._header[0] = seq
+        return seq
+
+    def get(self, seq: int) -> SharedFrame | None:
+        """Returns the frame with the given sequence number, or None if it is not in
+        the ring (anymore).
+        """
+        idx = seq % self.num_slots
+        slot = self._slots[idx].copy()
+        if slot["seq"] != seq:
+            return None
+        gaze = None if np.isnan(slot["gaze"]).any() else slot["gaze"]
+        return SharedFrame(seq, int(slot["time"]), self._frames[idx], gaze)
+
+    def is_current(self, seq: int) -> bool:
+        """Whether the frame with the given sequence number was not overwritten."""
+        return int(self._slots["seq"][seq % self.num_slots]) == seq
+
+    def wait_for(self, seq: int, timeout: float | None = None) -> bool:
+        """Polls until a frame with at least the given sequence number was written.
+
+        Returns:
+            False if the ring was closed or the timeout passed before.
+
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.latest_seq < seq:
+            if self.closed or (deadline is not None and time.perf_counter() > deadline):
+                return False
+            time.sleep(0.0005)
+        return True
+
+    def close_writing(self) -> None:
+        """Announces to the readers that no more frames will follow."""
+        self._header[1] = 1
+
+    def close(self) -> None:
+        # The array views have to be released before the memory can be closed
+        del self._header, self._slots, self._frames
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def publish(
+    source: EyeTrackingSource,
+    ring: SharedFrameRing,
+    num_samples: int | None = None,
+    undistort: bool = True,
+) -> int:
+    """Writes the samples of a source into a ring until the source ends.
+
+    The ring is closed for writing afterwards, which ends the tracking workers.
+    Timeouts of the source are waited out and repeated samples are skipped.
+
+    Args:
+        source: Source to publish. It is not closed.
+        ring: Ring to write into. Its shape has to match the scene images.
+        num_samples: Maximum number of published samples.
+        undistort: Publish the undistorted scene images and gaze.
+
+    Returns:
+        The number of published samples.
+
+    """
+    count = 0
+    last_time: int | None = None
+    try:
+        while num_samples is None or count < num_samples:
+            try:
+                data = source.get_sample()
+            except SampleTimeoutError:
+                continue
+            except StopIteration:
+                break
+            if data.time == last_time:
+                # Live sources may return their newest sample again
+                time.sleep(0.001)
+                continue
+            last_time = data.time
+            gaze = data.gaze_scene_distorted
+            if undistort:
+                image = data.scene_image_undistorted
+                if gaze is not None:
+                    gaze = data.gaze_scene_undistorted
+            else:
+                image = data.scene_image_distorted
+            ring.put(data.time, image, gaze)
+            count += 1
+    finally:
+        ring.close_writing()
+    return count
+
+
+def track_shared_frames(
+    ring_name: str,
+    shape: tuple[int, ...],
+    num_slots: int,
+    camera_matrix: npt.NDArray[np.float64],
+    params: TrackerParams,
+    results: "Queue[SharedTrackingResult | None]",
+    worker_index: int = 0,
+    num_workers: int = 1,
+) -> None:
+    """Tracks frames of a shared ring and puts the results into a queue.
+
+    Meant to be run in worker processes. The workers split the frames by their
+    sequence numbers. A worker falling behind skips to the oldest of its frames
+    still in the ring, and results of frames overwritten during tracking are
+    dropped. Ends once the ring is closed and all frames are processed, with None
+    put into the queue.
+
+    Args:
+        ring_name: Name of the SharedFrameRing.
+        shape: Frame shape of the ring.
+        num_slots: Number of slots of the ring.
+        camera_matrix: Camera matrix of the published images.
+        params: Tracker parameters.
+        results: Multiprocessing queue receiving SharedTrackingResult records.
+        worker_index: Index of this worker.
+        num_workers: Total number of workers.
+
+    """
+    ring = SharedFrameRing(shape, num_slots, name=ring_name)
+    tracker = Tracker(camera_matrix, None, params)
+    seq = worker_index
+    try:
+        while ring.wait_for(seq) or ring.latest_seq >= seq:
+            oldest = ring.latest_seq - num_slots + 1
+            if seq < oldest:
+                # Skip to the oldest frame of this worker which is still available
+                seq += -(-(oldest - seq) // num_workers) * num_workers
+                continue
+
+            frame = ring.get(seq)
+            if frame is not None:
+                localization = tracker(frame.image)
+                gaze_mapped = None
+                if localization is not None and frame.gaze is not None:
+                    gaze_mapped = localization.img2plane @ [*frame.gaze, 1]
+                    gaze_mapped = gaze_mapped[:2] / gaze_mapped[2]
+                if ring.is_current(seq):
+                    results.put(
+                        SharedTrackingResult(seq, frame.time, localization, gaze_mapped)
+                    )
+                # Views of the shared memory have to be released before closing it
+                del frame
+            seq += num_workers
+    finally:
+        results.put(None)
+        del tracker
+        ring.close()
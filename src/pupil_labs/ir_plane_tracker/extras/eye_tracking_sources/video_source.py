@@ -1,33 +1,118 @@
+from collections.abc import Sequence
+from pathlib import Path
+
 import numpy as np
+import numpy.typing as npt
 
+from pupil_labs.camera import Camera
 from pupil_labs.video import Reader
 
 from . import (
     EyeTrackingData,
     EyeTrackingSource,
 )
+from .matching import match_nearest
 
 
 class VideoSource(EyeTrackingSource):
-    def __init__(self, path: str):
+    """Reads scene frames from a video file without gaze, e.g. of a screen study.
+
+    Decoding is multi-threaded by `pupil_labs.video.Reader`. Frames can be decoded
+    sparsely, either every `step`-th frame or only the frames nearest to the given
+    timestamps. Samples are returned in order by `get_sample`, but can also be
+    accessed by index or seeked to by timestamp.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        intrinsics: Camera | None = None,
+        step: int = 1,
+        timestamps: Sequence[int] | npt.NDArray[np.int64] | None = None,
+        gray: bool = False,
+    ):
+        """Creates a VideoSource instance.
+
+        Args:
+            path: Path to the video file.
+            intrinsics: Intrinsics of the camera that recorded the video. If None,
+                distortion-free pinhole intrinsics with a horizontal field of view of
+                about 53° are assumed, which suffice for homography-only tracking.
+            step: Decode only every `step`-th frame.
+            timestamps: Decode only the frames nearest to these timestamps in
+                nanoseconds since the start of the video. Overrides `step`.
+            gray: Decode the frames directly to grayscale images. For YUV videos this
+                is the limited range Y plane, which is fine for tracking.
+
+        """
         super().__init__()
+        self._reader = Reader(path)
+        self.gray = gray
 
-        video = Reader(path)
-        self._frame_iterator = iter(video)
+        if intrinsics is None:
+            width, height = self._reader.width, self._reader.height
+            if width is None or height is None:
+                self._reader.close()
+                raise ValueError(
+                    f"Could not read the frame size of {path}, pass the intrinsics "
+                    "explicitly."
+                )
+            intrinsics = Camera(
+                pixel_width=width,
+                pixel_height=height,
+                camera_matrix=np.array([
+                    [width, 0.0, width / 2],
+                    [0.0, width, height / 2],
+                    [0.0, 0.0, 1.0],
+                ]),
+            )
+        self.scene_intrinsics = intrinsics
 
-    def get_sample(self) -> EyeTrackingData:
-        frame = next(self._frame_iterator)
-        gaze = np.zeros(2, dtype=np.float64)
-        data = EyeTrackingData(
-            time=frame.time,
-            gaze_scene_distorted=gaze,
-            scene_image_distorted=frame.bgr,
+        frame_ts = (np.asarray(self._reader.container_timestamps) * 1e9).astype(
+            np.int64
+        )
+        if timestamps is not None:
+            indices = np.unique(
+                match_nearest(np.asarray(timestamps, dtype=np.int64), frame_ts)
+            )
+        else:
+            indices = np.arange(0, len(frame_ts), step)
+        self._indices = indices
+        self.timestamps = frame_ts[indices]
+        """Timestamps of all samples in nanoseconds since the start of the video."""
+
+        self.position = 0
+        """Index of the sample returned by the next call of `get_sample`."""
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index: int) -> EyeTrackingData:
+        frame_idx = int(self._indices[index])
+        gray = self.gray
+        return EyeTrackingData(
+            time=int(self.timestamps[index]),
+            gaze_scene_distorted=np.zeros(2, dtype=np.float64),
+            # The frame is decoded only when the image is accessed
+            scene_image_distorted=lambda: self._decode(frame_idx, gray),
             intrinsics=self.scene_intrinsics,
             eye_image=None,
         )
+
+    def _decode(self, frame_idx: int, gray: bool) -> npt.NDArray[np.uint8]:
+        frame = self._reader[frame_idx]
+        return frame.gray if gray else frame.bgr
+
+    def seek(self, time: int) -> None:
+        """Continues with the first sample at or after the given timestamp."""
+        self.position = int(np.searchsorted(self.timestamps, time))
+
+    def get_sample(self) -> EyeTrackingData:
+        if self.position >= len(self):
+            raise StopIteration
+        data = self[self.position]
+        self.position += 1
         return data
 
-    def close(self):
-        self.scene_stop_event.set()
-        if self._pipeline is not None:
-            self.eye_stop_event.set()
+    def close(self) -> None:
+        self._reader.close()
@@ -0,0 +1,156 @@
+from collections.abc import Hashable
+from contextlib import ExitStack
+from copy import copy
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.ir_plane_tracker.tracker import (
+    DebugData,
+    PlaneLocalization,
+    Tracker,
+    TrackerParams,
+)
+
+
+class MultiPlaneTracker:
+    """Tracks several planes with distinct marker layouts in a single pass.
+
+    Thresholding, contour, fragment and ellipse extraction run only once per frame.
+    The resulting feature line candidates are then matched against the marker layout
+    of every plane, which are distinguished by the cross ratio of their
+    `feature_point_positions_mm`.
+    """
+
+    def __init__(
+        self,
+        camera_matrix: npt.NDArray[np.float64] | None,
+        dist_coeffs: npt.NDArray[np.float64] | None,
+        planes: dict[Hashable, TrackerParams],
+        params: TrackerParams | None = None,
+    ):
+        """Creates a MultiPlaneTracker instance.
+
+        Args:
+            camera_matrix: Camera intrinsic matrix.
+            dist_coeffs: Camera distortion coefficients.
+            planes: Tracker parameters of every plane by plane ID.
+            params: Tracker parameters of the shared feature extraction. If None, the
+                parameters of the first plane are used. The `img_size_factor` and
+                `downscale_input` of all planes must match these, as the feature
+                points of all planes are found in the same extracted image.
+
+        """
+        if len(planes) == 0:
+            raise ValueError("At least one plane is required.")
+
+        self.trackers = {
+            plane_id: Tracker(camera_matrix, dist_coeffs, plane_params)
+            for plane_id, plane_params in planes.items()
+        }
+        if params is None:
+            params = next(iter(planes.values()))
+        self._feature_tracker = Tracker(camera_matrix, dist_coeffs, params)
+
+        self._check_input_scaling()
+        self._check_distinct_cross_ratios()
+
+    def _check_input_scaling(self) -> None:
+        params = self._feature_tracker.params
+        for plane_id, tracker in self.trackers.items():
+            if (
+                tracker.params.img_size_factor != params.img_size_factor
+                or tracker.params.downscale_input != params.downscale_input
+            ):
+                raise ValueError(
+                    f"The img_size_factor and downscale_input of plane {plane_id} "
+                    "do not match those of the shared feature extraction."
+                )
+
+    def _check_distinct_cross_ratios(self) -> None:
+        plane_ids = list(self.trackers)
+        for i, id1 in enumerate(plane_ids):
+            for id2 in plane_ids[i + 1 :]:
+                tracker1 = self.trackers[id1]
+                tracker2 = self.trackers[id2]
+                max_cr_error = (
+                    tracker1.params.max_cr_error + tracker2.params.max_cr_error
+                )
+                if abs(tracker1.target_cr - tracker2.target_cr) <= max_cr_error:
+                    raise ValueError(
+                        f"The marker layouts of planes {id1} and {id2} can not be "
+                        "distinguished by their cross ratios."
+                    )
+
+    @property
+    def params(self) -> TrackerParams:
+        return self._feature_tracker.params
+
+    @params.setter
+    def params(self, value: TrackerParams) -> None:
+        self._feature_tracker.params = value
+
+    @property
+    def debug(self) -> DebugData:
+        """Debug data of the shared feature extraction."""
+        return self._feature_tracker.debug
+
+    @property
+    def camera_matrix(self) -> npt.NDArray[np.float64] | None:
+        return self._feature_tracker.camera_matrix
+
+    @camera_matrix.setter
+    def camera_matrix(self, value: npt.NDArray[np.float64] | None) -> None:
+        self._feature_tracker.camera_matrix = value
+        for tracker in self.trackers.values():
+            tracker.camera_matrix = value
+
+    def __call__(
+        self, image: npt.NDArray[np.uint8]
+    ) -> dict[Hashable, PlaneLocalization | None]:
+        """Tracks all planes in the given image.
+
+        Args:
+            image: Input image.
+
+        Returns:
+            PlaneLocalization of every plane by plane ID, None for planes that were
+            not found.
+
+        """
+        with ExitStack() as stack:
+            # Snapshot the parameters of all trackers for this call
+            for tracker in [self._feature_tracker, *self.trackers.values()]:
+                stack.enter_context(tracker.call_context())
+            return self._track(image)
+
+    def _track(
+        self, image: npt.NDArray[np.uint8]
+    ) -> dict[Hashable, PlaneLocalization | None]:
+        feature_tracker = self._feature_tracker
+        localizations: dict[Hashable, PlaneLocalization | None] = dict.fromkeys(
+            self.trackers
+        )
+
+        features = feature_tracker.extract_features(image)
+        if features is None:
+            return localizations
+        fragments, ellipses = features
+
+        target_crs = [tracker.target_cr for tracker in self.trackers.values()]
+        # The candidates are filtered per plane, so keep all that any plane accepts
+        max_cr_error = max(
+            tracker.params.max_cr_error for tracker in self.trackers.values()
+        )
+        feature_lines, cr_values = feature_tracker.find_feature_line_candidates(
+            fragments, ellipses, target_crs, max_cr_error
+        )
+
+        for plane_id, tracker in self.trackers.items():
+            # Every plane starts from the shared debug data of the feature extraction
+            tracker.debug = copy(feature_tracker.debug)
+            tracker.debug.params = tracker.params
+            plane_lines = tracker.filter_feature_lines(feature_lines, cr_values)
+            localizations[plane_id] = tracker.localize(plane_lines, image)
+
+        return localizations
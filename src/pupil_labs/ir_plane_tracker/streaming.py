@@ -0,0 +1,201 @@
+import asyncio
+import queue
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from typing import TYPE_CHECKING, NamedTuple, cast
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import (
+        EyeTrackingData,
+        EyeTrackingSource,
+    )
+    from pupil_labs.ir_plane_tracker.tracker import PlaneLocalization, Tracker
+
+_END = object()
+
+
+class SampleTimeoutError(RuntimeError):
+    """Raised by `EyeTrackingSource.get_sample` if no sample arrived in time.
+
+    The source stays usable, and a later call may succeed again.
+    """
+
+
+class TrackedSample(NamedTuple):
+    """Tracking result of an eye tracking sample."""
+
+    data: "EyeTrackingData"
+    """The tracked sample."""
+    localization: "PlaneLocalization | None"
+    """Localization of the plane, or None if it was not found."""
+    gaze_mapped: npt.NDArray[np.float64] | None
+    """Gaze point in normalized plane coordinates, or None if it is unknown."""
+
+
+class SampleFetcher:
+    """Fetches samples of a source on a background thread into a bounded queue.
+
+    Samples are optionally passed through `prepare` on the background thread as
+    well, which is how `PrefetchingSource` converts images ahead of time. The end of
+    the source and errors raised by it are passed on to `get` in order, while
+    timeouts of the source are waited out and samples repeating the previous one are
+    skipped.
+    """
+
+    def __init__(
+        self,
+        source: "EyeTrackingSource",
+        num_samples: int,
+        prepare: "Callable[[EyeTrackingData], EyeTrackingData] | None" = None,
+        name: str = "SampleFetcher",
+    ):
+        """Creates a SampleFetcher and starts fetching.
+
+        Args:
+            source: Source to fetch the samples from. It is not closed.
+            num_samples: Maximum number of fetched samples waiting in the queue.
+            prepare: Function applied to every sample on the background thread.
+            name: Name of the background thread.
+
+        """
+        self.source = source
+        self.prepare = prepare
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=num_samples)
+        self._stop_event = Event()
+        self._thread = Thread(target=self._fetch, name=name, daemon=True)
+        self._thread.start()
+
+    def _put(self, item: object) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            else:
+                return True
+        return False
+
+    def _fetch(self) -> None:
+        last_time: int | None = None
+        while not self._stop_event.is_set():
+            try:
+                data = self.source.get_sample()
+                if data.time == last_time:
+                    # Live sources may return their newest sample again
+                    self._stop_event.wait(0.001)
+                    continue
+                last_time = data.time
+                if self.prepare is not None:
+                    data = self.prepare(data)
+            except SampleTimeoutError:
+                continue
+            except StopIteration:
+                self._put(_END)
+                return
+            except Exception as e:
+                self._put(e)
+                return
+            if not self._put(data):
+                return
+
+    def get(self) -> "EyeTrackingData":
+        """Returns the next sample.
+
+        Raises:
+            StopIteration: The source is exhausted.
+            RuntimeError: The fetcher has been stopped.
+
+        """
+        while True:
+            if self._stop_event.is_set():
+                raise RuntimeError("Fetching samples has been stopped.")
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is not _END and not isinstance(item, Exception):
+                return cast("EyeTrackingData", item)
+            # Keep the end marker or error for subsequent calls
+            self._queue.put(item)
+            if isinstance(item, Exception):
+                raise item
+            raise StopIteration
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stops fetching and waits up to `timeout` seconds for the thread to end."""
+        self._stop_event.set()
+        self._thread.join(timeout)
+
+
+class TrackingStream:
+    """Tracks the samples of an eye tracking source as they are fetched.
+
+    Samples are fetched on a background thread, with at most `prefetch` samples
+    waiting to be tracked. The stream can be iterated both synchronously, which
+    tracks in the iterating thread, and asynchronously, which tracks in an executor
+    so the event loop is never blocked. Each iteration starts fetching anew and
+    ends when the source raises StopIteration. The source is not closed.
+    """
+
+    def __init__(
+        self,
+        tracker: "Tracker",
+        source: "EyeTrackingSource",
+        prefetch: int = 2,
+        undistort: bool = True,
+    ):
+        self.tracker = tracker
+        self.source = source
+        self.prefetch = prefetch
+        self.undistort = undistort
+
+    def _track(self, data: "EyeTrackingData") -> TrackedSample:
+        gaze = data.gaze_scene_distorted
+        if self.undistort:
+            image = data.scene_image_undistorted
+            if gaze is not None:
+                gaze = data.gaze_scene_undistorted
+        else:
+            image = data.scene_image_distorted
+
+        localization = self.tracker(image)
+        gaze_mapped = None
+        if localization is not None and gaze is not None:
+            gaze_mapped = localization.img2plane @ [*np.ravel(gaze), 1]
+            gaze_mapped = gaze_mapped[:2] / gaze_mapped[2]
+        return TrackedSample(data, localization, gaze_mapped)
+
+    def _track_next(self, fetcher: SampleFetcher) -> TrackedSample | None:
+        try:
+            data = fetcher.get()
+        except StopIteration:
+            return None
+        return self._track(data)
+
+    def __iter__(self) -> Iterator[TrackedSample]:
+        fetcher = SampleFetcher(self.source, self.prefetch, name="StreamFetcher")
+        try:
+            while (result := self._track_next(fetcher)) is not None:
+                yield result
+        finally:
+            fetcher.stop()
+
+    async def __aiter__(self) -> AsyncIterator[TrackedSample]:
+        loop = asyncio.get_running_loop()
+        fetcher = SampleFetcher(self.source, self.prefetch, name="StreamFetcher")
+        # A single worker keeps the tracker from being called concurrently
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Tracking")
+        try:
+            while True:
+                result = await loop.run_in_executor(executor, self._track_next, fetcher)
+                if result is None:
+                    return
+                yield result
+        finally:
+            executor.shutdown(wait=False)
+            # The fetcher may be blocked in the source, so wait for it off the loop
+            await loop.run_in_executor(None, fetcher.stop)
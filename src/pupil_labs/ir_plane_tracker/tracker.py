@@ -1,12 +1,25 @@
 import itertools
-from dataclasses import dataclass, field
+import threading
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from functools import cached_property
+from typing import TYPE_CHECKING
 
 import cv2
 import numpy as np
 import numpy.typing as npt
 
+from pupil_labs.ir_plane_tracker.streaming import TrackingStream
+
+if TYPE_CHECKING:
+    from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import (
+        EyeTrackingSource,
+    )
+
 
 class Ellipse:
     def __init__(
@@ -78,6 +91,201 @@ def project_to_line(
     return t, projections
 
 
+def _normalize_points(
+    points: npt.NDArray[np.float64], mask: npt.NDArray[np.bool_]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    # Hartley normalization of every point set in the batch, ignoring padding
+    count = mask.sum(axis=1)[:, None]
+    centroid = (points * mask[..., None]).sum(axis=1) / count
+    dist = np.linalg.norm(points - centroid[:, None], axis=2)
+    mean_dist = (dist * mask).sum(axis=1) / count[:, 0]
+    scale = np.sqrt(2) / np.maximum(mean_dist, 1e-12)
+
+    T = np.zeros((len(points), 3, 3))
+    T[:, 0, 0] = scale
+    T[:, 1, 1] = scale
+    T[:, 0, 2] = -scale * centroid[:, 0]
+    T[:, 1, 2] = -scale * centroid[:, 1]
+    T[:, 2, 2] = 1.0
+    normalized = (points - centroid[:, None]) * scale[:, None, None]
+    return normalized, T
+
+
+def fit_homographies(
+    src: npt.NDArray[np.float64],
+    dst: npt.NDArray[np.float64],
+    mask: npt.NDArray[np.bool_],
+) -> npt.NDArray[np.float64]:
+    """Fits homographies to a batch of point sets with the normalized DLT.
+
+    Args:
+        src: Source points of shape (N, M, 2).
+        dst: Destination points of shape (N, M, 2).
+        mask: Boolean mask of shape (N, M) marking the valid points of every set.
+            Point sets with less than M points are padded and masked out.
+
+    Returns:
+        Homographies of shape (N, 3, 3) mapping src to dst.
+
+    """
+    src_n, T_src = _normalize_points(src, mask)
+    dst_n, T_dst = _normalize_points(dst, mask)
+
+    x, y = src_n[..., 0], src_n[..., 1]
+    u, v = dst_n[..., 0], dst_n[..., 1]
+    zeros = np.zeros_like(x)
+    ones = np.ones_like(x)
+    A = np.concatenate(
+        (
+            np.stack((-x, -y, -ones, zeros, zeros, zeros, u * x, u * y, u), axis=-1),
+            np.stack((zeros, zeros, zeros, -x, -y, -ones, v * x, v * y, v), axis=-1),
+        ),
+        axis=1,
+    )
+    # Padded points contribute all-zero rows, which do not change the solution
+    A *= np.concatenate((mask, mask), axis=1)[..., None]
+
+    _, _, Vt = np.linalg.svd(A, full_matrices=False)
+    H = Vt[:, -1].reshape(-1, 3, 3)
+    H = np.linalg.inv(T_dst) @ H @ T_src
+    with np.errstate(divide="ignore", invalid="ignore"):
+        H = H / H[:, 2:, 2:]
+    return H
+
+
+def homography_residuals(
+    H: npt.NDArray[np.float64],
+    src: npt.NDArray[np.float64],
+    dst: npt.NDArray[np.float64],
+    mask: npt.NDArray[np.bool_],
+) -> npt.NDArray[np.float64]:
+    """Mean transfer error of every homography in the batch in dst units."""
+    src_h = np.concatenate((src, np.ones_like(src[..., :1])), axis=2)
+    projected = src_h @ H.transpose(0, 2, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected = projected[..., :2] / projected[..., 2:]
+        error = np.linalg.norm(projected - dst, axis=2)
+        residuals = (error * mask).sum(axis=1) / mask.sum(axis=1)
+    residuals[~np.isfinite(residuals)] = np.inf
+    return residuals
+
+
+def _to_gray(image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)  # type: ignore[return-value]
+    return image
+
+
+def _sample_image(
+    img: npt.NDArray[np.uint8], xs: npt.NDArray[np.float64], ys: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    # Bilinear interpolation of the image at sub-pixel positions
+    samples = cv2.remap(
+        img,
+        xs.astype(np.float32),
+        ys.astype(np.float32),
+        cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_REPLICATE,
+    )
+    return samples.astype(np.float64)
+
+
+def refine_blob_center(
+    img: npt.NDArray[np.uint8], center: npt.NDArray[np.float64], radius: float
+) -> npt.NDArray[np.float64]:
+    """Refines the center of a bright circular blob to sub-pixel precision.
+
+    The center is estimated as the intensity-weighted centroid of a window around the
+    initial estimate, after subtracting the background level of the window.
+    """
+    half_size = max(2.0, 1.5 * radius)
+    offsets = np.arange(-half_size, half_size + 0.5, 0.5)
+    xs, ys = np.meshgrid(center[0] + offsets, center[1] + offsets)
+    window = _sample_image(img, xs, ys)
+
+    weights = window - np.min(window)
+    weights[weights < 0.5 * np.max(weights)] = 0
+    total = np.sum(weights)
+    if total <= 0:
+        return center
+
+    refined = np.array([np.sum(xs * weights), np.sum(ys * weights)]) / total
+    if np.linalg.norm(refined - center) > radius:
+        return center
+    return refined
+
+
+def refine_line_endpoints(
+    img: npt.NDArray[np.uint8],
+    start: npt.NDArray[np.float64],
+    end: npt.NDArray[np.float64],
+    thickness: float,
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Refines the endpoints of a bright line segment to sub-pixel precision.
+
+    The line center is re-fitted from the intensity-weighted centroids of cross
+    sections along the segment. The endpoints are then located where the intensity
+    profile along the refined line crosses the mid level between line and background.
+    """
+    length = np.linalg.norm(end - start)
+    if length < 4:
+        return start, end
+    direction = (end - start) / length
+    normal = np.array([-direction[1], direction[0]])
+
+    # Re-fit the line center from cross sections of the inner part of the segment
+    half_width = max(2.0, thickness)
+    u = np.arange(-half_width, half_width + 0.5, 0.5)
+    t = np.linspace(0.2 * length, 0.8 * length, 12)
+    tt, uu = np.meshgrid(t, u, indexing="ij")
+    xs = start[0] + tt * direction[0] + uu * normal[0]
+    ys = start[1] + tt * direction[1] + uu * normal[1]
+    sections = _sample_image(img, xs, ys)
+    weights = sections - np.min(sections, axis=1, keepdims=True)
+    weights[weights < 0.5 * np.max(weights, axis=1, keepdims=True)] = 0
+    weight_sums = np.sum(weights, axis=1)
+    valid = weight_sums > 0
+    if np.count_nonzero(valid) >= 2:
+        offsets = np.sum(weights * uu, axis=1)[valid] / weight_sums[valid]
+        slope, intercept = np.polyfit(t[valid], offsets, 1)
+        if abs(intercept) < half_width and abs(slope) < 0.2:
+            start = start + intercept * normal
+            direction = direction + slope * normal
+            direction = direction / np.linalg.norm(direction)
+            normal = np.array([-direction[1], direction[0]])
+
+    # Locate both ends on the intensity profile along the line
+    margin = max(3.0, 2 * thickness)
+    t = np.arange(-margin, length + margin + 0.25, 0.25)
+    u = np.linspace(-0.25 * thickness, 0.25 * thickness, 3)
+    tt, uu = np.meshgrid(t, u, indexing="ij")
+    xs = start[0] + tt * direction[0] + uu * normal[0]
+    ys = start[1] + tt * direction[1] + uu * normal[1]
+    profile = np.mean(_sample_image(img, xs, ys), axis=1)
+
+    inner = (t > 0.2 * length) & (t < 0.8 * length)
+    level = 0.5 * (np.median(profile[inner]) + min(profile[0], profile[-1]))
+    above = profile >= level
+
+    refined = []
+    for t_init, step in ((0.0, 1), (length, -1)):
+        idx = int(np.argmin(np.abs(t - t_init)))
+        # Walk outwards until the profile drops below the level
+        while 0 < idx < len(t) - 1 and above[idx]:
+            idx -= step
+        # Walk inwards until the profile rises above the level
+        while 0 < idx < len(t) - 1 and not above[idx + step]:
+            idx += step
+        if not (0 < idx < len(t) - 1) or abs(t[idx] - t_init) > margin:
+            refined.append(t_init)
+            continue
+        p0, p1 = profile[idx], profile[idx + step]
+        frac = (level - p0) / (p1 - p0) if p1 != p0 else 0.5
+        refined.append(t[idx] + step * frac * (t[1] - t[0]))
+
+    return start + refined[0] * direction, start + refined[1] * direction
+
+
 class Fragment:
     def __init__(self, support: npt.NDArray[np.float64 | np.int64]):
         self.support = support
@@ -141,7 +349,11 @@ class Orientation(Enum):
 
 class FeatureLine:
     def __init__(
-        self, points: npt.NDArray[np.float64], projections: npt.NDArray[np.float64]
+        self,
+        points: npt.NDArray[np.float64],
+        projections: npt.NDArray[np.float64],
+        fragment: Fragment | None = None,
+        cr: float = np.nan,
     ):
         dir_vec = points[-1] - points[0]
 
@@ -174,6 +386,23 @@ class FeatureLine:
                 points = points[::-1]
 
         self.points = points
+        self.fragment = fragment
+        """Line fragment the feature line was found on."""
+        self.cr = cr
+        """Cross ratio of the feature points."""
+
+
+class PnPMethod(Enum):
+    """Methods available for estimating the camera pose from point matches."""
+
+    ITERATIVE = "iterative"
+    """Levenberg-Marquardt minimization of the reprojection error."""
+    IPPE = "ippe"
+    """Infinitesimal Plane-based Pose Estimation. Requires co-planar points."""
+    SQPNP = "sqpnp"
+    """Globally optimal Sequential Quadratic Programming PnP."""
+    HOMOGRAPHY = "homography"
+    """Decomposition of the plane-to-image homography. Requires co-planar points."""
 
 
 class LinePositions(Enum):
@@ -183,6 +412,15 @@ class LinePositions(Enum):
     RIGHT = 6
 
 
+ORIENTATION_POSITIONS = {
+    Orientation.LEFT: LinePositions.BOTTOM,
+    Orientation.RIGHT: LinePositions.TOP,
+    Orientation.TOP: LinePositions.LEFT,
+    Orientation.BOTTOM: LinePositions.RIGHT,
+}
+"""Marker position at which a feature line of the given orientation is found."""
+
+
 class FeatureLineCombination:
     def __init__(self) -> None:
         self._map = dict.fromkeys(LinePositions)
@@ -210,23 +448,10 @@ class Combinations:
     def add_line(self, line: FeatureLine, positions: list[LinePositions]) -> None:
         new_combinations = self._combinations.copy()
         for combination in self._combinations:
-            dir1 = line.points[-1] - line.points[0]
             for position in positions:
                 # Some lines need to be co-linear with other lines to be plausible
                 if combination[position] is None:
-                    if not self._min_line_distances_requirements(
-                        position, combination, dir1, line
-                    ):
-                        continue
-
-                    if not self._left_right_order_requirements(
-                        position, combination, dir1, line
-                    ):
-                        continue
-
-                    if not self._top_bottom_order_requirements(
-                        position, combination, dir1, line
-                    ):
+                    if not self.is_compatible(position, combination, line):
                         continue
 
                     c = combination.copy()
@@ -235,6 +460,20 @@ class Combinations:
 
         self._combinations = new_combinations
 
+    def is_compatible(
+        self,
+        position: LinePositions,
+        combination: FeatureLineCombination,
+        line: FeatureLine,
+    ) -> bool:
+        """Checks whether the line can be added at the position of the combination."""
+        dir1 = line.points[-1] - line.points[0]
+        return (
+            self._min_line_distances_requirements(position, combination, dir1, line)
+            and self._left_right_order_requirements(position, combination, dir1, line)
+            and self._top_bottom_order_requirements(position, combination, dir1, line)
+        )
+
     def _min_line_distances_requirements(
         self,
         position: LinePositions,
@@ -315,12 +554,9 @@ class Combinations:
         elif (
             position == LinePositions.BOTTOM
             and combination[LinePositions.TOP] is not None
-        ) or (
-            position == LinePositions.BOTTOM
-            and combination[LinePositions.TOP] is not None
         ):
-            p1 = line.points[0]
-            p2 = combination[LinePositions.TOP].points[0]
+            p1 = combination[LinePositions.TOP].points[0]
+            p2 = line.points[0]
             if p1[1] > p2[1]:
                 return False
 
@@ -418,6 +654,27 @@ class TrackerParams:
     feature_line_max_projection_error: float = 2.0
 
     optimization_error_threshold: float = 15.0
+    pnp_method: PnPMethod = PnPMethod.ITERATIVE
+    """Solver used to estimate the camera pose of every candidate combination."""
+    pnp_refine: bool = False
+    """Refine the pose of the winning combination with Levenberg-Marquardt."""
+    pnp_candidate_count: int = 3
+    """Number of best combinations by homography residual that are solved with PnP."""
+    subpixel_refinement: bool = False
+    """Refine the matched feature points to sub-pixel precision on the gray image."""
+    downscale_input: bool = False
+    """Resize the input image by `img_size_factor` within the tracker.
+
+    Features are detected on the resized image, but are mapped back to (and refined
+    on, see `subpixel_refinement`) the input image before the plane is localized. The
+    localization thus refers to the input image and its camera intrinsics.
+    """
+    homography_only: bool = False
+    """Estimate the plane homography directly instead of the camera pose.
+
+    Camera intrinsics are not required in this mode, but the image is expected to be
+    free of lens distortion.
+    """
     debug: bool = False
 
     def __post_init__(self):
@@ -453,13 +710,31 @@ class TrackerParams:
         with open(params_path) as f:
             params = json.load(f)
 
+        return TrackerParams.from_dict(params)
+
+    @staticmethod
+    def from_dict(params: dict) -> "TrackerParams":
+        params = dict(params)
         if "feature_point_positions_mm" in params:
             params["feature_point_positions_mm"] = np.array(
                 params["feature_point_positions_mm"]
             )
+        if "pnp_method" in params:
+            params["pnp_method"] = PnPMethod(params["pnp_method"])
 
         return TrackerParams(**params)
 
+    def snapshot(self) -> "TrackerParams":
+        """Returns a plain copy of the current parameter values.
+
+        Unlike creating a new instance from the values, the copy is not scaled by
+        `img_size_factor` again.
+        """
+        snapshot = TrackerParams.__new__(TrackerParams)
+        for f in fields(TrackerParams):
+            setattr(snapshot, f.name, copy(getattr(self, f.name)))
+        return snapshot
+
     def __eq__(self, obj: object) -> bool:
         if not isinstance(obj, TrackerParams):
             return False
@@ -495,8 +770,10 @@ class DebugData:
         self.feature_lines_filtered: list[FeatureLine] | None = None
         self.feature_lines_lengths: list[float] | None = None
         self.cr_values: list[float] | None = None
+        self.homography_residuals: npt.NDArray[np.float64] | None = None
         self.optimization_errors: list[float] = []
         self.optimization_final_combination: FeatureLineCombination | None = None
+        self.fast_path = False
         self.plane_corners: npt.NDArray[np.float64] | None = None
 
     @property
@@ -853,6 +1130,21 @@ class DebugData:
         cv2.imshow("Tracked Plane", vis)
 
 
+class TrackingContext:
+    """State of a single Tracker call.
+
+    Every thread has its own context, so that one Tracker can be called from several
+    threads at once. The parameters are snapshotted at the start of a call, so that
+    parameter changes take effect with the next call rather than mid-frame.
+    """
+
+    def __init__(self, params: TrackerParams | None, debug: DebugData) -> None:
+        self.params = params
+        """Parameters of the running call, or None outside of calls."""
+        self.debug = debug
+        self.vis: npt.NDArray[np.uint8] | None = None
+
+
 @dataclass
 class PlaneLocalization:
     """Result of plane localization."""
@@ -872,14 +1164,15 @@ class Tracker:
 
     def __init__(
         self,
-        camera_matrix: npt.NDArray[np.float64],
-        dist_coeffs: npt.NDArray[np.float64],
+        camera_matrix: npt.NDArray[np.float64] | None,
+        dist_coeffs: npt.NDArray[np.float64] | None,
         params: TrackerParams | None = None,
     ):
         """Creates a Tracker instance for tracking planes marked with markers.
 
         Args:
-            camera_matrix: Camera intrinsic matrix.
+            camera_matrix: Camera intrinsic matrix. May be None if
+                `params.homography_only` is set.
             dist_coeffs: Camera distortion coefficients.
             params: Tracker parameters. If None, default parameters are used.
 
@@ -891,16 +1184,74 @@ class Tracker:
         else:
             self.params = params
 
-        self.debug = DebugData(self.params)
+        self._local = threading.local()
+        self._counters_lock = threading.Lock()
+        self.stage_counters: Counter[str] = Counter()
+        """Number of frames that reached the individual tracking stages.
+
+        `frames` counts all tracked frames, `features` those with enough fragments and
+        ellipses, `feature_lines` those with enough feature lines, `fast_path` those
+        localized with the unambiguous combination of all four markers and
+        `localized` all frames in which the plane was found.
+        """
+
+    @property
+    def _intrinsics(
+        self,
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Camera matrix and distortion coefficients for estimating the camera pose."""
+        if self.camera_matrix is None:
+            raise ValueError(
+                "A camera matrix is required to estimate the camera pose. Pass one "
+                "or set `params.homography_only`."
+            )
+        if self.dist_coeffs is None:
+            return self.camera_matrix, np.zeros(5)
+        return self.camera_matrix, self.dist_coeffs
+
+    @property
+    def _context(self) -> TrackingContext:
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = TrackingContext(None, DebugData(self._params))
+            self._local.context = context
+        return context
 
     @property
     def params(self) -> TrackerParams:
-        return self._params
+        """Tracker parameters.
+
+        Within a call, this is the snapshot taken at its start. Setting the
+        parameters affects the calls started afterwards.
+        """
+        params = self._context.params
+        return self._params if params is None else params
 
     @params.setter
     def params(self, value: TrackerParams) -> None:
         self._params = value
 
+    @property
+    def debug(self) -> DebugData:
+        """Debug data of the current or last call in the calling thread."""
+        return self._context.debug
+
+    @debug.setter
+    def debug(self, value: DebugData) -> None:
+        self._context.debug = value
+
+    @property
+    def vis(self) -> npt.NDArray[np.uint8] | None:
+        return self._context.vis
+
+    @vis.setter
+    def vis(self, value: npt.NDArray[np.uint8] | None) -> None:
+        self._context.vis = value
+
+    def _count(self, stage: str) -> None:
+        with self._counters_lock:
+            self.stage_counters[stage] += 1
+
     @property
     def obj_point_map(self) -> dict[LinePositions, npt.NDArray[np.float64]]:
         obj_map = {
@@ -1079,9 +1430,30 @@ class Tracker:
     def find_feature_lines(
         self, fragments: list[Fragment], ellipses: list[Ellipse]
     ) -> list[FeatureLine]:
+        feature_lines, cr_values = self.find_feature_line_candidates(
+            fragments, ellipses, [self.target_cr]
+        )
+        return self.filter_feature_lines(feature_lines, cr_values)
+
+    def find_feature_line_candidates(
+        self,
+        fragments: list[Fragment],
+        ellipses: list[Ellipse],
+        target_crs: list[float],
+        max_cr_error: float | None = None,
+    ) -> tuple[list[FeatureLine], list[float]]:
+        """Finds fragment and ellipse pairs whose cross ratio is close to any of the
+        given target cross ratios.
+
+        Candidates within 1.5 times `max_cr_error` of a target are kept, which
+        defaults to the `max_cr_error` of this tracker.
+        """
         if len(ellipses) < 2 or len(fragments) < 1:
-            return []
+            return [], []
 
+        if max_cr_error is None:
+            max_cr_error = self.params.max_cr_error
+        target_crs_arr = np.array(target_crs)
         ellipse_points = np.array([e.center for e in ellipses])
         feature_lines = []
         cr_values = []
@@ -1123,7 +1495,7 @@ class Tracker:
 
                 # Pick up candidates that are close to good enough so we have more
                 # information for debugging.
-                if abs(cr - self.target_cr) < self.params.max_cr_error * 1.5:
+                if np.any(np.abs(cr - target_crs_arr) < max_cr_error * 1.5):
                     feature_line_points = np.array([
                         frag.start_pt,
                         frag.end_pt,
@@ -1131,9 +1503,28 @@ class Tracker:
                         ellipse_candidates[j],
                     ])
                     feature_line_points = feature_line_points[ordered_indices]
-                    feature_lines.append(FeatureLine(feature_line_points, t_values))
+                    feature_lines.append(
+                        FeatureLine(feature_line_points, t_values, frag, cr)
+                    )
                     cr_values.append(cr)
 
+        return feature_lines, cr_values
+
+    def filter_feature_lines(
+        self, feature_lines: list[FeatureLine], cr_values: list[float]
+    ) -> list[FeatureLine]:
+        """Keeps the candidates matching the cross ratio and size of this tracker's
+        markers.
+        """
+        target_cr = self.target_cr
+        candidates = [
+            (line, cr)
+            for line, cr in zip(feature_lines, cr_values, strict=True)
+            if abs(cr - target_cr) < self.params.max_cr_error * 1.5
+        ]
+        feature_lines = [line for line, _ in candidates]
+        cr_values = [cr for _, cr in candidates]
+
         self.debug.feature_lines_candidates = feature_lines
         self.debug.cr_values = cr_values
 
@@ -1148,7 +1539,7 @@ class Tracker:
             for line, cr, length in zip(
                 feature_lines, cr_values, line_lengths, strict=True
             )
-            if abs(cr - self.target_cr) <= self.params.max_cr_error
+            if abs(cr - target_cr) <= self.params.max_cr_error
             and length <= self.params.max_feature_line_length
         ]
 
@@ -1156,16 +1547,67 @@ class Tracker:
 
         return feature_lines
 
+    def refine_feature_lines(
+        self,
+        feature_lines: list[FeatureLine],
+        image: npt.NDArray[np.uint8] | None = None,
+    ) -> list[FeatureLine]:
+        """Maps the feature points to input image coordinates and refines them.
+
+        The first two points of every feature line are the fragment endpoints, the
+        last two the ellipse centers. Refined points are returned as new feature lines.
+
+        Args:
+            feature_lines: Feature lines found in the detection image.
+            image: Input image, either BGR or grayscale. Required for
+                `subpixel_refinement`, without it the points are only mapped.
+
+        """
+        factor = 1.0
+        if self.params.downscale_input:
+            factor = self.params.img_size_factor
+        refine = self.params.subpixel_refinement and image is not None
+        if factor == 1.0 and not refine:
+            return feature_lines
+
+        gray = None
+        if refine and image is not None:
+            gray = _to_gray(image)
+        positions = self.params.feature_point_positions_mm
+        refined_lines = []
+        for line in feature_lines:
+            # Pixel centers of the resized image are offset by half a pixel
+            points = (line.points + 0.5) / factor - 0.5
+            if gray is not None:
+                line_length_mm = positions[3] - positions[2]
+                px_per_mm = np.linalg.norm(points[1] - points[0]) / line_length_mm
+                points[0], points[1] = refine_line_endpoints(
+                    gray,
+                    points[0],
+                    points[1],
+                    self.params.line_thickness_mm * px_per_mm,
+                )
+                radius = self.params.circle_diameter_mm / 2 * px_per_mm
+                points[2] = refine_blob_center(gray, points[2], radius)
+                points[3] = refine_blob_center(gray, points[3], radius)
+
+            refined_line = copy(line)
+            refined_line.points = points
+            refined_lines.append(refined_line)
+
+        return refined_lines
+
     def get_obj_and_img_points(
         self, combination: FeatureLineCombination
     ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
         img_points = []
         obj_points = []
+        obj_point_map = self.obj_point_map
         for position in LinePositions:
             if combination[position] is not None:
                 img_points.extend(list(combination[position].points))
 
-                obj_points.extend(self.obj_point_map[position])
+                obj_points.extend(obj_point_map[position])
 
         img_points = np.array(img_points, dtype=np.float64)
         obj_points = np.array(obj_points, dtype=np.float64)
@@ -1176,37 +1618,177 @@ class Tracker:
     ) -> Combinations:
         combinations = Combinations(self.params.min_feature_line_count)
         for line in feature_lines:
-            if line.orientation == Orientation.LEFT:
-                combinations.add_line(line, [LinePositions.BOTTOM])
-            elif line.orientation == Orientation.RIGHT:
-                combinations.add_line(line, [LinePositions.TOP])
-            elif line.orientation == Orientation.TOP:
-                combinations.add_line(line, [LinePositions.LEFT])
-            elif line.orientation == Orientation.BOTTOM:
-                combinations.add_line(line, [LinePositions.RIGHT])
-            else:
+            if line.orientation not in ORIENTATION_POSITIONS:
                 raise ValueError("Unknown orientation")
+            combinations.add_line(line, [ORIENTATION_POSITIONS[line.orientation]])
 
         combinations.filter_and_sort()
 
         return combinations
 
+    def get_unambiguous_combination(
+        self, feature_lines: list[FeatureLine]
+    ) -> FeatureLineCombination | None:
+        """Returns the combination of all four markers if it is the only one possible.
+
+        This is the case if there is exactly one feature line per orientation and the
+        lines are consistently placed, i.e. the enumeration of all combinations can be
+        skipped. Duplicate lines on the same fragment are collapsed beforehand.
+        """
+        feature_lines = self.collapse_duplicate_lines(feature_lines)
+        if len(feature_lines) != len(LinePositions):
+            return None
+
+        lines_by_position = {
+            ORIENTATION_POSITIONS[line.orientation]: line for line in feature_lines
+        }
+        if len(lines_by_position) != len(LinePositions):
+            return None
+
+        checker = Combinations(len(LinePositions))
+        combination = FeatureLineCombination()
+        for position, line in lines_by_position.items():
+            if not checker.is_compatible(position, combination, line):
+                return None
+            combination[position] = line
+
+        return combination
+
+    def collapse_duplicate_lines(
+        self, feature_lines: list[FeatureLine]
+    ) -> list[FeatureLine]:
+        """Keeps only the best of the feature lines sharing a fragment.
+
+        A fragment often yields a second candidate line with the same orientation,
+        whose outer feature point is a nearby blob instead of the marker circle. Of
+        these, the line with the cross ratio closest to the target is kept.
+        """
+        target_cr = self.target_cr
+        best_lines: dict[tuple[int, Orientation], FeatureLine] = {}
+        for line in feature_lines:
+            fragment = line.fragment if line.fragment is not None else line
+            key = (id(fragment), line.orientation)
+            best = best_lines.get(key)
+            if best is None or abs(line.cr - target_cr) < abs(best.cr - target_cr):
+                best_lines[key] = line
+        return list(best_lines.values())
+
+    def solve_pnp(
+        self,
+        obj_points: npt.NDArray[np.float64],
+        img_points: npt.NDArray[np.float64],
+    ) -> tuple[bool, npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        method = self.params.pnp_method
+        if method == PnPMethod.HOMOGRAPHY:
+            return self._solve_pnp_homography(obj_points, img_points)
+
+        flags = {
+            PnPMethod.ITERATIVE: cv2.SOLVEPNP_ITERATIVE,
+            PnPMethod.IPPE: cv2.SOLVEPNP_IPPE,
+            PnPMethod.SQPNP: cv2.SOLVEPNP_SQPNP,
+        }[method]
+        camera_matrix, dist_coeffs = self._intrinsics
+        ret, rvec, tvec = cv2.solvePnP(
+            obj_points, img_points, camera_matrix, dist_coeffs, flags=flags
+        )
+        return ret, rvec, tvec
+
+    def _solve_pnp_homography(
+        self,
+        obj_points: npt.NDArray[np.float64],
+        img_points: npt.NDArray[np.float64],
+    ) -> tuple[bool, npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        # With normalized image coordinates the homography of the z=0 plane is
+        # proportional to [r1 r2 t].
+        camera_matrix, dist_coeffs = self._intrinsics
+        norm_points = cv2.undistortPoints(
+            img_points.reshape(-1, 1, 2), camera_matrix, dist_coeffs
+        ).reshape(-1, 2)
+        H, _ = cv2.findHomography(obj_points[:, :2], norm_points)
+        if H is None:
+            return False, np.zeros((3, 1)), np.zeros((3, 1))
+
+        scale = 2.0 / (np.linalg.norm(H[:, 0]) + np.linalg.norm(H[:, 1]))
+        if H[2, 2] < 0:
+            # The plane must be in front of the camera
+            scale = -scale
+        r1 = H[:, 0] * scale
+        r2 = H[:, 1] * scale
+        R = np.column_stack((r1, r2, np.cross(r1, r2)))
+
+        # Project onto the closest proper rotation matrix
+        U, _, Vt = np.linalg.svd(R)
+        R = U @ np.diag([1.0, 1.0, np.linalg.det(U @ Vt)]) @ Vt
+
+        rvec, _ = cv2.Rodrigues(R)
+        tvec = (H[:, 2] * scale).reshape(3, 1)
+        return True, rvec, tvec
+
+    def rank_combinations(
+        self, combinations: Iterable[FeatureLineCombination]
+    ) -> list[FeatureLineCombination]:
+        """Ranks all combinations at once by the residual of a plane homography.
+
+        A homography is fitted to every combination in a single batched DLT.
+        Combinations with a residual below the optimization threshold come first,
+        preferring those with more lines, followed by the rest. The ranking thus does
+        not depend on the order in which the combinations were enumerated.
+        """
+        combinations_list = list(combinations)
+        if len(combinations_list) == 0:
+            self.debug.homography_residuals = np.array([])
+            return []
+
+        # Stack the point sets of all combinations, padding those with fewer lines
+        obj_point_map = self.obj_point_map
+        points_per_line = len(self.params.feature_point_positions_mm)
+        max_count = points_per_line * len(LinePositions)
+        src = np.zeros((len(combinations_list), max_count, 2))
+        dst = np.zeros((len(combinations_list), max_count, 2))
+        mask = np.zeros((len(combinations_list), max_count), dtype=bool)
+        for i, combination in enumerate(combinations_list):
+            offset = 0
+            for position in LinePositions:
+                line = combination[position]
+                if line is not None:
+                    end = offset + points_per_line
+                    src[i, offset:end] = obj_point_map[position][:, :2]
+                    dst[i, offset:end] = line.points
+                    mask[i, offset:end] = True
+                    offset = end
+
+        H = fit_homographies(src, dst, mask)
+        residuals = homography_residuals(H, src, dst, mask)
+        self.debug.homography_residuals = residuals
+
+        threshold = self.optimization_error_threshold
+        order = sorted(
+            range(len(combinations_list)),
+            key=lambda i: (
+                residuals[i] >= threshold,
+                -len(combinations_list[i]),
+                residuals[i],
+            ),
+        )
+        return [combinations_list[i] for i in order]
+
     def fit_camera_pose(
-        self, combinations: Combinations
+        self,
+        combinations: Iterable[FeatureLineCombination],
+        rank: bool = True,
     ) -> tuple[npt.NDArray[np.float64] | None, npt.NDArray[np.float64] | None]:
         rvec = tvec = None
         mean_error = float("inf")
         num_optimizations = 0
         self.debug.optimization_errors = []
-        for combination in combinations:
+        candidates = list(combinations)
+        if rank:
+            candidates = self.rank_combinations(candidates)
+            candidates = candidates[: self.params.pnp_candidate_count]
+        for combination in candidates:
             obj_points, img_points = self.get_obj_and_img_points(combination)
 
-            ret, rvec, tvec = cv2.solvePnP(
-                obj_points,
-                img_points,
-                self.camera_matrix,
-                self.dist_coeffs,
-            )
+            ret, rvec, tvec = self.solve_pnp(obj_points, img_points)
             num_optimizations += 1
 
             if not ret:
@@ -1217,32 +1799,96 @@ class Tracker:
 
             self.debug.optimization_errors.append(mean_error)
 
-            if mean_error < self.params.optimization_error_threshold:
+            if mean_error < self.optimization_error_threshold:
                 break
 
-        if mean_error >= self.params.optimization_error_threshold:
+        if mean_error >= self.optimization_error_threshold:
             rvec = tvec = None
 
         if rvec is not None and tvec is not None:
+            if self.params.pnp_refine:
+                # Only the winning combination is refined, the screening above can
+                # thus use a cheap solver.
+                camera_matrix, dist_coeffs = self._intrinsics
+                rvec, tvec = cv2.solvePnPRefineLM(
+                    obj_points, img_points, camera_matrix, dist_coeffs, rvec, tvec
+                )
+                mean_error = self.reprojection_error(obj_points, img_points, rvec, tvec)
+                self.debug.optimization_errors.append(mean_error)
+
             self.debug.optimization_final_combination = combination
 
         return rvec, tvec
 
-    def calculate_localization(
-        self, rvec: npt.NDArray[np.float64], tvec: npt.NDArray[np.float64]
-    ) -> PlaneLocalization:
-        plane_corners = np.array([
+    @property
+    def optimization_error_threshold(self) -> float:
+        """Reprojection error threshold in pixels of the localized feature points.
+
+        With `downscale_input` the feature points are localized in the input image,
+        so the threshold which is scaled to the detection image is scaled back.
+        """
+        if self.params.downscale_input:
+            return (
+                self.params.optimization_error_threshold / self.params.img_size_factor
+            )
+        return self.params.optimization_error_threshold
+
+    @property
+    def plane_corners(self) -> npt.NDArray[np.float64]:
+        return np.array([
             [0, 0, 0],
             [self.params.plane_width, 0, 0],
             [self.params.plane_width, self.params.plane_height, 0],
             [0, self.params.plane_height, 0],
         ]).astype(np.float64)
+
+    def fit_plane_homography(
+        self,
+        combinations: Iterable[FeatureLineCombination],
+        rank: bool = True,
+    ) -> npt.NDArray[np.float64] | None:
+        """Estimates the homography from plane to image coordinates.
+
+        Works like `fit_camera_pose`, but fits a robust homography to the candidate
+        combinations instead of solving for the camera pose.
+        """
+        plane2img = None
+        self.debug.optimization_errors = []
+        candidates = list(combinations)
+        if rank:
+            candidates = self.rank_combinations(candidates)
+            candidates = candidates[: self.params.pnp_candidate_count]
+        for combination in candidates:
+            obj_points, img_points = self.get_obj_and_img_points(combination)
+
+            # Points further off than the acceptance threshold are treated as
+            # outliers, the remaining ones are refined with Levenberg-Marquardt.
+            H, _ = cv2.findHomography(
+                obj_points[:, :2],
+                img_points,
+                cv2.RANSAC,
+                ransacReprojThreshold=self.optimization_error_threshold,
+            )
+            if H is None:
+                continue
+
+            mean_error = self.homography_error(obj_points, img_points, H)
+            self.debug.optimization_errors.append(mean_error)
+
+            if mean_error < self.optimization_error_threshold:
+                plane2img = H
+                self.debug.optimization_final_combination = combination
+                break
+
+        return plane2img
+
+    def calculate_localization(
+        self, rvec: npt.NDArray[np.float64], tvec: npt.NDArray[np.float64]
+    ) -> PlaneLocalization:
+        plane_corners = self.plane_corners
+        camera_matrix, dist_coeffs = self._intrinsics
         img_corners, _ = cv2.projectPoints(
-            plane_corners,
-            rvec,
-            tvec,
-            self.camera_matrix,
-            self.dist_coeffs,
+            plane_corners, rvec, tvec, camera_matrix, dist_coeffs
         )
         img_corners = img_corners.squeeze().astype(np.float64)
         self.debug.plane_corners = img_corners
@@ -1265,26 +1911,118 @@ class Tracker:
 
         return localization
 
+    def calculate_localization_from_homography(
+        self, plane2img_mm: npt.NDArray[np.float64]
+    ) -> PlaneLocalization:
+        img_corners = cv2.perspectiveTransform(
+            self.plane_corners[:, np.newaxis, :2], plane2img_mm
+        )
+        img_corners = img_corners.squeeze().astype(np.float64)
+        self.debug.plane_corners = img_corners
+
+        # Scale plane coordinates from mm to the normalized range [0, 1]
+        norm2mm = np.diag([self.params.plane_width, self.params.plane_height, 1.0])
+        plane2img = plane2img_mm @ norm2mm
+        plane2img = plane2img / plane2img[2, 2]
+        img2plane = np.linalg.inv(plane2img)
+        localization = PlaneLocalization(
+            corners=img_corners,
+            img2plane=img2plane,
+            plane2img=plane2img,
+            reprojection_error=self.debug.optimization_errors[-1],
+        )
+
+        return localization
+
     def __call__(self, image: npt.NDArray[np.uint8]) -> PlaneLocalization | None:
         """Tracks the plane in the given image.
 
+        Calls from several threads may run concurrently, each with its own debug
+        data and a snapshot of the parameters taken at the start of the call.
+
         Args:
-            image: Input image.
+            image: Input image, either BGR or grayscale.
 
         Returns:
             PlaneLocalization if the plane is found, None otherwise.
 
         """
-        self.debug = DebugData(self.params)
+        self._count("frames")
+        with self.call_context():
+            features = self.extract_features(image)
+            if features is None:
+                return None
+            fragments, ellipses = features
+
+            feature_lines = self.find_feature_lines(fragments, ellipses)
+
+            return self.localize(feature_lines, image)
+
+    @contextmanager
+    def call_context(self) -> Iterator[TrackingContext]:
+        """Starts a call in the calling thread, for running the stages by hand.
+
+        Within the context, the stages use a snapshot of the parameters and write
+        to fresh debug data.
+        """
+        context = self._context
+        outer_params = context.params
+        context.params = self._params.snapshot()
+        context.debug = DebugData(context.params)
+        context.vis = None
+        try:
+            yield context
+        finally:
+            context.params = outer_params
+
+    def stream(
+        self,
+        source: "EyeTrackingSource",
+        prefetch: int = 2,
+        undistort: bool = True,
+    ) -> TrackingStream:
+        """Tracks the samples of an eye tracking source as they arrive.
+
+        The returned stream yields `(data, localization, gaze_mapped)` tuples and can
+        be iterated with `for` as well as `async for`. In the latter case tracking
+        runs in an executor, so the event loop is not blocked.
+
+        Args:
+            source: Source to pull the samples from. It is not closed.
+            prefetch: Maximum number of samples fetched ahead of tracking.
+            undistort: Track the undistorted scene images and map the undistorted
+                gaze. Otherwise the distorted ones are used.
+
+        """
+        return TrackingStream(self, source, prefetch=prefetch, undistort=undistort)
+
+    def extract_features(
+        self, image: npt.NDArray[np.uint8]
+    ) -> tuple[list[Fragment], list[Ellipse]] | None:
+        """Extracts the line fragments and ellipses of the markers from the image.
+
+        Returns:
+            The fragments and ellipses, or None if there are not enough of them.
+
+        """
         self.debug.img_raw = image.copy()
         # image = cv2.undistort(image, self.camera_matrix, self.dist_coeffs)
 
         if self.params.debug:
             self.vis = image.copy()
 
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        image = _to_gray(image)
         self.debug.img_gray = image.copy()
 
+        if self.params.downscale_input and self.params.img_size_factor != 1.0:
+            image = cv2.resize(
+                image,
+                None,
+                fx=self.params.img_size_factor,
+                fy=self.params.img_size_factor,
+                interpolation=cv2.INTER_AREA,
+            )
+
         line_contours, ellipse_contours = self.get_contours(image)
         if len(line_contours) < self.params.min_line_contour_count:
             return None
@@ -1299,13 +2037,52 @@ class Tracker:
         if len(ellipses) < self.params.min_ellipse_count:
             return None
 
-        feature_lines = self.find_feature_lines(fragments, ellipses)
+        self._count("features")
+        return fragments, ellipses
+
+    def localize(
+        self,
+        feature_lines: list[FeatureLine],
+        image: npt.NDArray[np.uint8] | None = None,
+    ) -> PlaneLocalization | None:
+        """Localizes the plane from the feature lines matching its markers.
+
+        The input image is needed for `subpixel_refinement` only.
+        """
         if len(feature_lines) < self.params.min_feature_line_count:
             return None
+        self._count("feature_lines")
+
+        feature_lines = self.refine_feature_lines(feature_lines, image)
+
+        # If all four markers were found unambiguously, a single solve suffices
+        combination = self.get_unambiguous_combination(feature_lines)
+        if combination is not None:
+            localization = self.localize_combinations([combination], rank=False)
+            if localization is not None:
+                self.debug.fast_path = True
+                self._count("fast_path")
+                self._count("localized")
+                return localization
 
         combinations = self.get_possible_combinations(feature_lines)
+        localization = self.localize_combinations(combinations)
+        if localization is not None:
+            self._count("localized")
+
+        return localization
+
+    def localize_combinations(
+        self, combinations: Iterable[FeatureLineCombination], rank: bool = True
+    ) -> PlaneLocalization | None:
+        if self.params.homography_only:
+            plane2img = self.fit_plane_homography(combinations, rank=rank)
+            if plane2img is None:
+                return None
 
-        rvec, tvec = self.fit_camera_pose(combinations)
+            return self.calculate_localization_from_homography(plane2img)
+
+        rvec, tvec = self.fit_camera_pose(combinations, rank=rank)
 
         if rvec is None or tvec is None:
             return None
@@ -1315,14 +2092,23 @@ class Tracker:
         return screen_corners
 
     def reprojection_error(self, obj_points, img_points, rvec, tvec) -> float:
+        camera_matrix, dist_coeffs = self._intrinsics
         projected_points, _ = cv2.projectPoints(
-            obj_points,
-            rvec,
-            tvec,
-            self.camera_matrix,
-            self.dist_coeffs,
+            obj_points, rvec, tvec, camera_matrix, dist_coeffs
         )
         projected_points = projected_points.squeeze()
         error = np.linalg.norm(img_points - projected_points, axis=1)
         mean_error = np.mean(error)
         return mean_error
+
+    def homography_error(
+        self,
+        obj_points: npt.NDArray[np.float64],
+        img_points: npt.NDArray[np.float64],
+        plane2img: npt.NDArray[np.float64],
+    ) -> float:
+        projected_points = cv2.perspectiveTransform(
+            obj_points[:, np.newaxis, :2], plane2img
+        ).squeeze()
+        error = np.linalg.norm(img_points - projected_points, axis=1)
+        return float(np.mean(error))
@@ -1 +1,33 @@
 """Configuration for the pytest test suite."""
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from pupil_labs.ir_plane_tracker import TrackerParams
+
+
+@pytest.fixture
+def params() -> TrackerParams:
+    """Marker layout of a 553 x 311 mm screen."""
+    return TrackerParams(
+        plane_width=553,
+        plane_height=311,
+        top_pos=(326, -16),
+        bottom_pos=(231, 327),
+        right_pos=(569, 178),
+        left_pos=(-17, 90),
+        feature_point_positions_mm=np.array([0.0, 20.0, 40.0, 100.0]),
+        padding_mm=4,
+        circle_diameter_mm=4,
+        line_thickness_mm=2,
+    )
+
+
+@pytest.fixture
+def camera_matrix() -> npt.NDArray[np.float64]:
+    return np.array([
+        [890.0, 0.0, 800.0],
+        [0.0, 890.0, 600.0],
+        [0.0, 0.0, 1.0],
+    ])
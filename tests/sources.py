@@ -0,0 +1,41 @@
+"""Eye tracking sources for tests."""
+
+import time
+
+import numpy as np
+
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+
+
+class ListSource(EyeTrackingSource):
+    """Returns the given items in turn, raising those which are exceptions."""
+
+    scene_intrinsics = None  # type: ignore[assignment]
+
+    def __init__(self, items, delay: float = 0.0):
+        self.items = list(items)
+        self.delay = delay
+        self.calls = 0
+        self.closed = False
+
+    def get_sample(self) -> EyeTrackingData:
+        self.calls += 1
+        time.sleep(self.delay)
+        if not self.items:
+            raise StopIteration
+        item = self.items.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return EyeTrackingData(
+            time=item,
+            scene_image_distorted=np.zeros((60, 80), dtype=np.uint8),
+            gaze_scene_distorted=None,
+            intrinsics=None,  # type: ignore[arg-type]
+            eye_image=None,
+        )
+
+    def close(self) -> None:
+        self.closed = True
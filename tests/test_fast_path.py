@@ -0,0 +1,137 @@
+import cv2
+import numpy as np
+import pytest
+
+from pupil_labs.ir_plane_tracker import Tracker
+from pupil_labs.ir_plane_tracker.tracker import (
+    ORIENTATION_POSITIONS,
+    FeatureLine,
+    Fragment,
+    LinePositions,
+)
+
+
+def horizontal_line(fragment: Fragment, outer_x: float, cr: float) -> FeatureLine:
+    t = np.array([0.0, 20.0, 40.0, outer_x])
+    points = np.column_stack((t, np.zeros_like(t)))
+    return FeatureLine(points, t, fragment, cr)
+
+
+def test_collapse_keeps_best_line_per_fragment(params):
+    tracker = Tracker(None, None, params)
+    fragment = Fragment(np.array([[x, 0] for x in range(21)], dtype=np.float32))
+    other_fragment = Fragment(np.array([[x, 0] for x in range(21)], dtype=np.float32))
+    target_cr = tracker.target_cr
+    good = horizontal_line(fragment, 100, target_cr + 0.01)
+    worse = horizontal_line(fragment, 110, target_cr - 0.05)
+    other = horizontal_line(other_fragment, 100, target_cr + 0.08)
+
+    collapsed = tracker.collapse_duplicate_lines([worse, good, other])
+
+    assert collapsed == [good, other]
+
+
+@pytest.fixture
+def tracker(params, camera_matrix):
+    return Tracker(camera_matrix, None, params)
+
+
+def marker_lines(tracker: Tracker) -> dict[LinePositions, FeatureLine]:
+    """Feature lines of all four markers as seen by a slightly rotated camera."""
+    rvec = np.array([[0.2], [-0.15], [0.05]])
+    tvec = np.array([[-250.0], [-120.0], [550.0]])
+    lines = {}
+    for position, obj_points in tracker.obj_point_map.items():
+        img_points, _ = cv2.projectPoints(
+            obj_points, rvec, tvec, tracker.camera_matrix, None
+        )
+        img_points = img_points.reshape(-1, 2)
+        projections = np.linalg.norm(obj_points - obj_points[0], axis=1)
+        fragment = Fragment(img_points.astype(np.float32))
+        lines[position] = FeatureLine(
+            img_points, projections, fragment, tracker.target_cr
+        )
+    return lines
+
+
+def shifted(line: FeatureLine, offset: tuple[float, float]) -> FeatureLine:
+    points = line.points + offset
+    projections = np.linalg.norm(points - points[0], axis=1)
+    return FeatureLine(points, projections, Fragment(points.astype(np.float32)))
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_unambiguous_combination(tracker, reverse):
+    lines = marker_lines(tracker)
+    for position, line in lines.items():
+        assert ORIENTATION_POSITIONS[line.orientation] == position
+    feature_lines = list(lines.values())
+    if reverse:
+        feature_lines.reverse()
+
+    combination = tracker.get_unambiguous_combination(feature_lines)
+
+    assert combination is not None
+    for position, line in lines.items():
+        assert combination[position] is line
+
+
+def test_duplicates_on_the_same_fragment_are_collapsed(tracker):
+    lines = marker_lines(tracker)
+    top = lines[LinePositions.TOP]
+    duplicate = FeatureLine(top.points + 3, top.points[:, 0], top.fragment, cr=0.0)
+
+    combination = tracker.get_unambiguous_combination([*lines.values(), duplicate])
+
+    assert combination is not None
+    assert combination[LinePositions.TOP] is top
+
+
+def test_ambiguous_combinations(tracker):
+    lines = marker_lines(tracker)
+    top = lines[LinePositions.TOP]
+    bottom = lines[LinePositions.BOTTOM]
+
+    # A marker is missing
+    del lines[LinePositions.LEFT]
+    assert tracker.get_unambiguous_combination(list(lines.values())) is None
+
+    # Two candidates for the same marker
+    lines = marker_lines(tracker)
+    extra = shifted(top, (0, 150))
+    assert tracker.get_unambiguous_combination([*lines.values(), extra]) is None
+
+    # The top marker is found below the bottom marker
+    lines[LinePositions.TOP] = shifted(
+        top, (0, bottom.points[0, 1] - top.points[0, 1] + 50)
+    )
+    assert tracker.get_unambiguous_combination(list(lines.values())) is None
+
+
+def test_localize_takes_the_fast_path(tracker):
+    lines = marker_lines(tracker)
+
+    with tracker.call_context():
+        localization = tracker.localize(list(lines.values()))
+        fast_path = tracker.debug.fast_path
+
+    assert localization is not None
+    assert localization.reprojection_error < 1e-3
+    assert fast_path
+    assert tracker.stage_counters["fast_path"] == 1
+    assert tracker.stage_counters["localized"] == 1
+
+
+def test_localize_falls_back_to_all_combinations(tracker):
+    lines = marker_lines(tracker)
+    extra = shifted(lines[LinePositions.TOP], (0, 150))
+
+    with tracker.call_context():
+        localization = tracker.localize([*lines.values(), extra])
+        fast_path = tracker.debug.fast_path
+
+    assert localization is not None
+    assert localization.reprojection_error < 1e-3
+    assert not fast_path
+    assert tracker.stage_counters["fast_path"] == 0
+    assert tracker.stage_counters["localized"] == 1
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+pytest.importorskip("pupil_labs.neon_usb")
+
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.neon_usb import (  # noqa: E402
+    FrameRingBuffer,
+)
+
+
+def test_get_returns_frames_with_their_timestamps():
+    buffer = FrameRingBuffer(capacity=4)
+    for i in range(3):
+        buffer.put(f"frame{i}", 100 + i)
+
+    assert buffer.count == 3
+    assert buffer.get(0) == ("frame0", 100)
+    assert buffer.latest() == ("frame2", 102)
+    assert buffer.last(2) == ["frame1", "frame2"]
+
+
+def test_only_the_last_capacity_minus_one_frames_are_accessible():
+    buffer = FrameRingBuffer(capacity=4)
+    for i in range(10):
+        buffer.put(f"frame{i}", i)
+
+    # The oldest slot is the next to be overwritten
+    with pytest.raises(IndexError):
+        buffer.get(6)
+    with pytest.raises(IndexError):
+        buffer.get(10)
+    assert buffer.get(7) == ("frame7", 7)
+    assert buffer.last(10) == ["frame7", "frame8", "frame9"]
+
+
+def test_empty_buffer():
+    buffer = FrameRingBuffer(capacity=4)
+
+    assert buffer.last(3) == []
+    with pytest.raises(IndexError):
+        buffer.latest()
+    assert not buffer.wait_for_frame(0, timeout=0.01)
+
+
+def test_wait_for_frame_wakes_up_on_put():
+    buffer = FrameRingBuffer(capacity=4)
+    timer = threading.Timer(0.05, buffer.put, args=("frame", 1))
+    timer.start()
+
+    assert buffer.wait_for_frame(0, timeout=5.0)
+    assert buffer.latest() == ("frame", 1)
+    timer.join()
+
+
+def test_frames_stay_paired_with_their_timestamps_under_concurrent_puts():
+    buffer = FrameRingBuffer(capacity=4)
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            buffer.put(i, i)
+            i += 1
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(2000):
+            count = buffer.count
+            if count == 0:
+                continue
+            try:
+                frame, timestamp = buffer.get(count - 1)
+            except IndexError:
+                continue
+            assert frame == timestamp
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_range_starts_at_the_oldest_accessible_frame():
+    buffer = FrameRingBuffer(capacity=4)
+    for i in range(10):
+        buffer.put(f"frame{i}", i)
+
+    assert buffer.range(8, 5) == (8, [("frame8", 8), ("frame9", 9)])
+    # Frames before 7 were overwritten
+    start, frames = buffer.range(2, 2)
+    assert start == 7
+    assert frames == [("frame7", 7), ("frame8", 8)]
+    assert buffer.range(10, 3) == (10, [])
+
+
+def test_range_reads_consistent_batches_under_concurrent_puts():
+    buffer = FrameRingBuffer(capacity=8)
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            buffer.put(i, i)
+            i += 1
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        next_index = 0
+        for _ in range(2000):
+            start, frames = buffer.range(next_index, 6)
+            assert start >= next_index
+            assert [f for f, _ in frames] == list(range(start, start + len(frames)))
+            next_index = start + len(frames)
+    finally:
+        stop.set()
+        writer.join()
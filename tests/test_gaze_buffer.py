@@ -0,0 +1,141 @@
+import threading
+
+import numpy as np
+import pytest
+
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.gaze_buffer import (
+    MAX_GAZE_AGE,
+    NEON_GAZE_INTERVAL,
+    NEON_SCENE_FRAME_INTERVAL,
+    GazeBuffer,
+    interval_means,
+)
+
+
+def test_interval_means():
+    timestamps = np.array([0, 10, 20, 30], dtype=np.int64)
+    gaze = np.array([[0, 0], [2, 4], [4, 8], [6, 12]], dtype=np.float64)
+    starts = np.array([0, 10, 35, 5], dtype=np.int64)
+    ends = np.array([20, 31, 40, 10], dtype=np.int64)
+
+    means = interval_means(timestamps, gaze, starts, ends)
+
+    # Intervals include their start but not their end
+    np.testing.assert_allclose(means[0], [1, 2])
+    np.testing.assert_allclose(means[1], [4, 8])
+    assert np.isnan(means[2]).all()
+    assert np.isnan(means[3]).all()
+
+
+def test_interval_means_agrees_with_brute_force():
+    rng = np.random.default_rng(0)
+    timestamps = np.sort(rng.integers(0, 1000, 200))
+    gaze = rng.normal(size=(200, 2))
+    starts = rng.integers(-50, 1000, 20)
+    ends = starts + rng.integers(1, 100, 20)
+
+    means = interval_means(timestamps, gaze, starts, ends)
+
+    for mean, start, end in zip(means, starts, ends, strict=True):
+        inside = (start <= timestamps) & (timestamps < end)
+        if inside.any():
+            np.testing.assert_allclose(mean, gaze[inside].mean(axis=0))
+        else:
+            assert np.isnan(mean).all()
+
+
+def test_empty_buffer():
+    buffer = GazeBuffer(capacity=4)
+
+    assert len(buffer) == 0
+    assert buffer.nearest(0) is None
+    assert buffer.gaze_at(0, 10) is None
+
+
+def test_buffer_keeps_the_newest_samples_in_order():
+    buffer = GazeBuffer(capacity=4)
+    buffer.put(np.array([0, 10, 20]), np.array([[0, 0], [1, 1], [2, 2]], float))
+    buffer.append(30, 3, 3)
+    buffer.append(40, 4, 4)
+
+    timestamps, gaze = buffer.snapshot()
+
+    assert len(buffer) == 4
+    np.testing.assert_array_equal(timestamps, [10, 20, 30, 40])
+    np.testing.assert_array_equal(gaze[:, 0], [1, 2, 3, 4])
+
+
+def test_put_more_than_capacity():
+    buffer = GazeBuffer(capacity=4)
+    timestamps = np.arange(10) * 10
+    buffer.put(timestamps, np.stack([timestamps, timestamps], axis=1).astype(float))
+
+    np.testing.assert_array_equal(buffer.snapshot()[0], [60, 70, 80, 90])
+
+
+@pytest.fixture
+def buffer():
+    buffer = GazeBuffer(capacity=10)
+    for t in range(0, 100, 10):
+        buffer.append(t, t, -t)
+    return buffer
+
+
+def test_nearest(buffer):
+    np.testing.assert_array_equal(buffer.nearest(34), [30, -30])
+    np.testing.assert_array_equal(buffer.nearest(-100), [0, 0])
+    np.testing.assert_array_equal(buffer.nearest(1000), [90, -90])
+
+
+def test_gaze_at_averages_the_window(buffer):
+    # The window [15, 45) holds the samples at 20, 30 and 40
+    np.testing.assert_allclose(buffer.gaze_at(30, 30), [30, -30])
+
+
+def test_gaze_at_falls_back_to_the_nearest_sample(buffer):
+    np.testing.assert_allclose(buffer.gaze_at(34, 4), [30, -30])
+    np.testing.assert_allclose(buffer.gaze_at(500, 10), [90, -90])
+
+
+def test_gaze_at_ignores_stale_samples(buffer):
+    # The window [115, 125) ends 25 after the last sample
+    assert buffer.gaze_at(120, 10, max_age=20) is None
+    np.testing.assert_allclose(buffer.gaze_at(110, 10, max_age=20), [90, -90])
+    np.testing.assert_allclose(buffer.gaze_at(-30, 10, max_age=30), [0, 0])
+    assert buffer.gaze_at(-30, 10, max_age=20) is None
+
+
+def test_gaze_at_after_a_gaze_dropout():
+    buffer = GazeBuffer(capacity=100)
+    for i in range(10):
+        buffer.append(i * NEON_GAZE_INTERVAL, i, i)
+    last = 9 * NEON_GAZE_INTERVAL
+    window = NEON_SCENE_FRAME_INTERVAL
+
+    # A frame shortly after the last sample still gets its gaze
+    np.testing.assert_allclose(
+        buffer.gaze_at(last + window // 2 + MAX_GAZE_AGE, window), [9, 9]
+    )
+    # Frames long after gaze stopped arriving get none
+    assert buffer.gaze_at(last + 10 * window, window) is None
+
+
+def test_concurrent_puts_do_not_overwrite_each_other():
+    buffer = GazeBuffer(capacity=10_000)
+    barrier = threading.Barrier(4)
+
+    def put(offset: int) -> None:
+        barrier.wait()
+        for batch in range(200):
+            timestamps = np.arange(5) + offset + batch * 5
+            buffer.put(timestamps, np.zeros((5, 2)))
+
+    threads = [threading.Thread(target=put, args=(i * 1000,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    timestamps, _ = buffer.snapshot()
+    assert len(buffer) == 4000
+    np.testing.assert_array_equal(np.sort(timestamps), np.arange(4000))
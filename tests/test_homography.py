@@ -0,0 +1,52 @@
+import numpy as np
+
+from pupil_labs.ir_plane_tracker.tracker import fit_homographies, homography_residuals
+
+
+def random_homographies(rng: np.random.Generator, n: int) -> np.ndarray:
+    std = np.array([[0.2, 0.2, 20], [0.2, 0.2, 20], [1e-4, 1e-4, 0]])
+    H = np.eye(3) + rng.normal(0, std, (n, 3, 3))
+    return H / H[:, 2:, 2:]
+
+
+def transform(H: np.ndarray, points: np.ndarray) -> np.ndarray:
+    points_h = np.concatenate((points, np.ones_like(points[..., :1])), axis=-1)
+    projected = points_h @ H.transpose(0, 2, 1)
+    return projected[..., :2] / projected[..., 2:]
+
+
+def test_fit_homographies_recovers_batch_with_padding():
+    rng = np.random.default_rng(0)
+    H_true = random_homographies(rng, 5)
+    src = rng.uniform(0, 500, (5, 16, 2))
+    dst = transform(H_true, src)
+    mask = np.ones((5, 16), dtype=bool)
+    # Sets with fewer points are padded with garbage, which has to be ignored
+    mask[1, 12:] = False
+    mask[3, 8:] = False
+    src[~mask] = 1e6
+    dst[~mask] = -1e6
+
+    H = fit_homographies(src, dst, mask)
+
+    np.testing.assert_allclose(H, H_true, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(homography_residuals(H, src, dst, mask), 0, atol=1e-6)
+
+
+def test_homography_residuals_is_mean_transfer_error():
+    H = np.eye(3)[np.newaxis]
+    src = np.zeros((1, 3, 2))
+    dst = np.array([[[3.0, 4.0], [0.0, 1.0], [100.0, 100.0]]])
+    mask = np.array([[True, True, False]])
+
+    residuals = homography_residuals(H, src, dst, mask)
+
+    np.testing.assert_allclose(residuals, [3.0])
+
+
+def test_homography_residuals_of_degenerate_fit_is_infinite():
+    H = np.zeros((1, 3, 3))
+    src = np.ones((1, 4, 2))
+    mask = np.ones((1, 4), dtype=bool)
+
+    assert homography_residuals(H, src, src, mask)[0] == np.inf
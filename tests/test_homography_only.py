@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+
+from pupil_labs.ir_plane_tracker.tracker import (
+    FeatureLine,
+    FeatureLineCombination,
+    LinePositions,
+    Tracker,
+)
+
+
+def marker_combination(tracker: Tracker, plane2img: np.ndarray):
+    """Builds the combination of all four markers as seen through a homography."""
+    combination = FeatureLineCombination()
+    for position, obj_points in tracker.obj_point_map.items():
+        line = FeatureLine.__new__(FeatureLine)
+        line.points = cv2.perspectiveTransform(
+            obj_points[:, np.newaxis, :2], plane2img
+        ).reshape(-1, 2)
+        combination[position] = line
+    return combination
+
+
+def test_homography_only_localization_without_intrinsics(params):
+    params.homography_only = True
+    tracker = Tracker(None, None, params)
+    plane2img_mm = np.array([
+        [1.9, 0.1, 250.0],
+        [-0.05, 1.8, 180.0],
+        [1e-4, -5e-5, 1.0],
+    ])
+    combination = marker_combination(tracker, plane2img_mm)
+    assert len(combination) == len(LinePositions)
+
+    with tracker.call_context():
+        localization = tracker.localize_combinations([combination], rank=False)
+
+    assert localization is not None
+    expected_corners = cv2.perspectiveTransform(
+        tracker.plane_corners[:, np.newaxis, :2], plane2img_mm
+    ).reshape(-1, 2)
+    np.testing.assert_allclose(localization.corners, expected_corners, atol=1e-3)
+    # The plane is normalized to the unit square
+    unit_corners = np.array([[0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]])
+    projected = unit_corners @ localization.plane2img.T
+    np.testing.assert_allclose(
+        projected[:, :2] / projected[:, 2:], expected_corners, atol=1e-3
+    )
+    assert localization.reprojection_error < 1e-3
+
+
+def test_homography_error(params):
+    tracker = Tracker(None, None, params)
+    obj_points = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]])
+    img_points = np.array([[3.0, 4.0], [10.0, 0.0]])
+
+    assert tracker.homography_error(obj_points, img_points, np.eye(3)) == 2.5
@@ -0,0 +1,52 @@
+import numpy as np
+
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.matching import (
+    group_by_nearest,
+    match_nearest,
+)
+
+
+def brute_force_nearest(source_ts, target_ts):
+    # Ties go to the earlier target, like in match_nearest
+    return np.array([np.argmin(np.abs(target_ts - t)) for t in source_ts])
+
+
+def test_match_nearest():
+    target_ts = np.array([0, 10, 20], dtype=np.int64)
+    source_ts = np.array([-5, 4, 5, 6, 25, 40], dtype=np.int64)
+
+    matches = match_nearest(source_ts, target_ts)
+
+    # 5 lies halfway between 0 and 10
+    np.testing.assert_array_equal(matches, [0, 0, 0, 1, 2, 2])
+
+
+def test_match_nearest_single_target():
+    matches = match_nearest(np.array([-3, 0, 7], dtype=np.int64), np.array([2]))
+
+    np.testing.assert_array_equal(matches, [0, 0, 0])
+
+
+def test_match_nearest_agrees_with_brute_force():
+    rng = np.random.default_rng(0)
+    target_ts = np.sort(rng.integers(0, 10**9, 50))
+    source_ts = np.sort(rng.integers(-(10**8), 11 * 10**8, 500))
+
+    np.testing.assert_array_equal(
+        match_nearest(source_ts, target_ts),
+        brute_force_nearest(source_ts, target_ts),
+    )
+
+
+def test_group_by_nearest():
+    target_ts = np.array([0, 10, 20, 100], dtype=np.int64)
+    source_ts = np.array([-5, 4, 5, 6, 25, 40], dtype=np.int64)
+
+    starts, ends = group_by_nearest(source_ts, target_ts)
+
+    np.testing.assert_array_equal(starts, [0, 3, 4, 6])
+    # Nothing is close to the last target, so its group is empty
+    np.testing.assert_array_equal(ends, [3, 4, 6, 6])
+    for target, (start, end) in enumerate(zip(starts, ends, strict=True)):
+        group = match_nearest(source_ts[start:end], target_ts)
+        assert np.all(group == target)
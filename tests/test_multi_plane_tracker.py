@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+import pytest
+
+from pupil_labs.ir_plane_tracker import MultiPlaneTracker, Tracker, TrackerParams
+from pupil_labs.ir_plane_tracker.tracker import Ellipse, Fragment
+
+
+@pytest.fixture
+def features():
+    """A marker along the x axis whose cross ratio is off by about 0.057."""
+    support = np.array([[x, 0] for x in range(21)], dtype=np.float32)
+    ellipses = [Ellipse((44, 0), (4, 4), 0), Ellipse((100, 0), (4, 4), 0)]
+    return [Fragment(support)], ellipses
+
+
+def test_candidates_use_given_max_cr_error(params, features):
+    params.max_cr_error = 0.02
+    tracker = Tracker(None, None, params)
+    fragments, ellipses = features
+
+    with tracker.call_context():
+        strict, _ = tracker.find_feature_line_candidates(
+            fragments, ellipses, [tracker.target_cr]
+        )
+        loose, cr_values = tracker.find_feature_line_candidates(
+            fragments, ellipses, [tracker.target_cr], max_cr_error=0.1
+        )
+
+    assert len(strict) == 0
+    assert len(loose) == 1
+    assert abs(cr_values[0] - tracker.target_cr) == pytest.approx(0.057, abs=1e-3)
+
+
+def test_plane_with_looser_threshold_keeps_candidates(params, features, monkeypatch):
+    shared_params = params.snapshot()
+    shared_params.max_cr_error = 0.02
+    plane_params = params.snapshot()
+    plane_params.max_cr_error = 0.1
+    tracker = MultiPlaneTracker(None, None, {"screen": plane_params}, shared_params)
+    monkeypatch.setattr(
+        tracker._feature_tracker, "extract_features", lambda image: features
+    )
+
+    tracker(np.zeros((10, 10), dtype=np.uint8))
+
+    assert len(tracker.trackers["screen"].debug.feature_lines_filtered) == 1
+
+
+@pytest.fixture
+def board_params():
+    """Marker layout of a 300 x 200 mm board, whose cross ratio differs from the
+    screen's.
+    """
+    return TrackerParams(
+        plane_width=300,
+        plane_height=200,
+        top_pos=(180, -16),
+        bottom_pos=(120, 216),
+        right_pos=(316, 120),
+        left_pos=(-16, 60),
+        feature_point_positions_mm=np.array([0.0, 20.0, 70.0, 100.0]),
+        padding_mm=4,
+        circle_diameter_mm=4,
+        line_thickness_mm=2,
+    )
+
+
+def project_plane(tracker: Tracker, tvec):
+    """Fragments and ellipses of the plane's markers and its projected corners."""
+    rvec = np.array([[0.1], [-0.1], [0.0]])
+    tvec = np.array(tvec, dtype=np.float64).reshape(3, 1)
+    fragments = []
+    ellipses = []
+    for obj_points in tracker.obj_point_map.values():
+        # In the order of feature_point_positions_mm, the line comes first
+        img_points, _ = cv2.projectPoints(
+            obj_points[::-1], rvec, tvec, tracker.camera_matrix, None
+        )
+        img_points = img_points.reshape(-1, 2)
+        support = np.linspace(img_points[0], img_points[1], 21)
+        fragments.append(Fragment(support.astype(np.float32)))
+        ellipses.extend(Ellipse(tuple(p), (4, 4), 0) for p in img_points[2:])
+    corners, _ = cv2.projectPoints(
+        tracker.plane_corners, rvec, tvec, tracker.camera_matrix, None
+    )
+    return fragments, ellipses, corners.reshape(-1, 2)
+
+
+def test_planes_with_different_layouts_are_localized(
+    params, board_params, camera_matrix, monkeypatch
+):
+    tracker = MultiPlaneTracker(
+        camera_matrix, None, {"screen": params, "board": board_params}
+    )
+    screen_fragments, screen_ellipses, screen_corners = project_plane(
+        tracker.trackers["screen"], [-600, -200, 900]
+    )
+    board_fragments, board_ellipses, board_corners = project_plane(
+        tracker.trackers["board"], [100, -100, 900]
+    )
+    monkeypatch.setattr(
+        tracker._feature_tracker,
+        "extract_features",
+        lambda image: (
+            screen_fragments + board_fragments,
+            screen_ellipses + board_ellipses,
+        ),
+    )
+
+    localizations = tracker(np.zeros((1200, 1600), dtype=np.uint8))
+
+    np.testing.assert_allclose(
+        localizations["screen"].corners, screen_corners, atol=1e-3
+    )
+    np.testing.assert_allclose(localizations["board"].corners, board_corners, atol=1e-3)
+    assert len(tracker.trackers["screen"].debug.feature_lines_filtered) == 4
+    assert len(tracker.trackers["board"].debug.feature_lines_filtered) == 4
+
+
+def test_planes_must_share_the_input_scaling(params, board_params):
+    board_params.img_size_factor = 0.5
+
+    with pytest.raises(ValueError, match="img_size_factor"):
+        MultiPlaneTracker(None, None, {"screen": params, "board": board_params})
+
+    # The shared extraction can be configured separately from the planes
+    shared_params = params.snapshot()
+    shared_params.downscale_input = True
+    with pytest.raises(ValueError, match="downscale_input"):
+        MultiPlaneTracker(None, None, {"screen": params}, shared_params)
+
+
+def test_planes_must_be_distinguishable(params):
+    with pytest.raises(ValueError, match="cross ratios"):
+        MultiPlaneTracker(None, None, {"a": params, "b": params.snapshot()})
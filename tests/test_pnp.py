@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+import pytest
+
+from pupil_labs.ir_plane_tracker import PnPMethod, Tracker, TrackerParams
+
+
+def project_markers(tracker: Tracker, rvec, tvec):
+    obj_points = np.concatenate(list(tracker.obj_point_map.values()))
+    img_points, _ = cv2.projectPoints(
+        obj_points, rvec, tvec, tracker.camera_matrix, None
+    )
+    return obj_points, img_points.reshape(-1, 2)
+
+
+@pytest.mark.parametrize("method", list(PnPMethod))
+def test_solve_pnp_recovers_pose(params, camera_matrix, method):
+    params.pnp_method = method
+    tracker = Tracker(camera_matrix, None, params)
+    rvec = np.array([[0.2], [-0.15], [0.05]])
+    tvec = np.array([[-250.0], [-120.0], [550.0]])
+    obj_points, img_points = project_markers(tracker, rvec, tvec)
+
+    ret, rvec_est, tvec_est = tracker.solve_pnp(obj_points, img_points)
+
+    assert ret
+    np.testing.assert_allclose(rvec_est.ravel(), rvec.ravel(), atol=1e-4)
+    np.testing.assert_allclose(tvec_est.ravel(), tvec.ravel(), atol=1e-2)
+
+
+def test_pnp_method_from_dict():
+    params = TrackerParams.from_dict({"pnp_method": "sqpnp", "pnp_refine": True})
+
+    assert params.pnp_method == PnPMethod.SQPNP
+    assert params.pnp_refine
+
+
+def test_pose_estimation_requires_a_camera_matrix(params):
+    tracker = Tracker(None, None, params)
+    obj_points = np.concatenate(list(tracker.obj_point_map.values()))
+
+    with pytest.raises(ValueError, match="camera matrix"):
+        tracker.solve_pnp(obj_points, obj_points[:, :2])
@@ -0,0 +1,143 @@
+import threading
+
+import numpy as np
+import pytest
+
+from pupil_labs.camera import Camera
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.prefetch import (
+    PrefetchingSource,
+)
+
+from .sources import ListSource
+
+
+class ImageSource(EyeTrackingSource):
+    """Returns the same image and gaze point a few times."""
+
+    def __init__(self, image, gaze, camera_matrix, num_samples=3):
+        height, width = image.shape[:2]
+        self.scene_intrinsics = Camera(
+            pixel_width=width,
+            pixel_height=height,
+            camera_matrix=camera_matrix,
+            distortion_coefficients=np.zeros(8),
+        )
+        self.image = image
+        self.gaze = gaze
+        self.num_samples = num_samples
+
+    def get_sample(self) -> EyeTrackingData:
+        if self.num_samples == 0:
+            raise StopIteration
+        self.num_samples -= 1
+        return EyeTrackingData(
+            time=self.num_samples,
+            scene_image_distorted=self.image.copy(),
+            gaze_scene_distorted=self.gaze.copy(),
+            intrinsics=self.scene_intrinsics,
+            eye_image=None,
+        )
+
+    def close(self) -> None:
+        pass
+
+
+def test_scaled_intrinsics_and_gaze():
+    camera_matrix = np.array([[100.0, 0, 80], [0, 110, 60], [0, 0, 1]])
+    gaze = np.array([30.0, 70.0])
+    image = np.zeros((121, 161, 3), dtype=np.uint8)
+    source = PrefetchingSource(
+        ImageSource(image, gaze, camera_matrix), gray=True, scale=0.33, undistort=False
+    )
+
+    data = source.get_sample()
+
+    # 161 x 121 pixels are resized to 53 x 40, so the actual scales differ
+    sx, sy = 53 / 161, 40 / 121
+    assert data.scene_image_distorted.shape == (40, 53)
+    intrinsics = source.scene_intrinsics
+    assert (intrinsics.pixel_width, intrinsics.pixel_height) == (53, 40)
+    np.testing.assert_allclose(
+        intrinsics.camera_matrix,
+        [
+            [100 * sx, 0, (80 + 0.5) * sx - 0.5],
+            [0, 110 * sy, (60 + 0.5) * sy - 0.5],
+            [0, 0, 1],
+        ],
+    )
+    np.testing.assert_allclose(
+        data.gaze_scene_distorted, [(30 + 0.5) * sx - 0.5, (70 + 0.5) * sy - 0.5]
+    )
+    assert data.intrinsics is intrinsics
+
+    # The scaled gaze point still looks along the same ray
+    ray = np.linalg.inv(camera_matrix) @ [*gaze, 1]
+    projected = intrinsics.camera_matrix @ ray
+    np.testing.assert_allclose(projected[:2] / projected[2], data.gaze_scene_distorted)
+    source.close()
+
+
+def test_gaze_stays_on_its_pixels():
+    image = np.zeros((8, 8), dtype=np.uint8)
+    image[2:4, 2:4] = 255
+    gaze = np.array([2.5, 2.5])
+    source = PrefetchingSource(
+        ImageSource(image, gaze, np.eye(3)), scale=0.5, undistort=False
+    )
+
+    data = source.get_sample()
+
+    # The 2 x 2 block is resized to the single pixel (1, 1)
+    assert np.argwhere(data.scene_image_distorted == 255).tolist() == [[1, 1]]
+    np.testing.assert_allclose(data.gaze_scene_distorted, [1.0, 1.0])
+    source.close()
+
+
+def test_samples_are_passed_on_in_order():
+    source = PrefetchingSource(ListSource([1, 2, 3]), num_frames=2, undistort=False)
+
+    assert [source.get_sample().time for _ in range(3)] == [1, 2, 3]
+    with pytest.raises(StopIteration):
+        source.get_sample()
+    source.close()
+
+
+def test_worker_errors_are_raised_by_get_sample():
+    inner = ListSource([1, ValueError("broken"), 2])
+    source = PrefetchingSource(inner, undistort=False)
+
+    assert source.get_sample().time == 1
+    with pytest.raises(ValueError, match="broken"):
+        source.get_sample()
+    source.close()
+    assert inner.closed
+
+
+def test_close_while_the_worker_is_blocked():
+    inner = ListSource(range(100), delay=0.3)
+    source = PrefetchingSource(inner, num_frames=1, undistort=False)
+    assert source.get_sample().time == 0
+    errors = []
+
+    def consume():
+        try:
+            while True:
+                source.get_sample()
+        except Exception as e:
+            errors.append(e)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    # The worker is waiting for the next sample of the slow source
+    source.close()
+    consumer.join(timeout=5)
+
+    assert not consumer.is_alive()
+    assert isinstance(errors[0], RuntimeError)
+    assert inner.closed
+    with pytest.raises(RuntimeError):
+        source.get_sample()
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from pupil_labs.ir_plane_tracker import SampleTimeoutError
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.publisher import (
+    DropPolicy,
+    SamplePublisher,
+)
+
+from .sources import ListSource
+
+
+def publish_into_queue(source, policy, maxsize, consume_delay=0.0):
+    """Publishes all samples of the source into a queue and drains it afterwards."""
+
+    async def run():
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        publisher = SamplePublisher(source)
+        subscription = publisher.subscribe_queue(queue, policy)
+        publisher.start()
+        items = []
+        if policy == DropPolicy.BLOCK:
+            while (item := await queue.get()) is not None:
+                items.append(item.time)
+                await asyncio.sleep(consume_delay)
+            items.append(None)
+        else:
+            await asyncio.get_running_loop().run_in_executor(
+                None, publisher.finished.wait, 5
+            )
+            # Let the loop put the samples handed over by the publisher thread
+            await asyncio.sleep(0.05)
+            while not queue.empty():
+                item = queue.get_nowait()
+                items.append(None if item is None else item.time)
+        publisher.stop()
+        return items, subscription.dropped_count
+
+    return asyncio.run(run())
+
+
+def test_drop_oldest_keeps_the_newest_samples():
+    items, dropped = publish_into_queue(
+        ListSource(range(1, 6)), DropPolicy.DROP_OLDEST, maxsize=2
+    )
+
+    assert items == [5, None]
+    assert dropped == 4
+
+
+def test_drop_newest_keeps_the_queued_samples():
+    items, dropped = publish_into_queue(
+        ListSource(range(1, 6)), DropPolicy.DROP_NEWEST, maxsize=2
+    )
+
+    # The end of the source is announced even if the queue is full
+    assert items == [2, None]
+    assert dropped == 4
+
+
+def test_block_delivers_every_sample():
+    items, dropped = publish_into_queue(
+        ListSource(range(1, 6)), DropPolicy.BLOCK, maxsize=1, consume_delay=0.01
+    )
+
+    assert items == [1, 2, 3, 4, 5, None]
+    assert dropped == 0
+
+
+def test_callbacks_get_every_new_sample():
+    source = ListSource([1, SampleTimeoutError(), 1, 2, 3])
+    received = []
+    publisher = SamplePublisher(source, close_source=True)
+    publisher.subscribe(lambda data: received.append(data.time))
+
+    with publisher:
+        assert publisher.finished.wait(5)
+
+    # Timeouts are waited out and repeated samples are published once
+    assert received == [1, 2, 3]
+    assert publisher.error is None
+    assert source.closed
+
+
+def test_source_errors_end_publishing():
+    publisher = SamplePublisher(ListSource([1, ValueError("broken"), 2]))
+    received = []
+    publisher.subscribe(lambda data: received.append(data.time))
+
+    with publisher:
+        assert publisher.finished.wait(5)
+
+    assert received == [1]
+    assert isinstance(publisher.error, ValueError)
+
+
+def test_cancelled_subscriptions_receive_nothing():
+    publisher = SamplePublisher(ListSource([1, 2]))
+    received = []
+    publisher.subscribe(received.append).cancel()
+
+    with publisher:
+        assert publisher.finished.wait(5)
+
+    assert received == []
+
+
+def test_stop_from_a_callback():
+    source = ListSource(range(100))
+    publisher = SamplePublisher(source)
+    received = []
+
+    def on_sample(data):
+        received.append(data.time)
+        if len(received) == 2:
+            publisher.stop()
+
+    publisher.subscribe(on_sample)
+    publisher.start()
+
+    assert publisher.finished.wait(5)
+    publisher.stop()
+    assert received == [0, 1]
+    assert source.calls == 2
+
+
+@pytest.mark.parametrize("policy", list(DropPolicy))
+def test_queues_receive_none_at_the_end(policy):
+    items, _ = publish_into_queue(ListSource([]), policy, maxsize=2)
+
+    assert items == [None]
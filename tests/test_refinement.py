@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+import pytest
+
+from pupil_labs.ir_plane_tracker import Tracker
+from pupil_labs.ir_plane_tracker.tracker import (
+    FeatureLine,
+    refine_blob_center,
+    refine_line_endpoints,
+)
+
+SUPERSAMPLING = 16
+
+
+def to_supersampled(points: np.ndarray) -> np.ndarray:
+    """Maps image coordinates to pixel coordinates of the supersampled image."""
+    return np.round((np.asarray(points) + 0.5) * SUPERSAMPLING - 0.5).astype(np.int32)
+
+
+def downsample(img: np.ndarray) -> np.ndarray:
+    """Averages the supersampled image, giving exact pixel coverage."""
+    size = (img.shape[1] // SUPERSAMPLING, img.shape[0] // SUPERSAMPLING)
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def draw_blob(center: np.ndarray, radius: float, size: int = 64) -> np.ndarray:
+    img = np.full((size * SUPERSAMPLING, size * SUPERSAMPLING), 20, dtype=np.uint8)
+    x, y = to_supersampled(center)
+    cv2.circle(img, (int(x), int(y)), round(radius * SUPERSAMPLING), 230, -1)
+    return downsample(img)
+
+
+def test_refine_blob_center():
+    center = np.array([30.3, 27.8])
+    img = draw_blob(center, radius=4)
+
+    refined = refine_blob_center(img, np.round(center), radius=4)
+
+    np.testing.assert_allclose(refined, center, atol=0.1)
+
+
+def test_refine_line_endpoints():
+    start = np.array([10.4, 20.7])
+    end = np.array([70.2, 31.1])
+    direction = (end - start) / np.linalg.norm(end - start)
+    offset = 1.5 * np.array([-direction[1], direction[0]])
+    corners = np.array([start + offset, end + offset, end - offset, start - offset])
+    img = np.full((64 * SUPERSAMPLING, 96 * SUPERSAMPLING), 20, dtype=np.uint8)
+    cv2.fillConvexPoly(img, to_supersampled(corners), 230)
+    img = downsample(img)
+
+    refined_start, refined_end = refine_line_endpoints(
+        img, np.round(start) + 1, np.round(end) - 1, thickness=3
+    )
+
+    np.testing.assert_allclose(refined_start, start, atol=0.2)
+    np.testing.assert_allclose(refined_end, end, atol=0.2)
+
+
+@pytest.mark.parametrize("factor", [0.5, 0.25])
+def test_downscaled_points_are_mapped_to_input_pixels(params, factor):
+    params.img_size_factor = factor
+    params.downscale_input = True
+    tracker = Tracker(None, None, params)
+    center = np.array([30.0, 33.0])
+    img = draw_blob(center, radius=6)
+    small = cv2.resize(img, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    small_center = refine_blob_center(small, center * factor, radius=6 * factor)
+    line = FeatureLine.__new__(FeatureLine)
+    line.points = np.tile(small_center, (4, 1))
+
+    with tracker.call_context():
+        (mapped,) = tracker.refine_feature_lines([line])
+
+    np.testing.assert_allclose(mapped.points[0], center, atol=0.25)
+
+
+def test_subpixel_refinement_uses_given_image(params):
+    params.subpixel_refinement = True
+    tracker = Tracker(None, None, params)
+    # A line of 60 mm and two circles with 3 px per mm
+    points = np.array([[10.3, 30.6], [190.3, 30.6], [250.3, 30.6], [310.3, 30.6]])
+    img = np.full((64 * SUPERSAMPLING, 330 * SUPERSAMPLING), 20, dtype=np.uint8)
+    corners = points[[0, 1, 1, 0]] + [[0, -3], [0, -3], [0, 3], [0, 3]]
+    cv2.fillConvexPoly(img, to_supersampled(corners), 230)
+    for center in points[2:]:
+        x, y = to_supersampled(center)
+        cv2.circle(img, (int(x), int(y)), 6 * SUPERSAMPLING, 230, -1)
+    img = downsample(img)
+    line = FeatureLine.__new__(FeatureLine)
+    line.points = np.round(points)
+
+    with tracker.call_context():
+        (refined,) = tracker.refine_feature_lines([line], img)
+
+    np.testing.assert_allclose(refined.points, points, atol=0.2)
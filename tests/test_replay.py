@@ -0,0 +1,168 @@
+import time
+
+import numpy as np
+import pytest
+
+from pupil_labs.camera import Camera
+from pupil_labs.ir_plane_tracker import SampleTimeoutError
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources import EyeTrackingData
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.replay import (
+    ReplaySource,
+    SampleRecorder,
+    record,
+)
+
+from .sources import ListSource
+
+MS = 1_000_000
+
+
+@pytest.fixture
+def intrinsics():
+    return Camera(
+        pixel_width=80,
+        pixel_height=60,
+        camera_matrix=np.array([[50.0, 0, 40], [0, 50, 30], [0, 0, 1]]),
+        distortion_coefficients=np.array([0.1, -0.01, 0, 0, 0]),
+    )
+
+
+def sample(intrinsics, timestamp, value, gaze=None, eye=True):
+    return EyeTrackingData(
+        time=timestamp,
+        scene_image_distorted=np.full((60, 80, 3), value, dtype=np.uint8),
+        gaze_scene_distorted=gaze,
+        intrinsics=intrinsics,
+        eye_image=np.full((20, 30), value, dtype=np.uint8) if eye else None,
+    )
+
+
+def write(folder, intrinsics, samples):
+    with SampleRecorder(folder, intrinsics) as recorder:
+        for data in samples:
+            recorder.write(data)
+
+
+def test_round_trip(tmp_path, intrinsics):
+    samples = [
+        sample(intrinsics, 1000 + i * 10 * MS, i, gaze=np.array([i, 2.0 * i]))
+        for i in range(4)
+    ]
+    samples[2].gaze_scene_distorted = None
+    write(tmp_path, intrinsics, samples)
+
+    source = ReplaySource(tmp_path, speed=None)
+
+    assert len(source) == 4
+    np.testing.assert_array_equal(source.timestamps, [s.time for s in samples])
+    np.testing.assert_array_equal(
+        source.scene_intrinsics.camera_matrix, intrinsics.camera_matrix
+    )
+    np.testing.assert_array_equal(
+        source.scene_intrinsics.distortion_coefficients,
+        intrinsics.distortion_coefficients,
+    )
+    for expected in samples:
+        data = source.get_sample()
+        assert data.time == expected.time
+        np.testing.assert_array_equal(
+            data.scene_image_distorted, expected.scene_image_distorted
+        )
+        np.testing.assert_array_equal(data.eye_image, expected.eye_image)
+        if expected.gaze_scene_distorted is None:
+            assert data.gaze_scene_distorted is None
+        else:
+            np.testing.assert_array_equal(
+                data.gaze_scene_distorted, expected.gaze_scene_distorted
+            )
+    with pytest.raises(StopIteration):
+        source.get_sample()
+    source.close()
+
+
+def test_samples_without_eye_image(tmp_path, intrinsics):
+    # The eye camera only starts delivering images after the second sample
+    has_eye = [False, False, True, False, True]
+    write(
+        tmp_path,
+        intrinsics,
+        [sample(intrinsics, i, i, eye=eye) for i, eye in enumerate(has_eye)],
+    )
+
+    source = ReplaySource(tmp_path, speed=None)
+
+    for i, eye in enumerate(has_eye):
+        if eye:
+            np.testing.assert_array_equal(source[i].eye_image, np.full((20, 30), i))
+        else:
+            assert source[i].eye_image is None
+    source.close()
+
+
+def test_recording_without_eye_images(tmp_path, intrinsics):
+    write(tmp_path, intrinsics, [sample(intrinsics, i, i, eye=False) for i in range(2)])
+
+    source = ReplaySource(tmp_path, speed=None)
+
+    assert [source.get_sample().eye_image for _ in range(2)] == [None, None]
+    source.close()
+
+
+def test_images_must_keep_their_shape(tmp_path, intrinsics):
+    with SampleRecorder(tmp_path, intrinsics) as recorder:
+        recorder.write(sample(intrinsics, 0, 0))
+        with pytest.raises(ValueError, match="Scene image"):
+            recorder.write(
+                EyeTrackingData(1, np.zeros((60, 80), np.uint8), None, intrinsics, None)
+            )
+
+
+def test_loop_and_seek(tmp_path, intrinsics):
+    write(tmp_path, intrinsics, [sample(intrinsics, i * MS, i) for i in range(3)])
+
+    source = ReplaySource(tmp_path, speed=None, loop=True)
+
+    assert [source.get_sample().time // MS for _ in range(7)] == [0, 1, 2, 0, 1, 2, 0]
+    source.seek(MS + 1)
+    assert source.get_sample().time == 2 * MS
+    source.close()
+
+
+@pytest.mark.parametrize("speed", [1.0, 2.0])
+def test_replay_at_the_recorded_pace(tmp_path, intrinsics, speed):
+    write(tmp_path, intrinsics, [sample(intrinsics, i * 50 * MS, i) for i in range(5)])
+    source = ReplaySource(tmp_path, speed=speed)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        source.get_sample()
+    elapsed = time.perf_counter() - start
+
+    expected = 0.2 / speed
+    assert expected <= elapsed < expected + 0.2
+    source.close()
+
+
+def test_replay_as_fast_as_possible(tmp_path, intrinsics):
+    write(
+        tmp_path, intrinsics, [sample(intrinsics, i * 1000 * MS, i) for i in range(5)]
+    )
+    source = ReplaySource(tmp_path, speed=None)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        source.get_sample()
+
+    assert time.perf_counter() - start < 0.5
+    source.close()
+
+
+def test_record_skips_timeouts_and_repeated_samples(tmp_path, intrinsics):
+    source = ListSource([1, SampleTimeoutError(), 1, 2, 3, 4])
+    source.scene_intrinsics = intrinsics
+
+    assert record(source, tmp_path, num_samples=3) == 3
+
+    replay = ReplaySource(tmp_path, speed=None)
+    np.testing.assert_array_equal(replay.timestamps, [1, 2, 3])
+    replay.close()
@@ -0,0 +1,111 @@
+import queue
+
+import numpy as np
+import pytest
+
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.shared_memory import (
+    SharedFrameRing,
+    track_shared_frames,
+)
+
+SHAPE = (8, 8)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(SHAPE, num_slots=4)
+    yield ring
+    ring.close()
+
+
+def image(value: int) -> np.ndarray:
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+def test_put_and_get(ring):
+    assert ring.latest_seq == -1
+    assert ring.get(0) is None
+
+    assert ring.put(100, image(1), np.array([1.0, 2.0])) == 0
+    assert ring.put(200, image(2)) == 1
+
+    frame = ring.get(0)
+    assert frame.seq == 0
+    assert frame.time == 100
+    np.testing.assert_array_equal(frame.image, image(1))
+    np.testing.assert_array_equal(frame.gaze, [1.0, 2.0])
+    assert ring.get(1).gaze is None
+    assert ring.latest_seq == 1
+    del frame
+
+
+@pytest.mark.parametrize(
+    "bad_image",
+    [np.zeros((8, 9), np.uint8), np.zeros((8, 8, 3), np.uint8), np.zeros(SHAPE)],
+)
+def test_put_rejects_mismatching_images(ring, bad_image):
+    with pytest.raises(ValueError, match="does not match"):
+        ring.put(100, bad_image)
+
+    # Nothing was written
+    assert ring.latest_seq == -1
+
+
+def test_readers_attach_by_name(ring):
+    ring.put(100, image(7))
+    reader = SharedFrameRing(SHAPE, num_slots=4, name=ring.name)
+
+    frame = reader.get(0)
+    np.testing.assert_array_equal(frame.image, image(7))
+    del frame
+    reader.close()
+
+
+def test_overwritten_frames_are_not_current(ring):
+    for seq in range(4):
+        ring.put(seq, image(seq))
+    frame = ring.get(0)
+    assert ring.is_current(0)
+
+    ring.put(4, image(4))
+
+    assert not ring.is_current(0)
+    assert ring.get(0) is None
+    assert ring.is_current(4)
+    # The view of the overwritten frame shows the new image
+    np.testing.assert_array_equal(frame.image, image(4))
+    del frame
+
+
+def test_wait_for(ring):
+    assert not ring.wait_for(0, timeout=0.01)
+    ring.put(0, image(0))
+    assert ring.wait_for(0, timeout=0.01)
+
+    ring.close_writing()
+    assert ring.closed
+    assert not ring.wait_for(1)
+
+
+@pytest.mark.parametrize(
+    ("worker_index", "expected"), [(0, [18]), (1, [16, 19]), (2, [17])]
+)
+def test_workers_falling_behind_skip_to_their_oldest_frame(
+    ring, params, camera_matrix, worker_index, expected
+):
+    for seq in range(20):
+        ring.put(seq, image(0))
+    ring.close_writing()
+    results = queue.Queue()
+
+    # Only frames 16 to 19 are left in the ring, which the workers split by their
+    # sequence numbers modulo 3
+    track_shared_frames(
+        ring.name, SHAPE, 4, camera_matrix, params, results, worker_index, 3
+    )
+
+    seqs = []
+    while (result := results.get_nowait()) is not None:
+        assert result.localization is None
+        seqs.append(result.seq)
+    assert seqs == expected
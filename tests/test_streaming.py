@@ -0,0 +1,136 @@
+import asyncio
+import threading
+
+import pytest
+
+from pupil_labs.ir_plane_tracker import SampleTimeoutError, Tracker
+from pupil_labs.ir_plane_tracker.streaming import SampleFetcher
+
+from .sources import ListSource
+
+
+@pytest.fixture
+def tracker(params, camera_matrix):
+    return Tracker(camera_matrix, None, params)
+
+
+def test_fetcher_ends_with_stop_iteration():
+    fetcher = SampleFetcher(ListSource([1, 2]), num_samples=1)
+
+    assert fetcher.get().time == 1
+    assert fetcher.get().time == 2
+    # The end is kept for later calls
+    for _ in range(2):
+        with pytest.raises(StopIteration):
+            fetcher.get()
+    fetcher.stop()
+
+
+def test_fetcher_passes_on_source_errors():
+    fetcher = SampleFetcher(ListSource([1, ValueError("broken"), 2]), num_samples=2)
+
+    assert fetcher.get().time == 1
+    with pytest.raises(ValueError, match="broken"):
+        fetcher.get()
+    with pytest.raises(ValueError, match="broken"):
+        fetcher.get()
+    fetcher.stop()
+
+
+def test_fetcher_waits_out_timeouts_and_prepares_samples():
+    source = ListSource([1, SampleTimeoutError(), SampleTimeoutError(), 2])
+
+    def prepare(data):
+        data.time *= 10
+        return data
+
+    fetcher = SampleFetcher(source, num_samples=2, prepare=prepare)
+
+    assert [fetcher.get().time, fetcher.get().time] == [10, 20]
+    fetcher.stop()
+
+
+def test_fetcher_skips_repeated_samples():
+    fetcher = SampleFetcher(ListSource([1, 1, 1, 2, 2, 3]), num_samples=4)
+
+    times = [fetcher.get().time for _ in range(3)]
+
+    assert times == [1, 2, 3]
+    with pytest.raises(StopIteration):
+        fetcher.get()
+    fetcher.stop()
+
+
+def test_fetcher_stop_while_the_source_blocks():
+    source = ListSource(range(100), delay=0.2)
+    fetcher = SampleFetcher(source, num_samples=1)
+    result = []
+
+    consumer = threading.Thread(target=lambda: result.append(_get_error(fetcher)))
+    consumer.start()
+    fetcher.stop(timeout=0)
+    consumer.join(timeout=5)
+
+    assert not consumer.is_alive()
+    assert isinstance(result[0], RuntimeError)
+    fetcher.stop()
+    assert not fetcher._thread.is_alive()
+
+
+def _get_error(fetcher: SampleFetcher) -> Exception | None:
+    try:
+        while True:
+            fetcher.get()
+    except Exception as e:
+        return e
+
+
+def test_stream_tracks_all_samples_in_order(tracker):
+    stream = tracker.stream(ListSource([1, 2, 3]), undistort=False)
+
+    results = list(stream)
+
+    assert [r.data.time for r in results] == [1, 2, 3]
+    assert all(r.localization is None and r.gaze_mapped is None for r in results)
+    assert tracker.stage_counters["frames"] == 3
+
+
+def test_stream_raises_source_errors(tracker):
+    stream = tracker.stream(ListSource([1, ValueError("broken")]), undistort=False)
+    iterator = iter(stream)
+
+    assert next(iterator).data.time == 1
+    with pytest.raises(ValueError, match="broken"):
+        next(iterator)
+
+
+def test_async_stream(tracker):
+    stream = tracker.stream(ListSource([1, 2, 3]), undistort=False)
+
+    async def collect():
+        return [result.data.time async for result in stream]
+
+    assert asyncio.run(collect()) == [1, 2, 3]
+
+
+def test_closing_async_stream_does_not_block_the_loop(tracker):
+    stream = tracker.stream(ListSource(range(100), delay=0.3), undistort=False)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        iterator = stream.__aiter__()
+        await iterator.__anext__()
+        ticker = asyncio.create_task(tick())
+        # The fetcher is blocked in the source while the stream is closed
+        await iterator.aclose()
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 5
@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+
+from pupil_labs.ir_plane_tracker import Tracker
+
+
+def test_threads_get_their_own_debug_data(params, camera_matrix):
+    tracker = Tracker(camera_matrix, None, params)
+    barrier = threading.Barrier(2, timeout=5)
+    seen = {}
+
+    def track(value: int) -> None:
+        image = np.full((60, 80), value, dtype=np.uint8)
+        tracker(image)
+        # Both calls are done before either thread looks at its debug data
+        barrier.wait()
+        seen[value] = (tracker.debug.img_raw[0, 0], tracker.debug.params)
+
+    threads = [threading.Thread(target=track, args=(v,)) for v in (10, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen[10][0] == 10
+    assert seen[200][0] == 200
+    assert seen[10][1] is not seen[200][1]
+    # The main thread did not track anything
+    assert tracker.debug.img_raw is None
+
+
+def test_concurrent_calls_interleave(params, camera_matrix):
+    tracker = Tracker(camera_matrix, None, params)
+    inside = threading.Event()
+    done = threading.Event()
+
+    def track_other() -> None:
+        inside.wait(5)
+        tracker(np.full((60, 80), 200, dtype=np.uint8))
+        done.set()
+
+    thread = threading.Thread(target=track_other)
+    thread.start()
+    with tracker.call_context() as context:
+        tracker.extract_features(np.full((60, 80), 10, dtype=np.uint8))
+        inside.set()
+        assert done.wait(5)
+        # The other call ran in the middle of this one without touching its state
+        assert tracker.debug is context.debug
+        assert tracker.debug.img_raw[0, 0] == 10
+    thread.join()
+
+
+def test_params_are_snapshotted_per_call(params, camera_matrix):
+    tracker = Tracker(camera_matrix, None, params)
+    original_threshold = params.max_cr_error
+
+    with tracker.call_context() as context:
+        snapshot = tracker.params
+        assert snapshot is context.params
+        assert snapshot is not params
+
+        # Changes made during the call apply to the calls started afterwards
+        params.max_cr_error = original_threshold * 2
+        assert tracker.params.max_cr_error == original_threshold
+        new_params = params.snapshot()
+        tracker.params = new_params
+        assert tracker.params is snapshot
+
+    assert tracker.params is new_params
+    with tracker.call_context():
+        assert tracker.params.max_cr_error == original_threshold * 2
+        assert tracker.params is not snapshot
+
+
+def test_other_threads_see_the_latest_params(params, camera_matrix):
+    tracker = Tracker(camera_matrix, None, params)
+    seen = []
+
+    with tracker.call_context():
+        new_params = params.snapshot()
+        tracker.params = new_params
+        thread = threading.Thread(target=lambda: seen.append(tracker.params))
+        thread.start()
+        thread.join()
+
+    assert seen == [new_params]
+
+
+def test_stage_counters_count_all_threads(params, camera_matrix):
+    tracker = Tracker(camera_matrix, None, params)
+    image = np.zeros((60, 80), dtype=np.uint8)
+
+    def track() -> None:
+        for _ in range(25):
+            tracker(image)
+
+    threads = [threading.Thread(target=track) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tracker.stage_counters["frames"] == 100
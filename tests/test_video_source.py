@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pupil_labs.video")
+
+from pupil_labs.ir_plane_tracker.extras.eye_tracking_sources.video_source import (  # noqa: E402
+    VideoSource,
+)
+from pupil_labs.video import Writer  # noqa: E402
+
+MS = 1_000_000
+
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    """Video of 10 frames at 10 fps whose brightness is 20 times the frame index."""
+    path = tmp_path_factory.mktemp("video") / "video.mp4"
+    with Writer(path, lossless=True, fps=10) as writer:
+        for i in range(10):
+            writer.write_image(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    return path
+
+
+def frame_index(image):
+    return round(float(image.mean()) / 20)
+
+
+def test_default_intrinsics(video_path):
+    source = VideoSource(video_path)
+
+    intrinsics = source.scene_intrinsics
+    assert (intrinsics.pixel_width, intrinsics.pixel_height) == (64, 48)
+    np.testing.assert_array_equal(
+        intrinsics.camera_matrix, [[64, 0, 32], [0, 64, 24], [0, 0, 1]]
+    )
+    source.close()
+
+
+def test_all_frames_in_order(video_path):
+    source = VideoSource(video_path)
+
+    samples = []
+    while True:
+        try:
+            samples.append(source.get_sample())
+        except StopIteration:
+            break
+
+    assert [s.time for s in samples] == [i * 100 * MS for i in range(10)]
+    assert [frame_index(s.scene_image_distorted) for s in samples] == list(range(10))
+    assert samples[0].scene_image_distorted.shape == (48, 64, 3)
+    source.close()
+
+
+def test_step(video_path):
+    source = VideoSource(video_path, step=3)
+
+    assert len(source) == 4
+    assert [frame_index(source[i].scene_image_distorted) for i in range(4)] == [
+        0,
+        3,
+        6,
+        9,
+    ]
+    source.close()
+
+
+def test_timestamps_are_matched_to_the_nearest_frames(video_path):
+    # Timestamps nearest to the same frame decode it only once
+    timestamps = [10 * MS, 260 * MS, 240 * MS, 940 * MS]
+    source = VideoSource(video_path, timestamps=timestamps, gray=True)
+
+    np.testing.assert_array_equal(source.timestamps, [0, 200 * MS, 300 * MS, 900 * MS])
+    assert source[1].scene_image_distorted.ndim == 2
+    source.close()
+
+
+def test_seek(video_path):
+    source = VideoSource(video_path, step=2)
+
+    source.seek(250 * MS)
+    assert source.get_sample().time == 400 * MS
+    source.seek(400 * MS)
+    assert frame_index(source.get_sample().scene_image_distorted) == 4
+    source.seek(10_000 * MS)
+    with pytest.raises(StopIteration):
+        source.get_sample()
+    source.close()